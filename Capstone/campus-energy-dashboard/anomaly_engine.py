@@ -0,0 +1,318 @@
+# Anomaly Engine
+# Rolling 24h / 7-day means, day-of-week baselines and spike detection per
+# building. Readings can arrive one at a time (observe(), O(1) amortized per
+# reading: each building keeps its windows in ring buffers with running sums)
+# or as a whole history (backfill(), vectorized with pandas time-based rolling
+# windows). Both give the same alerts, and a backfill can be followed by live
+# observe() calls because it leaves the ring buffers primed.
+#
+# A reading is flagged when its z-score against the previous 7 days of the same
+# building, (kWh - mean) / std, is at least z_threshold in absolute value.
+#
+# Every alert is kept for alerts_frame() (the count and alerts.csv); the live
+# feed holds only the newest max_alerts. A long-running service can pass
+# keep_history=False to keep just the feed and the running alert_count.
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+SHORT_WINDOW = '24h'
+LONG_WINDOW = '7D'     # baseline for the z-score
+Z_THRESHOLD = 3.0
+MIN_PERIODS = 4        # readings needed in the baseline window before flagging
+MAX_ALERTS = 1000      # the live feed keeps the most recent alerts only
+
+DAY_NS = 86_400_000_000_000
+
+ALERT_COLUMNS = ['Date', 'Building', 'kWh', 'Baseline', 'Std', 'ZScore', 'Mean24h', 'DowMean']
+
+
+class RollingWindow:
+    """Readings of the last `span` nanoseconds in a ring buffer, with running sum and sum of squares"""
+
+    INITIAL_CAPACITY = 64  # readings, the buffer doubles when full
+
+    def __init__(self, span):
+        self.span = int(span)
+        self._times = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self._values = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._start = 0   # index of the oldest reading
+        self.count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def _grow(self):
+        capacity = len(self._values)
+        order = (self._start + np.arange(self.count)) % capacity
+        times = np.empty(capacity * 2, dtype=np.int64)
+        values = np.empty(capacity * 2, dtype=np.float64)
+        times[:self.count] = self._times[order]
+        values[:self.count] = self._values[order]
+        self._times, self._values, self._start = times, values, 0
+
+    def evict(self, now):
+        """Drop readings at or before now - span"""
+        capacity = len(self._values)
+        cutoff = now - self.span
+        while self.count and self._times[self._start] <= cutoff:
+            value = self._values[self._start]
+            self._sum -= value
+            self._sumsq -= value * value
+            self._start = (self._start + 1) % capacity
+            self.count -= 1
+        if self.count == 0:
+            self._sum = self._sumsq = 0.0   # no drift carried over once empty
+
+    def push(self, time, value):
+        if self.count == len(self._values):
+            self._grow()
+        end = (self._start + self.count) % len(self._values)
+        self._times[end] = time
+        self._values[end] = value
+        self.count += 1
+        self._sum += value
+        self._sumsq += value * value
+
+    def replace(self, times, values):
+        """Reset the window to the given (sorted) readings"""
+        capacity = self.INITIAL_CAPACITY
+        while capacity < len(values):
+            capacity *= 2
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._times[:len(times)] = times
+        self._values[:len(values)] = values
+        self._start = 0
+        self.count = len(values)
+        self._sum = float(np.sum(values))
+        self._sumsq = float(np.dot(values, values))
+
+    def contents(self):
+        """(times, values) of the readings in the window, oldest first"""
+        order = (self._start + np.arange(self.count)) % len(self._values)
+        return self._times[order], self._values[order]
+
+    def mean(self):
+        if self.count == 0:
+            return np.nan
+        return self._sum / self.count
+
+    def std(self):
+        """Population std (ddof=0) of the window"""
+        if self.count == 0:
+            return np.nan
+        mean = self._sum / self.count
+        return max(self._sumsq / self.count - mean * mean, 0.0) ** 0.5
+
+
+class BuildingMonitor:
+    """Windows and day-of-week baselines of one building"""
+
+    def __init__(self, name, short_span, long_span):
+        self.name = name
+        self.short = RollingWindow(short_span)
+        self.long = RollingWindow(long_span)
+        # running count / sum per day of week (Monday = 0)
+        self.dow_count = np.zeros(7, dtype=np.int64)
+        self.dow_sum = np.zeros(7)
+        self.last_time = None   # int64 ns of the newest reading
+        self.late = 0           # readings older than last_time, ignored
+
+    def dow_mean(self, dow):
+        if self.dow_count[dow] == 0:
+            return np.nan
+        return self.dow_sum[dow] / self.dow_count[dow]
+
+    def snapshot(self):
+        """Current rolling means and day-of-week baselines"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dow_means = self.dow_sum / self.dow_count
+        return {
+            'Building': self.name,
+            'Last': pd.Timestamp(self.last_time) if self.last_time is not None else None,
+            'Mean24h': self.short.mean(),
+            'Mean7d': self.long.mean(),
+            'Std7d': self.long.std(),
+            'DowMeans': dict(zip(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'], dow_means)),
+        }
+
+
+class AnomalyEngine:
+    """Per-building rolling windows and z-score spike alerts"""
+
+    def __init__(self, z_threshold=Z_THRESHOLD, min_periods=MIN_PERIODS, short_window=SHORT_WINDOW,
+                 long_window=LONG_WINDOW, max_alerts=MAX_ALERTS, keep_history=True):
+        self.z_threshold = z_threshold
+        self.min_periods = min_periods
+        self.short_window = pd.Timedelta(short_window)
+        self.long_window = pd.Timedelta(long_window)
+        if self.short_window > self.long_window:
+            raise ValueError("short_window must not be longer than long_window")
+        self.monitors = {}
+        self.alerts = deque(maxlen=max_alerts)   # live feed
+        self.keep_history = keep_history
+        self.alert_count = 0
+        self._history = []   # alert frames, oldest first (when keep_history)
+        self.readings = 0
+
+    def monitor(self, building_name):
+        if building_name not in self.monitors:
+            self.monitors[building_name] = BuildingMonitor(building_name, self.short_window.value,
+                                                           self.long_window.value)
+        return self.monitors[building_name]
+
+    def _alert(self, building_name, time, kwh, baseline, std, count, mean_24h, dow_mean):
+        """The alert dict if the reading is a spike against its baseline, else None"""
+        if count < self.min_periods or not std > 0:
+            return None
+        z = (kwh - baseline) / std
+        if abs(z) < self.z_threshold:
+            return None
+        return {'Date': pd.Timestamp(time), 'Building': building_name, 'kWh': kwh,
+                'Baseline': baseline, 'Std': std, 'ZScore': z, 'Mean24h': mean_24h, 'DowMean': dow_mean}
+
+    def observe(self, building_name, timestamp, kwh):
+        """Fold one live reading in; returns its alert dict or None"""
+        time = pd.Timestamp(timestamp).value
+        kwh = float(kwh)
+        if np.isnan(kwh):
+            return None
+        m = self.monitor(building_name)
+        if m.last_time is not None and time < m.last_time:
+            m.late += 1
+            return None
+
+        # baseline = the previous readings in (time - long_window, time)
+        m.long.evict(time)
+        baseline, std, count = m.long.mean(), m.long.std(), m.long.count
+        m.long.push(time, kwh)
+        m.short.evict(time)
+        m.short.push(time, kwh)
+
+        dow = (time // DAY_NS + 3) % 7   # 1970-01-01 was a Thursday
+        dow_mean = m.dow_mean(dow)
+        m.dow_count[dow] += 1
+        m.dow_sum[dow] += kwh
+        m.last_time = time
+        self.readings += 1
+
+        alert = self._alert(building_name, time, kwh, baseline, std, count, m.short.mean(), dow_mean)
+        if alert is not None:
+            self.alerts.append(alert)
+            self.alert_count += 1
+            if self.keep_history:
+                self._history.append(pd.DataFrame([alert], columns=ALERT_COLUMNS))
+        return alert
+
+    def backfill(self, df):
+        """Fold a frame of readings (Date, kWh, Building) in with vectorized rolling windows.
+
+        Rows of each building must be newer than what that building has already
+        seen (older rows are counted as late and skipped), so history can be fed
+        chunk by chunk. Returns the alerts found, as a DataFrame.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        kwh = pd.to_numeric(df['kWh'], errors='coerce')
+        found = []
+
+        for name, positions in df.groupby('Building', observed=True, sort=False).indices.items():
+            times = dates.iloc[positions].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            values = kwh.iloc[positions].to_numpy(dtype=np.float64)
+            valid = (times != np.iinfo(np.int64).min) & ~np.isnan(values)
+            times, values = times[valid], values[valid]
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+
+            m = self.monitor(name)
+            if m.last_time is not None:
+                fresh = times >= m.last_time
+                m.late += int(len(times) - fresh.sum())
+                times, values = times[fresh], values[fresh]
+            if len(times) == 0:
+                continue
+            found.append(self._backfill_building(m, times, values))
+
+        alerts = pd.concat(found, ignore_index=True) if found else pd.DataFrame(columns=ALERT_COLUMNS)
+        if not alerts.empty:
+            alerts = alerts.sort_values('Date', kind='stable', ignore_index=True)
+            self.alerts.extend(alerts.tail(self.alerts.maxlen).to_dict('records'))
+            self.alert_count += len(alerts)
+            if self.keep_history:
+                self._history.append(alerts)
+        return alerts
+
+    def _backfill_building(self, m, times, values):
+        # the readings still inside the long window continue into this batch
+        prior_times, prior_values = m.long.contents()
+        n_prior = len(prior_times)
+        all_times = np.concatenate([prior_times, times])
+        all_values = pd.Series(np.concatenate([prior_values, values]),
+                               index=pd.DatetimeIndex(all_times.view('datetime64[ns]')))
+
+        # (t - long, t) excludes the reading itself, (t - short, t] includes it
+        baseline_window = all_values.rolling(self.long_window, closed='neither', min_periods=1)
+        baseline = baseline_window.mean().to_numpy()[n_prior:]
+        std = baseline_window.std(ddof=0).to_numpy()[n_prior:]
+        count = baseline_window.count().to_numpy()[n_prior:]
+        mean_24h = all_values.rolling(self.short_window).mean().to_numpy()[n_prior:]
+
+        # mean of the earlier readings on the same day of week
+        dow = pd.DatetimeIndex(times.view('datetime64[ns]')).dayofweek.to_numpy()
+        frame = pd.DataFrame({'dow': dow, 'kWh': values})
+        earlier_sum = frame.groupby('dow')['kWh'].cumsum().to_numpy() - values + m.dow_sum[dow]
+        earlier_count = frame.groupby('dow').cumcount().to_numpy() + m.dow_count[dow]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dow_mean = np.where(earlier_count > 0, earlier_sum / earlier_count, np.nan)
+
+        count = np.nan_to_num(count).astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (values - baseline) / std
+        flagged = (count >= self.min_periods) & (std > 0) & (np.abs(z) >= self.z_threshold)
+
+        alerts = pd.DataFrame({
+            'Date': pd.DatetimeIndex(times[flagged].view('datetime64[ns]')),
+            'Building': m.name,
+            'kWh': values[flagged],
+            'Baseline': baseline[flagged],
+            'Std': std[flagged],
+            'ZScore': z[flagged],
+            'Mean24h': mean_24h[flagged],
+            'DowMean': dow_mean[flagged],
+        })
+
+        # leave the monitor as if every reading had gone through observe()
+        last = times[-1]
+        keep = all_times > last - m.long.span
+        m.long.replace(all_times[keep], all_values.to_numpy()[keep])
+        keep = times > last - m.short.span
+        m.short.replace(times[keep], values[keep])
+        m.dow_count += np.bincount(dow, minlength=7)
+        m.dow_sum += np.bincount(dow, weights=values, minlength=7)
+        m.last_time = int(last)
+        self.readings += len(values)
+        return alerts
+
+    def alerts_frame(self):
+        """All alerts found so far, oldest first (only the live feed without keep_history)"""
+        if not self.keep_history:
+            return self._feed_frame()
+        if not self._history:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        if len(self._history) > 1:
+            self._history = [pd.concat(self._history, ignore_index=True)]
+        return self._history[0].copy()
+
+    def _feed_frame(self):
+        if not self.alerts:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        return pd.DataFrame(list(self.alerts), columns=ALERT_COLUMNS)
+
+    def feed(self, limit=10):
+        """The `limit` most recent alerts, newest first"""
+        alerts = self._feed_frame()
+        return alerts.sort_values('Date', ascending=False, kind='stable').head(limit)
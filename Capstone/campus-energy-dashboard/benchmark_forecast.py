@@ -0,0 +1,79 @@
+# Forecast Benchmark
+# Times the batched forecast fit (forecasting.py) against fitting the same
+# models one building at a time with np.linalg.lstsq, on generated daily
+# totals for many buildings.
+#
+#   python benchmark_forecast.py --buildings 10000 --weather
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from forecasting import ConsumptionForecaster, FIT_DAYS, design_matrix
+from weather_join import DAY_NS
+
+
+def make_matrix(buildings, days, seed=42, missing=0.02):
+    """(names, days, kwh, counts, weather) with weekday/weekend levels, a temperature response and gaps"""
+    rng = np.random.default_rng(seed)
+    grid = np.datetime64('2024-01-01', 'ns') + np.arange(days) * np.timedelta64(DAY_NS, 'ns')
+    temperature = 15 + 8 * np.sin(2 * np.pi * np.arange(days) / 365.25) + rng.normal(0, 2, days)
+    weekend = pd.to_datetime(grid).dayofweek.to_numpy() >= 5
+
+    base = rng.uniform(500, 5000, (buildings, 1))
+    heating = rng.uniform(0, 40, (buildings, 1))
+    kwh = (base * np.where(weekend, 0.6, 1.0) + heating * np.maximum(18 - temperature, 0)
+           + rng.normal(0, 50, (buildings, days)))
+    counts = np.where(rng.random((buildings, days)) < missing, 0, 24)
+
+    names = [f"Building_{i:05d}" for i in range(buildings)]
+    weather = pd.DataFrame({'Date': pd.to_datetime(grid), 'AvgTemp': temperature})
+    return names, grid, kwh, counts, weather
+
+
+def fit_loop(days, kwh, counts, design):
+    """The same least-squares fits, one building at a time"""
+    coef = np.empty((len(kwh), design.shape[1]))
+    for b in range(len(kwh)):
+        keep = counts[b] > 0
+        coef[b] = np.linalg.lstsq(design[keep], kwh[b, keep], rcond=None)[0]
+    return coef
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched forecast fit")
+    parser.add_argument('--buildings', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=FIT_DAYS)
+    parser.add_argument('--weather', action='store_true', help="include the degree-day terms")
+    parser.add_argument('--loop-buildings', type=int, default=1000,
+                        help="buildings for the (slow) per-building loop; the rate is extrapolated")
+    args = parser.parse_args()
+
+    names, days, kwh, counts, weather = make_matrix(args.buildings, args.days)
+    weather = weather if args.weather else None
+    print(f"Generated {args.buildings:,} buildings x {args.days} days")
+
+    forecaster = ConsumptionForecaster(fit_days=args.days)
+    start = time.perf_counter()
+    forecaster.fit_matrix(names, days, kwh, counts, weather)
+    batched = time.perf_counter() - start
+
+    temperature = weather['AvgTemp'].to_numpy() if weather is not None else None
+    design = design_matrix(days, temperature, forecaster.balance_point)
+    sample = min(args.loop_buildings, args.buildings)
+    start = time.perf_counter()
+    coef = fit_loop(days, kwh[:sample], counts[:sample], design)
+    looped = (time.perf_counter() - start) * args.buildings / sample
+
+    agree = np.allclose(coef, forecaster.coef[:sample], rtol=1e-5, atol=1e-3)   # kWh
+    print("-" * 60)
+    print(f"Batched fit       : {batched:8.3f} s  (including the window/mask setup)")
+    print(f"Per-building loop : {looped:8.3f} s  (extrapolated from {sample:,} buildings)")
+    print(f"Speedup           : {looped / batched:.1f}x")
+    print(f"Coefficients agree: {'✓' if agree else '✗'}")
+
+
+if __name__ == "__main__":
+    main()
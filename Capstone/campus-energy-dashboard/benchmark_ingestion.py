@@ -0,0 +1,85 @@
+# Ingestion Benchmark
+# Compares the old row-by-row loader (df.iterrows + add_reading) with the
+# bulk BuildingManager.load_frame path on a generated interval dataset.
+#
+#   python benchmark_ingestion.py --rows 2000000 --buildings 20
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from building_model import BuildingManager
+
+
+def make_frame(rows, buildings, seed=42):
+    """Build a combined Date/kWh/Building frame with 15-minute readings and a few NaNs"""
+    rng = np.random.default_rng(seed)
+    per_building = rows // buildings
+    start = np.datetime64('2024-01-01T00:00', 'ns')
+    step = np.timedelta64(15, 'm')
+
+    dates = np.tile(start + np.arange(per_building) * step, buildings)
+    kwh = rng.uniform(10, 300, size=per_building * buildings).round(2)
+    names = np.repeat([f"Building_{i:03d}" for i in range(buildings)], per_building)
+
+    # sprinkle some missing values so the validation masks have work to do
+    kwh[rng.random(len(kwh)) < 0.001] = np.nan
+    dates[rng.random(len(dates)) < 0.001] = np.datetime64('NaT')
+
+    return pd.DataFrame({'Date': dates, 'kWh': kwh, 'Building': names})
+
+
+def ingest_rowwise(df):
+    """The original TASK 1 loop"""
+    manager = BuildingManager()
+    for index, row in df.iterrows():
+        if pd.notna(row['Date']) and pd.notna(row['kWh']):
+            manager.add_building(row['Building'])
+            manager.get_building(row['Building']).add_reading(row['Date'], row['kWh'])
+    return manager
+
+
+def ingest_bulk(df):
+    """Whole columns per building in one call"""
+    manager = BuildingManager()
+    manager.load_frame(df)
+    return manager
+
+
+def time_it(func, df):
+    start = time.perf_counter()
+    manager = func(df)
+    elapsed = time.perf_counter() - start
+    readings = sum(len(manager.get_building(b).kwh_values) for b in manager.get_all_buildings())
+    return elapsed, readings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV ingestion into BuildingManager")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="rows for the bulk path")
+    parser.add_argument('--buildings', type=int, default=20)
+    parser.add_argument('--rowwise-rows', type=int, default=100_000,
+                        help="rows for the (slow) row-by-row path; rows/s is extrapolated")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.buildings)
+    print(f"Generated {len(df):,} rows for {args.buildings} buildings")
+
+    sample = df.head(args.rowwise_rows)
+    before, before_readings = time_it(ingest_rowwise, sample)
+    after, after_readings = time_it(ingest_bulk, df)
+
+    before_rate = len(sample) / before
+    after_rate = len(df) / after
+
+    print("-" * 60)
+    print(f"Row-by-row : {len(sample):>12,} rows  {before:8.2f} s  {before_rate:>14,.0f} rows/s")
+    print(f"Bulk       : {len(df):>12,} rows  {after:8.2f} s  {after_rate:>14,.0f} rows/s")
+    print(f"Speedup    : {after_rate / before_rate:.1f}x")
+    print(f"Valid readings kept: {before_readings:,} (row-by-row), {after_readings:,} (bulk)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Pipeline Benchmark
+# Times every stage of energy_dashboard.py at several dataset sizes and
+# writes the results as JSON, so runs from different commits can be compared.
+#
+# For each scale a seeded dataset is generated with generate_sample_data.py,
+# then ingest, the three aggregations, the full aggregate stage, plotting and
+# export run in a fresh worker process (so its peak RSS is its own).
+#
+#   python benchmark_pipeline.py --buildings 5 50 500 --days 365 --interval 1h --out bench.json
+#   python benchmark_pipeline.py --buildings 5 50 500 --compare bench.json   # after a change
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+sys.path.insert(0, REPO_ROOT)  # for the shared/ modules
+from shared.benchmarking import run_stage, max_rss_mb, environment, compare, REGRESSION_RATIO
+
+
+def benchmark_scale(buildings, days, interval, seed, full_render, trace_memory):
+    """Generate one dataset and time every dashboard stage on it; returns one result dict"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import energy_dashboard as dash
+    from generate_sample_data import generate_dataset
+
+    workdir = tempfile.mkdtemp(prefix='energy_bench_')
+    try:
+        data_dir = os.path.join(workdir, 'data')
+        output_dir = os.path.join(workdir, 'output')
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, rows, _ = generate_dataset(data_dir, buildings, days, interval, start='2024-01-01', seed=seed)
+
+        stages = {}
+        t = {'trace_memory': trace_memory}
+        data = run_stage(stages, 'ingest', dash.load_data, data_dir, workers=1, cache_dir=None, **t)
+        df = data['df_combined']
+        run_stage(stages, 'calculate_daily_totals', dash.calculate_daily_totals, df, **t)
+        run_stage(stages, 'calculate_weekly_aggregates', dash.calculate_weekly_aggregates, df, **t)
+        run_stage(stages, 'building_wise_summary', dash.building_wise_summary, df, **t)
+        results = run_stage(stages, 'aggregate', dash.aggregate, data, **t)
+        run_stage(stages, 'plot', dash.plot_dashboard, data, results, os.path.join(workdir, 'dashboard.png'),
+                  dpi=dash.DASHBOARD_DPI if full_render else 100, fast=not full_render, **t)
+        run_stage(stages, 'export', dash.export_results, data, results, output_dir, **t)
+
+        return {
+            'buildings': buildings,
+            'rows': rows,
+            'stages': stages,
+            'total_seconds': sum(stage['seconds'] for stage in stages.values()),
+            'max_rss_mb': max_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the energy dashboard stages")
+    parser.add_argument('--buildings', type=int, nargs='+', default=[5, 50, 200],
+                        help="one scale per value: number of generated buildings")
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--interval', default='1h', help="time between readings of a building")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--full-render', action='store_true',
+                        help="time the full-resolution dashboard instead of --fast rendering")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record each stage's peak Python/NumPy allocation (slows the stages down)")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--compare', default=None, help="earlier results JSON to compare against")
+    parser.add_argument('--ratio', type=float, default=REGRESSION_RATIO,
+                        help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:   # read first, --out may be the same file
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = {'pipeline': 'energy_dashboard', 'environment': environment(),
+              'settings': {'days': args.days, 'interval': args.interval, 'seed': args.seed,
+                           'full_render': args.full_render, 'trace_memory': args.trace_memory},
+              'results': []}
+
+    for buildings in args.buildings:
+        # a fresh process per scale, so max RSS is not carried over from the previous scale
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            run = executor.submit(benchmark_scale, buildings, args.days, args.interval, args.seed,
+                                  args.full_render, args.trace_memory).result()
+        report['results'].append(run)
+
+        rss = f"{run['max_rss_mb']:.0f} MB" if run['max_rss_mb'] is not None else 'n/a'
+        print(f"\n{buildings} buildings, {run['rows']:,} rows  "
+              f"(total {run['total_seconds']:.2f} s, max RSS {rss})")
+        for stage, timing in run['stages'].items():
+            memory = f"  peak {timing['peak_mb']:8.1f} MB" if 'peak_mb' in timing else ''
+            print(f"  {stage:<28} {timing['seconds']:8.3f} s{memory}")
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Saved: {args.out}")
+
+    if baseline is not None and compare(report, baseline, 'buildings', 'bldg', args.ratio):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
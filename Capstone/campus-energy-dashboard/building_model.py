@@ -0,0 +1,386 @@
+# Building Model
+# MeterReading / Building / BuildingManager classes used by the energy dashboard.
+# Kept in their own module so they can be imported without running the dashboard.
+
+import pandas as pd
+import numpy as np
+
+from range_index import TimeRangeIndex
+
+RANGE_AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+
+class MeterReading:
+    """A single electricity meter reading with timestamp and usage"""
+
+    __slots__ = ('timestamp', 'kwh')
+    
+    def __init__(self, timestamp, kwh):
+       
+        self.timestamp = timestamp  #when reading was taken
+        self.kwh = kwh  #how much electricity was used
+    
+    def __str__(self):
+        return f"Reading on {self.timestamp}: {self.kwh} kWh"
+
+
+class ReadingsView:
+    """Read-only list-like view that builds MeterReading objects only when asked"""
+
+    def __init__(self, building):
+        self._building = building
+
+    def __len__(self):
+        return self._building._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("reading index out of range")
+        return MeterReading(pd.Timestamp(self._building._timestamps[index]),
+                            float(self._building._kwh[index]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class Building:
+
+    INITIAL_CAPACITY = 64  # readings, buffers double when full
+    
+    def __init__(self, name, keep_readings=True):
+
+        self.name = name
+        # readings live in two parallel numpy buffers (8 bytes + 8 bytes per reading);
+        # with keep_readings=False only the running statistics below are kept
+        self.keep_readings = keep_readings
+        self._timestamps = np.empty(self.INITIAL_CAPACITY if keep_readings else 0, dtype='datetime64[ns]')
+        self._kwh = np.empty(self.INITIAL_CAPACITY if keep_readings else 0, dtype=np.float64)
+        self._size = 0   # readings stored in the buffers
+        self._count = 0  # readings seen by the statistics
+        # running statistics, updated on every add so reports never rescan the buffers
+        self._sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean (Welford)
+        self._min = np.inf
+        self._max = -np.inf
+        # readings are kept in time order; an out-of-order append is sorted in before the next range query
+        self._sorted = True
+        self._index = None  # TimeRangeIndex, built on the first range query
+
+    @property
+    def meter_readings(self):
+        """MeterReading objects, created lazily from the column buffers"""
+        return ReadingsView(self)
+
+    @property
+    def timestamps(self):
+        """datetime64[ns] array of reading times (a view, no copy)"""
+        return self._timestamps[:self._size]
+
+    @property
+    def kwh_values(self):
+        """float64 array of kWh values (a view, no copy)"""
+        return self._kwh[:self._size]
+
+    def _reserve(self, extra):
+        """Grow the buffers so that `extra` more readings fit (amortized doubling)"""
+        needed = self._size + extra
+        capacity = len(self._kwh)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, self.INITIAL_CAPACITY)
+        while capacity < needed:
+            capacity *= 2
+        timestamps = np.empty(capacity, dtype='datetime64[ns]')
+        kwh = np.empty(capacity, dtype=np.float64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        kwh[:self._size] = self._kwh[:self._size]
+        self._timestamps = timestamps
+        self._kwh = kwh
+    
+    def add_reading(self, timestamp, kwh):
+      
+        if self.keep_readings:
+            self._reserve(1)
+            self._timestamps[self._size] = pd.Timestamp(timestamp).to_datetime64()
+            self._kwh[self._size] = kwh
+            if self._size and self._timestamps[self._size] < self._timestamps[self._size - 1]:
+                self._sorted = False
+            self._size += 1
+
+        kwh = float(kwh)
+        self._count += 1
+        self._sum += kwh
+        delta = kwh - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (kwh - self._mean)
+        self._min = min(self._min, kwh)
+        self._max = max(self._max, kwh)
+
+    def add_readings(self, timestamps, kwh):
+        """Append many readings at once, skipping pairs where either value is missing"""
+
+        timestamps = np.asarray(pd.to_datetime(timestamps, errors='coerce'), dtype='datetime64[ns]')
+        kwh = np.asarray(kwh, dtype=np.float64)
+        if len(timestamps) != len(kwh):
+            raise ValueError("timestamps and kwh must have the same length")
+
+        valid = ~np.isnat(timestamps) & ~np.isnan(kwh)
+        if not valid.all():
+            timestamps = timestamps[valid]
+            kwh = kwh[valid]
+
+        added = len(kwh)
+        if added == 0:
+            return 0
+        if self.keep_readings:
+            if self._sorted and ((self._size and timestamps[0] < self._timestamps[self._size - 1])
+                                 or (timestamps[1:] < timestamps[:-1]).any()):
+                self._sorted = False
+            self._reserve(added)
+            self._timestamps[self._size:self._size + added] = timestamps
+            self._kwh[self._size:self._size + added] = kwh
+            self._size += added
+        self._merge_stats(kwh)
+        return added
+
+    def _merge_stats(self, kwh):
+        """Fold a batch into the running stats (Chan et al. parallel Welford update)"""
+        old_count = self._count
+        batch_count = len(kwh)
+        batch_mean = float(kwh.mean())
+        batch_m2 = float(((kwh - batch_mean) ** 2).sum())
+
+        self._count = old_count + batch_count
+        delta = batch_mean - self._mean
+        self._mean += delta * batch_count / self._count
+        self._m2 += batch_m2 + delta * delta * old_count * batch_count / self._count
+        self._sum += float(kwh.sum())
+        self._min = min(self._min, float(kwh.min()))
+        self._max = max(self._max, float(kwh.max()))
+    
+    def _sort(self):
+        """Sort out-of-order appends into place (before any lookup by time)"""
+        if not self.keep_readings:
+            raise ValueError(f"{self.name} keeps running statistics only (keep_readings=False), "
+                             "range queries need the readings")
+        if not self._sorted:
+            order = np.argsort(self.timestamps, kind='stable')   # equal times keep arrival order
+            self._timestamps[:self._size] = self.timestamps[order]
+            self._kwh[:self._size] = self.kwh_values[order]
+            self._sorted = True
+            self._index = None
+
+    def _range_index(self):
+        """The TimeRangeIndex over the readings, sorting them and catching up with appends first"""
+        self._sort()
+        if self._index is None:
+            self._index = TimeRangeIndex()
+        self._index.update(self.kwh_values)
+        return self._index
+
+    def locate(self, start=None, end=None):
+        """(lo, hi) positions of the readings with start <= time < end (binary search)"""
+        self._sort()
+        timestamps = self.timestamps
+        lo = 0 if start is None else int(np.searchsorted(timestamps, _as_datetime64(start), side='left'))
+        hi = self._size if end is None else int(np.searchsorted(timestamps, _as_datetime64(end), side='left'))
+        return lo, max(lo, hi)
+
+    def readings_between(self, start=None, end=None):
+        """(timestamps, kwh) array views of the readings with start <= time < end"""
+        lo, hi = self.locate(start, end)
+        return self.timestamps[lo:hi], self.kwh_values[lo:hi]
+
+    def range_stats(self, start=None, end=None, aggs=RANGE_AGGREGATES):
+        """{agg: value} over the readings with start <= time < end, in O(log n)
+
+        mean/min/max of an empty range are NaN.
+        """
+        index = self._range_index()
+        lo, hi = self.locate(start, end)
+        kwh = self.kwh_values
+        stats = {}
+        for agg in aggs:
+            if agg == 'count':
+                stats[agg] = hi - lo
+            elif agg == 'sum':
+                stats[agg] = index.total(lo, hi)
+            elif hi == lo:
+                stats[agg] = np.nan
+            elif agg == 'mean':
+                stats[agg] = index.total(lo, hi) / (hi - lo)
+            elif agg == 'min':
+                stats[agg] = index.minimum(kwh, lo, hi)
+            elif agg == 'max':
+                stats[agg] = index.maximum(kwh, lo, hi)
+            else:
+                raise ValueError(f"Unknown aggregate: {agg!r} (use one of {', '.join(RANGE_AGGREGATES)})")
+        return stats
+
+    def calculate_total_consumption(self):
+        return self._sum
+    
+    def calculate_average_consumption(self):
+    
+        if self._count == 0:
+            return 0
+        return self._sum / self._count
+    
+    def calculate_min_consumption(self):
+
+        if self._count == 0:
+            return 0
+        return self._min
+    
+    def calculate_max_consumption(self):
+
+        if self._count == 0:
+            return 0
+        return self._max
+
+    def calculate_variance_consumption(self):
+        """Population variance of the readings"""
+        if self._count == 0:
+            return 0
+        return self._m2 / self._count
+
+    def calculate_std_consumption(self):
+
+        return self.calculate_variance_consumption() ** 0.5
+    
+    def generate_report(self):
+
+        report = f"\n--- Report for {self.name} ---\n"
+        report += f"Total Readings: {self._count}\n"
+        report += f"Total Consumption: {self.calculate_total_consumption():.2f} kWh\n"
+        report += f"Average Consumption: {self.calculate_average_consumption():.2f} kWh\n"
+        report += f"Minimum Reading: {self.calculate_min_consumption():.2f} kWh\n"
+        report += f"Maximum Reading: {self.calculate_max_consumption():.2f} kWh\n"
+        return report
+
+
+def _as_datetime64(value):
+    return np.datetime64(pd.Timestamp(value).to_datetime64(), 'ns')
+
+
+class BuildingManager:
+  
+    
+    def __init__(self, keep_readings=True, store=None):
+    
+        self.buildings = {}
+        self.keep_readings = keep_readings  # False = statistics only, for streaming
+        # a MeterStore: buildings are memory-mapped from its files (and always keep their readings)
+        self.store = store
+        if store is not None:
+            for building_name in store.names():
+                self.buildings[building_name] = store.building(building_name)
+    
+    def add_building(self, building_name):
+      
+        if building_name not in self.buildings:
+            if self.store is not None:
+                self.buildings[building_name] = self.store.building(building_name)
+            else:
+                self.buildings[building_name] = Building(building_name, self.keep_readings)
+    
+    def load_frame(self, df, building_name=None):
+        """Load a DataFrame with Date and kWh columns in one call per building.
+
+        Rows are assigned by the 'Building' column, or to `building_name` if given.
+        Returns the number of valid readings added.
+        """
+        if df.empty:
+            return 0
+
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        kwh = pd.to_numeric(df['kWh'], errors='coerce')
+
+        if building_name is not None or 'Building' not in df.columns:
+            if building_name is None:
+                raise ValueError("building_name is required when df has no 'Building' column")
+            self.add_building(building_name)
+            return self.buildings[building_name].add_readings(dates, kwh)
+
+        added = 0
+        for name, positions in df.groupby('Building', sort=False).indices.items():
+            self.add_building(name)
+            added += self.buildings[name].add_readings(dates.iloc[positions], kwh.iloc[positions])
+        return added
+
+    def get_building(self, building_name):
+
+        if building_name in self.buildings:
+            return self.buildings[building_name]
+        return None
+    
+    def get_all_buildings(self):
+
+        return list(self.buildings.keys())
+    
+    def query(self, buildings=None, start=None, end=None, agg='sum'):
+        """Aggregate each building's readings with start <= time < end.
+
+        buildings: a name, a list of names or None for all buildings.
+        agg: one of count/sum/mean/min/max, giving {building: value}, or a
+        list of them, giving {building: {agg: value}}. Each building answers
+        from its range index (binary search + prefix sums + sparse tables),
+        so repeated queries never rescan the readings.
+        """
+        if buildings is None:
+            buildings = self.get_all_buildings()
+        elif isinstance(buildings, str):
+            buildings = [buildings]
+
+        aggs = [agg] if isinstance(agg, str) else list(agg)
+        results = {}
+        for name in buildings:
+            building = self.get_building(name)
+            if building is None:
+                raise KeyError(f"Unknown building: {name!r}")
+            stats = building.range_stats(start, end, aggs)
+            results[name] = stats[agg] if isinstance(agg, str) else stats
+        return results
+
+    def get_building_summary(self):
+        """Per-building mean/min/max/total/count from the running statistics"""
+        summary = {}
+        for building_name, building in self.buildings.items():
+            if building._count == 0:
+                continue
+            summary[building_name] = {
+                'mean': building.calculate_average_consumption(),
+                'min': building.calculate_min_consumption(),
+                'max': building.calculate_max_consumption(),
+                'total': building.calculate_total_consumption(),
+                'count': building._count
+            }
+        return summary
+    
+    def get_total_campus_consumption(self):
+
+        total = 0
+        for building_name in self.buildings:
+            building = self.buildings[building_name]
+            total += building.calculate_total_consumption()
+        return total
+    
+    def get_highest_consuming_building(self):
+  
+        highest_building = None
+        highest_consumption = 0
+        
+        for building_name in self.buildings:
+            building = self.buildings[building_name]
+            consumption = building.calculate_total_consumption()
+            if consumption > highest_consumption:
+                highest_consumption = consumption
+                highest_building = building_name
+        
+        return highest_building, highest_consumption
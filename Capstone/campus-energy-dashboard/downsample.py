@@ -0,0 +1,60 @@
+# Downsampling
+# Picks a subset of points to draw so long time series render quickly but
+# keep their visual shape. Both functions return indices into the input.
+
+import numpy as np
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: n_out indices that best preserve the line's shape"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # first and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # the average of the next bucket is the third corner of the triangle
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        indices[i + 1] = previous
+
+    return indices
+
+
+def minmax_indices(y, n_buckets):
+    """Min and max of each of n_buckets equal slices, so spikes are never dropped"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = n // n_buckets
+    m = size * n_buckets
+    blocks = y[:m].reshape(n_buckets, size)
+    starts = np.arange(n_buckets) * size
+
+    lows = starts + np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    highs = starts + np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    return np.unique(np.concatenate([lows, highs, np.arange(m, n)]))
@@ -1,216 +1,223 @@
 # Campus Energy-Use Dashboard
 # This program analyzes electricity usage data from multiple buildingssssssssssss...........
+#
+# Run it as a script (python energy_dashboard.py --help for the stage flags) or
+# import it: load_data(), aggregate(), plot_dashboard() and export_results() are
+# the pipeline stages, so a long-running service can keep the loaded data in
+# memory and re-run only what it needs. matplotlib is imported only for plotting.
 
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
 import os
-from datetime import datetime
-
-print("=" * 60)
-print("CAMPUS ENERGY DASHBOARD - STARTING ANALYSIS")
-print("=" * 60)
-
-# TASK 3: OBJECT-ORIENTED MODELING 
-
-class MeterReading:
-    """A single electricity meter reading with timestamp and usage"""
-    
-    def __init__(self, timestamp, kwh):
-       
-        self.timestamp = timestamp  #when reading was taken
-        self.kwh = kwh  #how much electricity was used
-    
-    def __str__(self):
-        return f"Reading on {self.timestamp}: {self.kwh} kWh"
-
-
-class Building:
-    
-    def __init__(self, name):
-
-        self.name = name
-        self.meter_readings = []  
-    
-    def add_reading(self, timestamp, kwh):
-      
-        reading = MeterReading(timestamp, kwh)  
-        self.meter_readings.append(reading)
-    
-    def calculate_total_consumption(self):
-        total = 0
-        for reading in self.meter_readings:
-            total += reading.kwh
-        return total
-    
-    def calculate_average_consumption(self):
-    
-        if len(self.meter_readings) == 0:
-            return 0
-        total = self.calculate_total_consumption()
-        return total / len(self.meter_readings)
-    
-    def calculate_min_consumption(self):
-
-        if len(self.meter_readings) == 0:
-            return 0
-        min_kwh = self.meter_readings[0].kwh
-        for reading in self.meter_readings:
-            if reading.kwh < min_kwh:
-                min_kwh = reading.kwh
-        return min_kwh
-    
-    def calculate_max_consumption(self):
-
-        if len(self.meter_readings) == 0:
-            return 0
-        max_kwh = self.meter_readings[0].kwh
-        for reading in self.meter_readings:
-            if reading.kwh > max_kwh:
-                max_kwh = reading.kwh
-        return max_kwh
-    
-    def generate_report(self):
-
-        report = f"\n--- Report for {self.name} ---\n"
-        report += f"Total Readings: {len(self.meter_readings)}\n"
-        report += f"Total Consumption: {self.calculate_total_consumption():.2f} kWh\n"
-        report += f"Average Consumption: {self.calculate_average_consumption():.2f} kWh\n"
-        report += f"Minimum Reading: {self.calculate_min_consumption():.2f} kWh\n"
-        report += f"Maximum Reading: {self.calculate_max_consumption():.2f} kWh\n"
-        return report
-
-
-class BuildingManager:
-  
-    
-    def __init__(self):
-    
-        self.buildings = {}
-    
-    def add_building(self, building_name):
-      
-        if building_name not in self.buildings:
-            self.buildings[building_name] = Building(building_name)
-    
-    def get_building(self, building_name):
-
-        if building_name in self.buildings:
-            return self.buildings[building_name]
-        return None
-    
-    def get_all_buildings(self):
-
-        return list(self.buildings.keys())
-    
-    def get_total_campus_consumption(self):
-
-        total = 0
-        for building_name in self.buildings:
-            building = self.buildings[building_name]
-            total += building.calculate_total_consumption()
-        return total
-    
-    def get_highest_consuming_building(self):
-  
-        highest_building = None
-        highest_consumption = 0
-        
-        for building_name in self.buildings:
-            building = self.buildings[building_name]
-            consumption = building.calculate_total_consumption()
-            if consumption > highest_consumption:
-                highest_consumption = consumption
-                highest_building = building_name
-        
-        return highest_building, highest_consumption
+import sys
+import time
+
+import pandas as pd
+
+from building_model import BuildingManager  # TASK 3: OBJECT-ORIENTED MODELING
+from csv_loader import list_csv_files, load_csv_files
+from streaming import stream_csv_files
+from meter_cache import MeterCache
+from rollup_store import RollupStore
+from downsample import lttb_indices, minmax_indices
+from anomaly_engine import AnomalyEngine, Z_THRESHOLD
+from weather_join import load_weather_daily, weather_normalize, BALANCE_POINT
+from forecasting import ConsumptionForecaster, HORIZON
+from interval_metrics import analyze_intervals, period_starts, GRAINS
+from meter_store import MeterStore, KWH_DTYPES
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+sys.path.insert(0, REPO_ROOT)  # for the shared/ modules
+from shared.partitioned_export import PartitionedExport, FORMATS
+from shared.instrumentation import PROFILER, span, timed, annotate, cprofile_to
+
+STAGES = ('ingest', 'aggregate', 'plot', 'export')
+
+# defaults for the command line flags
+DATA_DIR = 'data'
+OUTPUT_DIR = 'output'
+DASHBOARD_PATH = 'dashboard.png'
+DASHBOARD_DPI = 300
+FAST_MAX_POINTS = 2000              # points per series in --fast mode
+LOAD_WORKERS = os.cpu_count() or 1   # 1 = read files one after another
+LOAD_MODE = 'thread'                # 'thread' or 'process'
+CHUNK_SIZE = 100_000                # rows per chunk in streaming mode
+CACHE_DIR = '.meter_cache'          # parsed columns of unchanged files are reused from here
+ROLLUP_DIR = 'output/rollups'       # daily/weekly/monthly totals kept across runs
+PARTITION_DIR = 'output/partitions' # append-only export with --partitions
+ALERT_FEED_SIZE = 10                # alerts listed under PEAK LOAD in summary.txt
+WEATHER_TABLE_SIZE = 10             # buildings listed under WEATHER NORMALIZATION in summary.txt
+PEAK_TABLE_SIZE = 10                # buildings listed under PEAK DEMAND in summary.txt
+GRAIN = 'hour'                      # campus totals written by --intervals
+PROFILE_DEPTH = 1                   # span nesting printed by --profile (the files hold every span)
 
 
 #TASK 1: DATA INGESTION AND VALIDATION
-print("\nTASK 1: Loading data from CSV files...")
-print("-" * 60)
-
-manager = BuildingManager()
-
-all_data_list = []
-
-data_dir = "data"
-if not os.path.exists(data_dir):
-    print(f"Creating '{data_dir}' directory...")
-    os.makedirs(data_dir)
-    print(f"⚠️  Please add your CSV files to the '{data_dir}' folder and run again!")
-else:
-    print(f"✓ Found '{data_dir}' directory")
-    
-    csv_files = []
-    for filename in os.listdir(data_dir):
-        if filename.endswith('.csv'):
-            csv_files.append(filename)
-    
-    print(f"✓ Found {len(csv_files)} CSV file(s)")
-    
-    for filename in csv_files:    #load csv file
-        filepath = os.path.join(data_dir, filename)
+
+@timed('ingest')
+def load_data(data_dir=DATA_DIR, workers=LOAD_WORKERS, mode=LOAD_MODE, streaming=False,
+              chunk_size=CHUNK_SIZE, cache_dir=CACHE_DIR, rollups=None, export_path=None,
+              anomalies=None, partitions=None, store=None):
+    """Load every CSV in data_dir into a BuildingManager (and df_combined).
+
+    streaming=True reads in chunks and never builds df_combined; each chunk is
+    appended to export_path (if given) and folded into rollups (if given).
+    cache_dir=None disables the parsed-data cache.
+    anomalies (an AnomalyEngine) is fed chunk by chunk in streaming mode, and
+    from df_combined by aggregate() otherwise. partitions (a PartitionedExport)
+    likewise gets each chunk in streaming mode, and df_combined from
+    export_results() otherwise. With a MeterStore in store the buildings'
+    readings are memory-mapped from (and appended to) its files, even in
+    streaming mode, and the store is flushed at the end.
+
+    Returns a dict with manager, df_combined, aggregates (streaming only),
+    rollups, anomalies, has_data, streaming and export_path.
+    """
+    print("\nTASK 1: Loading data from CSV files...")
+    print("-" * 60)
+
+    # in streaming mode buildings keep running statistics only, not every reading (unless stored on disk)
+    manager = BuildingManager(keep_readings=not streaming or store is not None, store=store)
+    stored = store.readings if store is not None else 0
+    aggregates = None
+    all_data_list = []
+
+    if not os.path.exists(data_dir):
+        print(f"Creating '{data_dir}' directory...")
+        os.makedirs(data_dir)
+        print(f"⚠️  Please add your CSV files to the '{data_dir}' folder and run again!")
+        results = []
+    else:
+        print(f"✓ Found '{data_dir}' directory")
+
+        csv_files = list_csv_files(data_dir)
+
+        print(f"✓ Found {len(csv_files)} CSV file(s)")
+
+        filepaths = [os.path.join(data_dir, filename) for filename in csv_files]
+        if streaming:
+            # chunks go straight into the manager, the aggregates and the cleaned CSV
+            if export_path:
+                os.makedirs(os.path.dirname(export_path) or '.', exist_ok=True)
+            with span('stream_csv_files', files=len(filepaths)):
+                results, aggregates = stream_csv_files(filepaths, manager, chunk_size,
+                                                       export_path=export_path, rollups=rollups,
+                                                       anomalies=anomalies, partitions=partitions)
+                annotate(rows=aggregates.records)
+        else:
+            # parse all files concurrently (or map them from the cache), then merge in file order
+            cache = MeterCache(cache_dir) if cache_dir else None
+            load_start = time.perf_counter()
+            with span('load_csv_files', files=len(filepaths), workers=workers, mode=mode):
+                results = load_csv_files(filepaths, workers=workers, mode=mode, cache=cache)
+                profile_file_loads(results)
+            load_seconds = time.perf_counter() - load_start
+            cached_files = sum(1 for result in results if result['cached'])
+            print(f"✓ Read {len(results)} file(s) in {load_seconds:.3f} s "
+                  f"({cached_files} from cache, {len(results) - cached_files} parsed)")
+
+    for result in results:
+        filename = result['filename']
+        building_name = result['building']
         print(f"\nLoading: {filename}")
-        
-        try:
-            
-            df = pd.read_csv(filepath, on_bad_lines='skip')
-            
-            building_name = filename.replace('.csv', '')
-            
 
+        if result['status'] == 'ok' and streaming:
+            manager.add_building(building_name)
+            print(f"  ✓ Streamed {result['records']} records from {building_name}")
+        elif result['status'] == 'ok':
+            df = result['df']
+            manager.add_building(building_name)
+            with span('load_frame', rows=len(df), building=building_name):
+                manager.load_frame(df, building_name)
+            all_data_list.append(df)
+            print(f"  ✓ Loaded {len(df)} records from {building_name}")
+        elif result['status'] == 'missing_columns':
             manager.add_building(building_name)
-            building = manager.get_building(building_name)
-            
-            if 'Date' in df.columns and 'kWh' in df.columns:
-
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-
-                df['Building'] = building_name
-                
-                for index, row in df.iterrows():
-                    if pd.notna(row['Date']) and pd.notna(row['kWh']):
-                        building.add_reading(row['Date'], row['kWh'])
-                
-                all_data_list.append(df)
-                
-                print(f"  ✓ Loaded {len(df)} records from {building_name}")
-            else:
-                print(f"  ⚠️  Missing required columns (Date, kWh) in {filename}")
-                
-        except FileNotFoundError:
+            print(f"  ⚠️  Missing required columns (Date, kWh) in {filename}")
+        elif result['status'] == 'not_found':
             print(f"  ✗ File not found: {filename}")
-        except Exception as e:
-            print(f"  ✗ Error reading {filename}: {str(e)}")
-
-# Combine all DataFrames into one
-
-if len(all_data_list) > 0:
-    df_combined = pd.concat(all_data_list, ignore_index=True)
-    print(f"\n✓ Combined dataset has {len(df_combined)} total records")
-    print(f"✓ Tracking {len(manager.get_all_buildings())} buildings")
-else:
-    print("\n⚠️  No data loaded! Please add CSV files to the data folder.")
-    print("   Each CSV should have 'Date' and 'kWh' columns")
-    df_combined = pd.DataFrame()  # Empty dataframe
-
-
-# TASK 2: CORE AGGREGATION LOGIC 
-print("\n" + "=" * 60)
-print("TASK 2: Calculating statistics and aggregations...")
-print("-" * 60)
-
+        else:
+            print(f"  ✗ Error reading {filename}: {result['error']}")
+
+    # Combine all DataFrames into one
+
+    df_combined = pd.DataFrame()  # stays empty in streaming mode
+    has_data = False
+
+    if len(all_data_list) > 0:
+        with span('combine'):
+            df_combined = pd.concat(all_data_list, ignore_index=True)
+            df_combined['Building'] = df_combined['Building'].astype('category')
+            df_combined['Hour'] = df_combined['Date'].dt.hour
+        annotate(rows=len(df_combined))
+        has_data = True
+        print(f"\n✓ Combined dataset has {len(df_combined)} total records")
+        print(f"✓ Tracking {len(manager.get_all_buildings())} buildings")
+    elif aggregates is not None and aggregates.records > 0:
+        annotate(rows=aggregates.records)
+        has_data = True
+        print(f"\n✓ Streamed {aggregates.records} total records (no combined frame kept)")
+        print(f"✓ Tracking {len(manager.get_all_buildings())} buildings")
+    else:
+        print("\n⚠️  No data loaded! Please add CSV files to the data folder.")
+        print("   Each CSV should have 'Date' and 'kWh' columns")
+
+    if store is not None:
+        with span('store.flush'):
+            store.flush()
+        print(f"✓ Stored {store.readings - stored} new reading(s) in {store.store_dir} "
+              f"({store.readings} in total)")
+
+    return {
+        'manager': manager,
+        'df_combined': df_combined,
+        'aggregates': aggregates,
+        'rollups': rollups,
+        'anomalies': anomalies,
+        'has_data': has_data,
+        'streaming': streaming,
+        'export_path': export_path if streaming else None,
+        'partitions': partitions,
+    }
+
+
+def profile_file_loads(results):
+    """Add one load_csv span per parsed file (with read_csv/to_datetime/to_numeric steps)
+
+    The files may have been parsed in worker processes, so the spans are built
+    from the timings read_meter_csv() returns rather than measured here.
+    """
+    if not PROFILER.enabled:
+        return
+    depth = PROFILER.depth
+    for result in results:
+        timings = result.get('timings')
+        if not timings:
+            continue   # memory-mapped from the cache
+        rows = len(result['df']) if result['df'] is not None else None
+        steps = [step for step in ('read_csv', 'to_datetime', 'to_numeric') if step in timings]
+        started = timings['started']
+        PROFILER.add('load_csv', sum(timings[step] for step in steps), rows=rows, depth=depth,
+                     started=started, file=result['filename'], status=result['status'])
+        for step in steps:
+            PROFILER.add(step, timings[step], rows=rows, parent='load_csv', depth=depth + 1,
+                         started=started, file=result['filename'])
+            started += timings[step]
+
+
+# TASK 2: CORE AGGREGATION LOGIC
+
+@timed(rows=len)
 def calculate_daily_totals(df):
     """Calculate total kWh for each day"""
     if df.empty:
         return pd.DataFrame()
-    
-    df['Date'] = pd.to_datetime(df['Date'])
-    daily = df.groupby(df['Date'].dt.date)['kWh'].sum().reset_index()
-    daily.columns = ['Date', 'Total_kWh']
-    return daily
+
+    days = period_starts(pd.to_datetime(df['Date']), 'day')  # leave the caller's frame untouched
+    daily = df['kWh'].groupby(days).sum()
+    return pd.DataFrame({'Date': daily.index, 'Total_kWh': daily.values})
 
 
+@timed(rows=len)
 def calculate_weekly_aggregates(df):
     """Calculate weekly totals and averages"""
     if df.empty:
@@ -224,37 +231,107 @@ def calculate_weekly_aggregates(df):
     weekly.columns = ['Week', 'Total_kWh']
     return weekly
 
-def building_wise_summary(df):
-    """Create summary statistics for each building"""
+@timed(rows=len)
+def building_wise_summary(df, groups=None, percentiles=None, include_std=False):
+    """Create summary statistics for each building in one grouped pass
+
+    groups: an existing df.groupby('Building') to reuse
+    percentiles: e.g. [0.25, 0.5, 0.95] adds 'p25', 'p50', 'p95' entries
+    include_std: adds a 'std' entry
+
+    Like BuildingManager.get_building_summary() (the --streaming path), count
+    is the number of valid readings (kWh and Date present), and buildings
+    without any are left out.
+    """
     if df.empty:
         return {}
-    
-    summary = {}
-    buildings = df['Building'].unique()
-    
-    for building in buildings:
-        building_data = df[df['Building'] == building]
-        summary[building] = {
-            'mean': building_data['kWh'].mean(),
-            'min': building_data['kWh'].min(),
-            'max': building_data['kWh'].max(),
-            'total': building_data['kWh'].sum(),
-            'count': len(building_data)
+
+    dated = df['Date'].notna()
+    if not dated.all():   # the manager skips readings without a timestamp too
+        df, groups = df[dated], None
+    if groups is None:
+        groups = df.groupby('Building', observed=True, sort=False)
+    kwh = groups['kWh']
+
+    stats = kwh.agg(['mean', 'min', 'max', 'sum', 'count'])
+    stats = stats.rename(columns={'sum': 'total'})
+    stats = stats[stats['count'] > 0]
+
+    if include_std:
+        stats['std'] = kwh.std()
+
+    if percentiles:
+        quantiles = kwh.quantile(percentiles).unstack()
+        for q in percentiles:
+            stats[f"p{q * 100:g}"] = quantiles[q]
+
+    return stats.to_dict(orient='index')
+
+
+@timed('aggregate')
+def aggregate(data):
+    """Daily/weekly totals and the building summary for the output of load_data().
+
+    Returns a dict with daily_totals, weekly_totals, building_summary,
+    building_groups (None in streaming mode), alerts (None without an
+    AnomalyEngine), weather, forecast and intervals (None until
+    weather_analysis(), forecast_consumption() and interval_analysis() fill
+    them in).
+    """
+    print("\n" + "=" * 60)
+    print("TASK 2: Calculating statistics and aggregations...")
+    print("-" * 60)
+
+    manager = data['manager']
+    df_combined = data['df_combined']
+    rollups = data['rollups']
+    anomalies = data.get('anomalies')
+    building_groups = None
+
+    if not data['has_data']:
+        print("⚠️  No data to aggregate")
+        return {
+            'daily_totals': pd.DataFrame(),
+            'weekly_totals': pd.DataFrame(),
+            'building_summary': {},
+            'building_groups': None,
+            'alerts': None,
+            'weather': None,
+            'forecast': None,
+            'intervals': None,
         }
-    
-    return summary
-
-if not df_combined.empty:
-    daily_totals = calculate_daily_totals(df_combined)
-    weekly_totals = calculate_weekly_aggregates(df_combined)
-    building_summary = building_wise_summary(df_combined)
-    
+
+    if data['streaming']:
+        totals_source = rollups if rollups is not None else data['aggregates']
+        daily_totals = totals_source.daily_totals()
+        weekly_totals = totals_source.weekly_totals()
+        building_summary = manager.get_building_summary()
+    else:
+        annotate(rows=len(df_combined))
+        if rollups is not None:
+            with span('rollups.update'):
+                rollups.update(df_combined)  # only readings past each building's watermark
+            daily_totals = rollups.daily_totals()
+            weekly_totals = rollups.weekly_totals()
+        else:
+            daily_totals = calculate_daily_totals(df_combined)
+            weekly_totals = calculate_weekly_aggregates(df_combined)
+        # one grouping of the rows by building, shared by the summary and the scatter plot
+        with span('groupby'):
+            building_groups = df_combined.groupby('Building', observed=True, sort=False)
+        building_summary = building_wise_summary(df_combined, groups=building_groups)
+        if anomalies is not None:
+            with span('anomalies.backfill', rows=len(df_combined)):
+                anomalies.backfill(df_combined)
+
+    if rollups is not None and rollups.skipped:
+        print(f"\n⚠️  Rollups: skipped {rollups.skipped} reading(s) at or before a building's watermark")
     print("\n✓ Daily totals calculated")
     print(f"  Total days: {len(daily_totals)}")
-    
+
     print("\n✓ Weekly totals calculated")
     print(f"  Total weeks: {len(weekly_totals)}")
-    
+
     print("\n✓ Building-wise summary:")
     for building_name, stats in building_summary.items():
         print(f"  {building_name}:")
@@ -262,39 +339,210 @@ if not df_combined.empty:
         print(f"    Min: {stats['min']:.2f} kWh")
         print(f"    Max: {stats['max']:.2f} kWh")
         print(f"    Total: {stats['total']:.2f} kWh")
-else:
-    daily_totals = pd.DataFrame()
-    weekly_totals = pd.DataFrame()
-    building_summary = {}
-    print("⚠️  No data to aggregate")
 
+    alerts = None
+    if anomalies is not None:
+        alerts = anomalies.alerts_frame()
+        print(f"\n✓ Anomaly scan: {len(alerts)} alert(s) in {anomalies.readings} readings "
+              f"(|z| >= {anomalies.z_threshold} vs the previous {anomalies.long_window.days} days)")
+
+    return {
+        'daily_totals': daily_totals,
+        'weekly_totals': weekly_totals,
+        'building_summary': building_summary,
+        'building_groups': building_groups,
+        'alerts': alerts,
+        'weather': None,   # filled in by weather_analysis()
+        'forecast': None,  # filled in by forecast_consumption()
+        'intervals': None, # filled in by interval_analysis()
+    }
+
+
+def print_range(manager, start, end, buildings=None):
+    """Print count/sum/mean/min/max per building for start <= time < end (BuildingManager.query)"""
+    print(f"\nReadings from {start} to {end} (end excluded):")
+    try:
+        ranges = manager.query(buildings, start, end, ['count', 'sum', 'mean', 'min', 'max'])
+    except ValueError as e:
+        print(f"  ⚠️  {e}")
+        return None
+    except KeyError as e:
+        print(f"  ✗ {e.args[0]}")
+        return None
+    for building_name, stats in ranges.items():
+        if stats['count'] == 0:
+            print(f"  {building_name}: no readings")
+            continue
+        print(f"  {building_name}: {stats['count']} readings, total {stats['sum']:.2f} kWh, "
+              f"mean {stats['mean']:.2f}, min {stats['min']:.2f}, max {stats['max']:.2f} kWh")
+    return ranges
+
+
+@timed('weather')
+def weather_analysis(data, weather_path, station=None, balance_point=BALANCE_POINT):
+    """Join the loaded readings with daily weather and fit each building's degree-day model.
+
+    Returns the dict from weather_join.weather_normalize() (models, joined,
+    matched_days, balance_point) plus station and daily_weather, or None if
+    there is nothing to fit.
+    """
+    print("\n" + "=" * 60)
+    print("Weather normalization...")
+    print("-" * 60)
+
+    if not data['has_data']:
+        print("⚠️  No data to normalize")
+        return None
+    if not data['manager'].keep_readings:
+        print("⚠️  Weather normalization needs the readings, skipped in streaming mode")
+        return None
+
+    with span('load_weather'):
+        weather = load_weather_daily(weather_path, station)
+        annotate(rows=len(weather))
+    print(f"✓ Weather: {len(weather)} days from {weather_path}"
+          f"{' (' + station + ')' if station else ' (stations averaged)'}")
+
+    with span('fit_degree_days', buildings=len(data['manager'].get_all_buildings())):
+        weather_results = weather_normalize(data['manager'], weather, balance_point)
+    weather_results['station'] = station
+    weather_results['daily_weather'] = weather
+    models = weather_results['models']
+    fitted = models['R2'].notna().sum()
+    print(f"✓ {weather_results['matched_days']} day(s) matched to weather, "
+          f"{fitted} of {len(models)} building(s) fitted (balance point {balance_point:g}°C)")
+    if weather_results['matched_days'] == 0:
+        print("⚠️  The weather file does not overlap the meter data")
+    return weather_results
+
+
+@timed('forecast')
+def forecast_consumption(data, results, horizon=HORIZON, cache_dir=CACHE_DIR):
+    """Fit every building's day-of-week (+ temperature, with --weather) model and forecast ahead.
+
+    Returns a dict with forecaster, buildings (Date, Building, Forecast_kWh)
+    and campus (Date, Forecast_kWh), or None if there is nothing to fit.
+    Coefficients are cached in cache_dir/forecast.npz (cache_dir=None disables it).
+    """
+    print("\n" + "=" * 60)
+    print("Forecasting consumption...")
+    print("-" * 60)
+
+    if not data['has_data']:
+        print("⚠️  No data to forecast")
+        return None
+    if not data['manager'].keep_readings:
+        print("⚠️  Forecasting needs the readings, skipped in streaming mode")
+        return None
+
+    weather, balance_point = None, BALANCE_POINT
+    if results.get('weather') is not None:
+        weather, balance_point = results['weather']['daily_weather'], results['weather']['balance_point']
+    cache_path = os.path.join(cache_dir, 'forecast.npz') if cache_dir else None
+    forecaster = ConsumptionForecaster(balance_point=balance_point, cache_path=cache_path)
+    forecaster.fit(data['manager'], weather)
+
+    source = 'cached coefficients' if forecaster.cached else f"fitted in {forecaster.fit_seconds * 1000:.1f} ms"
+    model = 'day of week + degree days' if weather is not None else 'day of week'
+    print(f"✓ {len(forecaster.names)} building model(s) ({model}), {source}")
+
+    campus = forecaster.campus_forecast(horizon)
+    for day in campus.itertuples():
+        print(f"  {pd.Timestamp(day.Date):%a %Y-%m-%d}: {day.Forecast_kWh:,.2f} kWh")
+    return {'forecaster': forecaster, 'buildings': forecaster.forecast(horizon), 'campus': campus}
 
-# TASK 4: VISUAL OUTPUT WITH MATPLOTLIB 
-print("\n" + "=" * 60)
-print("TASK 4: Creating visualizations...")
-print("-" * 60)
 
-if not df_combined.empty and len(manager.get_all_buildings()) > 0:
+@timed('intervals')
+def interval_analysis(data, grain=GRAIN):
+    """Peak demand per building, campus totals at the grain and the hour x weekday load profile.
+
+    Returns the dict from interval_metrics.analyze_intervals() (grain, campus,
+    peaks, campus_peak, profile), or None if there is nothing to analyze.
+    """
+    print("\n" + "=" * 60)
+    print("Interval analysis...")
+    print("-" * 60)
+
+    if not data['has_data']:
+        print("⚠️  No data to analyze")
+        return None
+    if not data['manager'].keep_readings:
+        print("⚠️  Interval analysis needs the readings, skipped in streaming mode")
+        return None
+
+    intervals = analyze_intervals(data['manager'], grain)
+    if intervals is None:
+        print("⚠️  No building readings to analyze")
+        return None
+    peak = intervals['campus_peak']
+    print(f"✓ {len(intervals['campus'])} {grain} period(s), {len(intervals['peaks'])} building(s)")
+    print(f"✓ Campus peak demand: {peak['kW']:,.2f} kW ({peak['kWh']:,.2f} kWh in the {peak['Interval']} "
+          f"interval starting {peak['Time']})")
+    if intervals['profile'] is None:
+        print("⚠️  Readings are a day or more apart, no hour-of-week load profile")
+    return intervals
+
+
+# TASK 4: VISUAL OUTPUT WITH MATPLOTLIB
+
+@timed('plot')
+def plot_dashboard(data, results, path=DASHBOARD_PATH, dpi=DASHBOARD_DPI, fast=False,
+                   max_points=FAST_MAX_POINTS):
+    """Draw the three-panel dashboard and save it to path.
+
+    fast=True uses the Agg backend, draws at most max_points per series
+    (LTTB for the daily line, per-bucket min/max for each building's scatter)
+    and smaller markers. Returns the render time in seconds.
+    """
+    print("\n" + "=" * 60)
+    print("TASK 4: Creating visualizations...")
+    print("-" * 60)
+
+    manager = data['manager']
+    df_combined = data['df_combined']
+    daily_totals = results['daily_totals']
+    building_summary = results['building_summary']
+
+    if not data['has_data'] or len(manager.get_all_buildings()) == 0:
+        print("⚠️  Not enough data to create visualizations")
+        return None
+
+    import matplotlib  # imported here so ingest/aggregate runs skip it
+    if fast:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    render_start = time.perf_counter()
 
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 14))
     fig.suptitle('Campus Energy Consumption Dashboard', fontsize=16, fontweight='bold')
-    
+
 
     if not daily_totals.empty:
-        daily_totals['Date'] = pd.to_datetime(daily_totals['Date'])
-        ax1.plot(daily_totals['Date'], daily_totals['Total_kWh'], 
+        days = pd.to_datetime(daily_totals['Date']).to_numpy()
+        day_totals = daily_totals['Total_kWh'].to_numpy()
+        if fast:
+            keep = lttb_indices(days, day_totals, max_points)
+            days, day_totals = days[keep], day_totals[keep]
+        ax1.plot(days, day_totals,
                  color='blue', linewidth=2, marker='o', markersize=3)
+        if results.get('forecast') is not None:
+            campus = results['forecast']['campus']
+            ax1.plot(campus['Date'].to_numpy(), campus['Forecast_kWh'].to_numpy(),
+                     color='orange', linewidth=2, linestyle='--', marker='o', markersize=3,
+                     label=f"{len(campus)}-day forecast")
+            ax1.legend(loc='best', fontsize=8)
         ax1.set_xlabel('Date', fontsize=10)
         ax1.set_ylabel('Total Energy (kWh)', fontsize=10)
         ax1.set_title('Daily Energy Consumption Over Time', fontsize=12, fontweight='bold')
         ax1.grid(True, alpha=0.3)
         ax1.tick_params(axis='x', rotation=45)
-    
+
 
     if building_summary:
         buildings = list(building_summary.keys())
         averages = [building_summary[b]['mean'] for b in buildings]
-        
+
         colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
         ax2.bar(buildings, averages, color=colors[:len(buildings)], alpha=0.7, edgecolor='black')
         ax2.set_xlabel('Building', fontsize=10)
@@ -302,92 +550,168 @@ if not df_combined.empty and len(manager.get_all_buildings()) > 0:
         ax2.set_title('Average Energy Usage by Building', fontsize=12, fontweight='bold')
         ax2.grid(True, alpha=0.3, axis='y')
         ax2.tick_params(axis='x', rotation=45)
-    
 
-    if not df_combined.empty:
 
-        df_combined['Hour'] = pd.to_datetime(df_combined['Date']).dt.hour
+    if not df_combined.empty:
 
-        buildings = df_combined['Building'].unique()
         colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
-        
-        for i, building in enumerate(buildings):
-            building_data = df_combined[df_combined['Building'] == building]
-            ax3.scatter(building_data['Date'], building_data['kWh'], 
-                       label=building, alpha=0.6, s=50, 
+        dates = df_combined['Date'].to_numpy()
+        kwh = df_combined['kWh'].to_numpy()
+
+        building_rows = results['building_groups'].indices
+        for i, (building, rows) in enumerate(building_rows.items()):
+            if fast:
+                # split the point budget between buildings, keeping each bucket's extremes
+                buckets = max(max_points // (2 * len(building_rows)), 1)
+                rows = rows[minmax_indices(kwh[rows], buckets)]
+            ax3.scatter(dates[rows], kwh[rows],
+                       label=building, alpha=0.6, s=10 if fast else 50,
                        color=colors[i % len(colors)])
-        
+
         ax3.set_xlabel('Date', fontsize=10)
         ax3.set_ylabel('Energy Usage (kWh)', fontsize=10)
         ax3.set_title('Energy Consumption Pattern by Building', fontsize=12, fontweight='bold')
         ax3.legend(loc='best', fontsize=8)
         ax3.grid(True, alpha=0.3)
         ax3.tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    plt.savefig('dashboard.png', dpi=300, bbox_inches='tight')
-    print("✓ Saved: dashboard.png")
-    plt.close()
-else:
-    print("⚠️  Not enough data to create visualizations")
-
 
-# TASK 5: PERSISTENCE AND EXECUTIVE SUMMARY 
-print("\n" + "=" * 60)
-print("TASK 5: Exporting data and generating summary...")
-print("-" * 60)
+    with span('tight_layout'):
+        plt.tight_layout()
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    render_seconds = time.perf_counter() - render_start
+    print(f"✓ Saved: {path} ({render_seconds:.2f} s at {dpi} dpi)")
+    return render_seconds
+
+
+@timed('load_profile')
+def plot_load_profile(intervals, path, dpi=DASHBOARD_DPI):
+    """Heatmap of the campus load by hour of day and day of week; returns the path"""
+    import matplotlib.pyplot as plt
+
+    profile = intervals['profile']
+    fig, ax = plt.subplots(figsize=(12, 4))
+    image = ax.imshow(profile.to_numpy(), aspect='auto', cmap='YlOrRd')
+    ax.set_xticks(range(24))
+    ax.set_yticks(range(len(profile.index)))
+    ax.set_yticklabels(profile.index)
+    ax.set_xlabel('Hour of day', fontsize=10)
+    ax.set_title('Campus Load Profile (average kWh per demand interval)', fontsize=12, fontweight='bold')
+    fig.colorbar(image, ax=ax, label='kWh')
+
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    print(f"✓ Saved: {path}")
+    return path
 
-if not os.path.exists('output'):
-    os.makedirs('output')
 
-if not df_combined.empty:
-    df_combined.to_csv('output/cleaned_energy_data.csv', index=False)
-    print("✓ Saved: output/cleaned_energy_data.csv")
+# TASK 5: PERSISTENCE AND EXECUTIVE SUMMARY
 
-if building_summary:
-    summary_df = pd.DataFrame.from_dict(building_summary, orient='index')
-    summary_df.to_csv('output/building_summary.csv')
-    print("✓ Saved: output/building_summary.csv")
+def build_summary_text(data, results):
+    """The executive summary written to summary.txt"""
+    manager = data['manager']
+    df_combined = data['df_combined']
+    daily_totals = results['daily_totals']
+    weekly_totals = results['weekly_totals']
 
-summary_text = "=" * 60 + "\n"
-summary_text += "CAMPUS ENERGY CONSUMPTION - EXECUTIVE SUMMARY\n"
-summary_text += "=" * 60 + "\n\n"
+    summary_text = "=" * 60 + "\n"
+    summary_text += "CAMPUS ENERGY CONSUMPTION - EXECUTIVE SUMMARY\n"
+    summary_text += "=" * 60 + "\n\n"
 
-if not df_combined.empty:
+    if not data['has_data']:
+        summary_text += "No data available for analysis.\n"
+        summary_text += "Please add CSV files to the 'data' directory.\n"
+        return summary_text
 
     total_consumption = manager.get_total_campus_consumption()
     summary_text += f"TOTAL CAMPUS CONSUMPTION: {total_consumption:,.2f} kWh\n\n"
-    
+
     highest_building, highest_consumption = manager.get_highest_consuming_building()
     summary_text += f"HIGHEST CONSUMING BUILDING:\n"
     summary_text += f"  {highest_building}: {highest_consumption:,.2f} kWh\n\n"
-    
+
     if not df_combined.empty:
         peak_row = df_combined.loc[df_combined['kWh'].idxmax()]
+    else:
+        peak_row = data['aggregates'].peak
+
+    if peak_row is not None:
         summary_text += f"PEAK LOAD:\n"
         summary_text += f"  Time: {peak_row['Date']}\n"
         summary_text += f"  Building: {peak_row['Building']}\n"
-        summary_text += f"  Usage: {peak_row['kWh']:.2f} kWh\n\n"
-    
+        summary_text += f"  Usage: {peak_row['kWh']:.2f} kWh\n"
+        alerts = results.get('alerts')
+        if alerts is not None:
+            anomalies = data['anomalies']
+            summary_text += f"  Alerts (|z| >= {anomalies.z_threshold} vs the previous "
+            summary_text += f"{anomalies.long_window.days} days): {len(alerts)}\n"
+            for alert in anomalies.feed(ALERT_FEED_SIZE).itertuples():
+                summary_text += (f"    {alert.Date}  {alert.Building}: {alert.kWh:.2f} kWh "
+                                 f"(z={alert.ZScore:+.1f}, baseline {alert.Baseline:.2f} kWh)\n")
+        summary_text += "\n"
+
     if not daily_totals.empty:
         avg_daily = daily_totals['Total_kWh'].mean()
         summary_text += f"DAILY TRENDS:\n"
         summary_text += f"  Average daily consumption: {avg_daily:.2f} kWh\n"
         summary_text += f"  Highest daily total: {daily_totals['Total_kWh'].max():.2f} kWh\n"
         summary_text += f"  Lowest daily total: {daily_totals['Total_kWh'].min():.2f} kWh\n\n"
-    
+
     if not weekly_totals.empty:
         avg_weekly = weekly_totals['Total_kWh'].mean()
         summary_text += f"WEEKLY TRENDS:\n"
         summary_text += f"  Average weekly consumption: {avg_weekly:.2f} kWh\n"
         summary_text += f"  Highest weekly total: {weekly_totals['Total_kWh'].max():.2f} kWh\n\n"
-    
+
+    intervals = results.get('intervals')
+    if intervals is not None:
+        peak = intervals['campus_peak']
+        summary_text += f"PEAK DEMAND:\n"
+        summary_text += f"  Campus: {peak['kW']:,.2f} kW ({peak['kWh']:,.2f} kWh in the {peak['Interval']} "
+        summary_text += f"interval starting {peak['Time']})\n"
+        if intervals['profile'] is not None:
+            profile = intervals['profile'].stack()
+            busiest_day, busiest_hour = profile.idxmax()
+            summary_text += f"  Busiest hour of the week: {busiest_day} {busiest_hour:02d}:00 "
+            summary_text += f"({profile.max():,.2f} kWh per interval on average)\n"
+        largest = intervals['peaks'].sort_values('Peak_kW', ascending=False).head(PEAK_TABLE_SIZE)
+        for building in largest.itertuples():
+            summary_text += (f"  {building.Building}: {building.Peak_kW:,.2f} kW at {building.Peak_Time}, "
+                             f"average {building.Average_kW:,.2f} kW, load factor {building.Load_factor:.2f}\n")
+        if len(intervals['peaks']) > PEAK_TABLE_SIZE:
+            summary_text += f"  ... {len(intervals['peaks']) - PEAK_TABLE_SIZE} more in peak_demand.csv\n"
+        summary_text += "\n"
+
+    forecast = results.get('forecast')
+    if forecast is not None:
+        summary_text += f"{len(forecast['campus'])}-DAY FORECAST (campus total):\n"
+        for day in forecast['campus'].itertuples():
+            summary_text += f"  {pd.Timestamp(day.Date):%a %Y-%m-%d}: {day.Forecast_kWh:,.2f} kWh\n"
+        summary_text += "\n"
+
+    weather_results = results.get('weather')
+    if weather_results is not None:
+        models = weather_results['models'].dropna(subset=['R2'])
+        summary_text += f"WEATHER NORMALIZATION (balance point {weather_results['balance_point']:g}°C, "
+        summary_text += f"{weather_results['matched_days']} days matched):\n"
+        largest = models.sort_values('Actual_daily_kWh', ascending=False).head(WEATHER_TABLE_SIZE)
+        for model in largest.itertuples():
+            summary_text += (f"  {model.Building}: {model.Actual_daily_kWh:.2f} kWh/day actual, "
+                             f"{model.Normalized_daily_kWh:.2f} normalized "
+                             f"(base {model.Baseload_kWh:.2f}, {model.Heating_kWh_per_HDD:+.2f}/HDD, "
+                             f"{model.Cooling_kWh_per_CDD:+.2f}/CDD, R² {model.R2:.2f})\n")
+        if len(models) > WEATHER_TABLE_SIZE:
+            summary_text += f"  ... {len(models) - WEATHER_TABLE_SIZE} more in weather_normalized.csv\n"
+        summary_text += "\n"
+
     summary_text += "BUILDING-BY-BUILDING BREAKDOWN:\n"
     summary_text += "-" * 60 + "\n"
     for building_name in manager.get_all_buildings():
         building = manager.get_building(building_name)
         summary_text += building.generate_report()
-    
+
     summary_text += "\n" + "=" * 60 + "\n"
     summary_text += "RECOMMENDATIONS:\n"
     summary_text += "- Focus energy-saving initiatives on high-consumption buildings\n"
@@ -395,28 +719,245 @@ if not df_combined.empty:
     summary_text += "- Consider renewable energy sources for major consumers\n"
     summary_text += "- Implement automated monitoring systems\n"
     summary_text += "=" * 60 + "\n"
-else:
-    summary_text += "No data available for analysis.\n"
-    summary_text += "Please add CSV files to the 'data' directory.\n"
-
-# Saving summary
-with open('output/summary.txt', 'w') as f:
-    f.write(summary_text)
-
-print("✓ Saved: output/summary.txt")
-
-# Printtttt
-print("\n" + "=" * 60)
-print("EXECUTIVE SUMMARY")
-print("=" * 60)
-print(summary_text)
-
-print("\n" + "=" * 60)
-print("✅ ANALYSIS COMPLETE!")
-print("=" * 60)
-print("\nGenerated files:")
-print("  1. output/cleaned_energy_data.csv")
-print("  2. output/building_summary.csv")
-print("  3. output/summary.txt")
-print("  4. dashboard.png")
-print("\nReady to upload to GitHub!")
+    return summary_text
+
+
+@timed('export')
+def export_results(data, results, output_dir=OUTPUT_DIR):
+    """Write cleaned data, building summary and summary.txt; returns the summary text
+
+    With a PartitionedExport in data['partitions'] the cleaned rows are
+    appended to it (new rows only) instead of rewriting cleaned_energy_data.csv.
+    """
+    print("\n" + "=" * 60)
+    print("TASK 5: Exporting data and generating summary...")
+    print("-" * 60)
+
+    os.makedirs(output_dir, exist_ok=True)
+    cleaned_path = os.path.join(output_dir, 'cleaned_energy_data.csv')
+    building_summary = results['building_summary']
+
+    partitions = data.get('partitions')
+    if partitions is not None and not data['df_combined'].empty:
+        with span('append_partitions', rows=len(data['df_combined'])):
+            written = partitions.append(data['df_combined'])
+        print(f"✓ Appended {written['rows']} new row(s) in {written['parts']} part file(s) to "
+              f"{partitions.export_dir} ({written['skipped']} already exported)")
+    elif partitions is not None and data['streaming']:
+        print(f"✓ Appended to {partitions.export_dir} chunk by chunk while streaming "
+              f"({len(partitions.manifest['parts'])} part file(s) in total)")
+    elif not data['df_combined'].empty:
+        with span('write_cleaned_csv', rows=len(data['df_combined'])):
+            data['df_combined'].to_csv(cleaned_path, index=False)
+        print(f"✓ Saved: {cleaned_path}")
+    elif data['export_path']:
+        print(f"✓ Saved: {data['export_path']} (written chunk by chunk while streaming)")
+
+    if building_summary:
+        with span('write_building_summary', rows=len(building_summary)):
+            summary_df = pd.DataFrame.from_dict(building_summary, orient='index')
+            summary_df.to_csv(os.path.join(output_dir, 'building_summary.csv'))
+        print(f"✓ Saved: {os.path.join(output_dir, 'building_summary.csv')}")
+
+    if results.get('alerts') is not None:
+        with span('write_alerts', rows=len(results['alerts'])):
+            results['alerts'].to_csv(os.path.join(output_dir, 'alerts.csv'), index=False)
+        print(f"✓ Saved: {os.path.join(output_dir, 'alerts.csv')}")
+
+    if results.get('weather') is not None:
+        with span('write_weather', rows=len(results['weather']['models'])):
+            results['weather']['models'].to_csv(os.path.join(output_dir, 'weather_normalized.csv'),
+                                                index=False)
+            results['weather']['joined'].to_csv(os.path.join(output_dir, 'weather_joined.csv'),
+                                                index=False)
+        print(f"✓ Saved: {os.path.join(output_dir, 'weather_normalized.csv')}")
+        print(f"✓ Saved: {os.path.join(output_dir, 'weather_joined.csv')}")
+
+    if results.get('forecast') is not None:
+        with span('write_forecast', rows=len(results['forecast']['buildings'])):
+            results['forecast']['buildings'].to_csv(os.path.join(output_dir, 'forecast.csv'), index=False)
+        print(f"✓ Saved: {os.path.join(output_dir, 'forecast.csv')}")
+
+    if results.get('intervals') is not None:
+        intervals = results['intervals']
+        totals_path = os.path.join(output_dir, f"totals_{intervals['grain']}.csv")
+        with span('write_intervals', rows=len(intervals['campus'])):
+            intervals['campus'].to_csv(totals_path, index=False)
+            intervals['peaks'].to_csv(os.path.join(output_dir, 'peak_demand.csv'), index=False)
+            if intervals['profile'] is not None:
+                intervals['profile'].to_csv(os.path.join(output_dir, 'load_profile.csv'), index_label='Day')
+        print(f"✓ Saved: {totals_path}")
+        print(f"✓ Saved: {os.path.join(output_dir, 'peak_demand.csv')}")
+        if intervals['profile'] is not None:
+            print(f"✓ Saved: {os.path.join(output_dir, 'load_profile.csv')}")
+
+    with span('write_summary'):
+        summary_text = build_summary_text(data, results)
+
+        # Saving summary
+        with open(os.path.join(output_dir, 'summary.txt'), 'w') as f:
+            f.write(summary_text)
+
+    print(f"✓ Saved: {os.path.join(output_dir, 'summary.txt')}")
+
+    # Printtttt
+    print("\n" + "=" * 60)
+    print("EXECUTIVE SUMMARY")
+    print("=" * 60)
+    print(summary_text)
+    return summary_text
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Campus energy-use dashboard")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help="stages to run (ingest is always run; plot/export also run aggregate)")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--dashboard', default=DASHBOARD_PATH, help="path of the dashboard PNG")
+    parser.add_argument('--dpi', type=int, default=None,
+                        help=f"dashboard resolution (default {DASHBOARD_DPI}, or 100 with --fast)")
+    parser.add_argument('--fast', action='store_true',
+                        help="fast render: Agg backend and downsampled series")
+    parser.add_argument('--max-points', type=int, default=FAST_MAX_POINTS,
+                        help="points per series in --fast mode")
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS,
+                        help="parallel CSV readers (1 = sequential)")
+    parser.add_argument('--mode', choices=('thread', 'process'), default=LOAD_MODE)
+    parser.add_argument('--streaming', action='store_true',
+                        help="read in chunks and never build the combined frame")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="always re-parse every CSV")
+    parser.add_argument('--rollups', action='store_true',
+                        help="keep incremental daily/weekly/monthly totals in --rollup-dir")
+    parser.add_argument('--rollup-dir', default=ROLLUP_DIR)
+    parser.add_argument('--partitions', action='store_true',
+                        help="append new rows to per-building, per-month part files in --partition-dir "
+                             "instead of rewriting cleaned_energy_data.csv")
+    parser.add_argument('--partition-dir', default=PARTITION_DIR)
+    parser.add_argument('--partition-format', choices=FORMATS, default='npz')
+    parser.add_argument('--compression', default=None,
+                        help="compress the part files (e.g. gzip for csv/parquet; any value for npz)")
+    parser.add_argument('--store', default=None, metavar='DIR',
+                        help="keep every building's readings in memory-mapped files under DIR; each run "
+                             "appends the readings newer than what is stored")
+    parser.add_argument('--store-dtype', choices=KWH_DTYPES, default='float64',
+                        help="kWh file type of a new --store (float32 halves its size)")
+    parser.add_argument('--alerts', action='store_true',
+                        help="flag spikes against each building's rolling 7-day baseline")
+    parser.add_argument('--z-threshold', type=float, default=Z_THRESHOLD,
+                        help="|z-score| at which a reading is flagged")
+    parser.add_argument('--weather', default=None, metavar='CSV',
+                        help="daily weather (cleaned_weather_data.csv or weatherAUS.csv) for degree-day "
+                             "normalization")
+    parser.add_argument('--weather-station', default=None, help="Location to use (default: average of all)")
+    parser.add_argument('--balance-point', type=float, default=BALANCE_POINT,
+                        help="temperature (°C) below which buildings heat and above which they cool")
+    parser.add_argument('--forecast', action='store_true',
+                        help="forecast each building's next days (day-of-week model, plus temperature "
+                             "with --weather)")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="days forecast with --forecast")
+    parser.add_argument('--intervals', action='store_true',
+                        help="peak demand per building, an hour x weekday load profile heatmap and "
+                             "campus totals at --grain")
+    parser.add_argument('--grain', choices=GRAINS, default=GRAIN,
+                        help="period of the campus totals written by --intervals")
+    parser.add_argument('--range', nargs=2, metavar=('START', 'END'), default=None,
+                        help="print per-building count/sum/mean/min/max for START <= time < END")
+    parser.add_argument('--range-buildings', nargs='+', default=None,
+                        help="buildings for --range (default: all)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every stage and hot step; writes profile.json/.csv to --output-dir")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="with --profile, also record each span's peak traced allocation (slower)")
+    parser.add_argument('--cprofile', default=None, metavar='PATH',
+                        help="run under cProfile and dump the stats to PATH (read with pstats/snakeviz)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = set(args.stages) | {'ingest'}
+    if 'plot' in stages or 'export' in stages:
+        stages.add('aggregate')
+
+    print("=" * 60)
+    print("CAMPUS ENERGY DASHBOARD - STARTING ANALYSIS")
+    print("=" * 60)
+
+    rollups = RollupStore(args.rollup_dir) if args.rollups else None
+    anomalies = AnomalyEngine(z_threshold=args.z_threshold) if args.alerts else None
+    store = MeterStore(args.store, kwh_dtype=args.store_dtype) if args.store else None
+    partitions = None
+    if args.partitions and 'export' in stages:
+        partitions = PartitionedExport(args.partition_dir, fmt=args.partition_format,
+                                       compression=args.compression)
+    export_path = None
+    if args.streaming and 'export' in stages and partitions is None:
+        export_path = os.path.join(args.output_dir, 'cleaned_energy_data.csv')
+
+    if args.profile:
+        PROFILER.enable(trace_memory=args.trace_memory)
+
+    with cprofile_to(args.cprofile):
+        data = load_data(args.data_dir, workers=args.workers, mode=args.mode,
+                         streaming=args.streaming, chunk_size=args.chunk_size,
+                         cache_dir=None if args.no_cache else args.cache_dir,
+                         rollups=rollups, export_path=export_path, anomalies=anomalies,
+                         partitions=partitions, store=store)
+
+        if args.range:
+            with span('range_query'):
+                print_range(data['manager'], *args.range, buildings=args.range_buildings)
+        if 'aggregate' in stages:
+            results = aggregate(data)
+            if args.weather:
+                results['weather'] = weather_analysis(data, args.weather, args.weather_station,
+                                                      args.balance_point)
+            if args.forecast:
+                results['forecast'] = forecast_consumption(data, results, args.horizon,
+                                                           cache_dir=None if args.no_cache else args.cache_dir)
+            if args.intervals:
+                results['intervals'] = interval_analysis(data, args.grain)
+        if 'plot' in stages:
+            dpi = args.dpi or (100 if args.fast else DASHBOARD_DPI)
+            plot_dashboard(data, results, args.dashboard, dpi=dpi, fast=args.fast,
+                           max_points=args.max_points)
+            if results.get('intervals') is not None and results['intervals']['profile'] is not None:
+                plot_load_profile(results['intervals'],
+                                  os.path.join(os.path.dirname(args.dashboard), 'load_profile.png'), dpi=dpi)
+        if 'export' in stages:
+            export_results(data, results, args.output_dir)
+
+    if args.cprofile:
+        print(f"\n✓ Saved: {args.cprofile} (python -m pstats {args.cprofile})")
+    if args.profile:
+        PROFILER.disable()
+        os.makedirs(args.output_dir, exist_ok=True)
+        json_path, csv_path = PROFILER.write(args.output_dir)
+        print("\n" + "=" * 60)
+        print("PROFILE")
+        print("=" * 60)
+        print(PROFILER.report(PROFILE_DEPTH))
+        print(f"✓ Saved: {json_path}")
+        print(f"✓ Saved: {csv_path}")
+
+    print("\n" + "=" * 60)
+    print("✅ ANALYSIS COMPLETE!")
+    print("=" * 60)
+    if 'export' in stages:
+        print("\nGenerated files:")
+        if partitions is not None:
+            print(f"  1. {partitions.manifest_path} (and its part files)")
+        else:
+            print(f"  1. {os.path.join(args.output_dir, 'cleaned_energy_data.csv')}")
+        print(f"  2. {os.path.join(args.output_dir, 'building_summary.csv')}")
+        print(f"  3. {os.path.join(args.output_dir, 'summary.txt')}")
+        if 'plot' in stages:
+            print(f"  4. {args.dashboard}")
+        print("\nReady to upload to GitHub!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# Forecasting
+# Next-week consumption forecasts for every building from one batched fit.
+#
+# Each building's daily totals over the last FIT_DAYS days are fitted to
+#
+#   daily kWh = level for that day of the week (+ a * HDD + b * CDD with weather)
+#
+# i.e. a day-of-week seasonal baseline with an optional temperature regressor
+# (degree days as in weather_join.py). All buildings share the design matrix,
+# so the fit is one set of batched normal equations (fit_masked_least_squares)
+# instead of a loop over buildings. Future temperatures are not known, so the
+# forecast uses the weather record's average temperature for the same calendar
+# day (its climatology).
+#
+# Fitted coefficients are cached in an .npz file keyed by a hash of the fitted
+# window and the settings; an unchanged dataset reuses them without refitting.
+
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from weather_join import daily_matrix, degree_days, fit_masked_least_squares, BALANCE_POINT, DAY_NS
+
+FIT_DAYS = 56            # trailing days each building is fitted on (8 of each weekday)
+HORIZON = 7              # days forecast
+MIN_DAY_FRACTION = 0.5   # days with fewer readings than this share of the building's usual count are left out
+FORECAST_COLUMNS = ['Date', 'Building', 'Forecast_kWh']
+
+
+def day_of_week(days):
+    """Monday=0 ... Sunday=6 for datetime64 days (integer arithmetic, 1970-01-01 was a Thursday)"""
+    return (np.asarray(days, dtype='datetime64[D]').view('int64') + 3) % 7
+
+
+def design_matrix(days, temperature=None, balance_point=BALANCE_POINT):
+    """(days, 7) weekday indicators, plus HDD and CDD columns when temperature is given"""
+    columns = np.eye(7)[day_of_week(days)]
+    if temperature is None:
+        return columns
+    hdd, cdd = degree_days(temperature, balance_point)
+    return np.column_stack([columns, hdd, cdd])
+
+
+def climatology(weather, days):
+    """Average AvgTemp of the weather record on the same calendar day (month/day) as each of days"""
+    dates = pd.to_datetime(weather['Date'])
+    by_day = weather['AvgTemp'].groupby([dates.dt.month, dates.dt.day]).mean()
+    targets = pd.to_datetime(days)
+    keys = pd.MultiIndex.from_arrays([targets.month, targets.day])
+    temperature = by_day.reindex(keys).to_numpy(dtype=np.float64)
+    return np.where(np.isnan(temperature), weather['AvgTemp'].mean(), temperature)
+
+
+class ConsumptionForecaster:
+    """Fits every building's day-of-week (+ temperature) model at once and forecasts ahead"""
+
+    def __init__(self, fit_days=FIT_DAYS, balance_point=BALANCE_POINT, cache_path=None):
+        self.fit_days = fit_days
+        self.balance_point = balance_point
+        self.cache_path = cache_path
+        self.names = []
+        self.coef = None          # (buildings, 7 or 9)
+        self.last_day = None      # last fitted day (datetime64[ns])
+        self.weather = None       # daily weather frame used for the temperature terms
+        self.fit_seconds = 0.0
+        self.cached = False
+
+    def fit(self, manager, weather=None, buildings=None):
+        """Fit from a BuildingManager's readings (weather: frame from load_weather_daily())"""
+        names, days, kwh, counts = daily_matrix(manager, buildings)
+        return self.fit_matrix(names, days, kwh, counts, weather)
+
+    def fit_matrix(self, names, days, kwh, counts, weather=None):
+        """Fit from (buildings, days) daily totals and reading counts on the day grid `days`"""
+        self.names = list(names)
+        self.weather = weather
+        self.cached = False
+        if not self.names:
+            self.coef = np.empty((0, 7 if weather is None else 9))
+            return self
+
+        window = slice(max(len(days) - self.fit_days, 0), len(days))
+        days, kwh, counts = days[window], kwh[:, window], counts[:, window]
+        self.last_day = days[-1]
+
+        # a day counts if the building reported on it about as often as usual (drops a partial last day)
+        usual = counts.max(axis=1, keepdims=True)
+        mask = (counts > 0) & (counts >= MIN_DAY_FRACTION * usual)
+
+        temperature = None
+        if weather is not None:
+            temperature = climatology(weather, days)
+            observed = weather.set_index('Date')['AvgTemp'].reindex(pd.to_datetime(days)).to_numpy()
+            temperature = np.where(np.isnan(observed), temperature, observed)
+
+        key = self._cache_key(days, kwh, mask, weather is not None)
+        if self._load_cache(key):
+            return self
+
+        start = time.perf_counter()
+        design = design_matrix(days, temperature, self.balance_point)
+        coef = fit_masked_least_squares(kwh, mask, design)
+        # a weekday with no readings would forecast 0: use that building's mean weekday level instead
+        seen = (mask.astype(np.float64) @ design[:, :7]) > 0
+        levels = coef[:, :7]
+        seen_days = seen.sum(axis=1, keepdims=True)
+        fallback = np.divide(np.where(seen, levels, 0.0).sum(axis=1, keepdims=True), seen_days,
+                             out=np.zeros((len(levels), 1)), where=seen_days > 0)
+        coef[:, :7] = np.where(seen, levels, fallback)
+        self.coef = coef
+        self.fit_seconds = time.perf_counter() - start
+        self._save_cache(key)
+        return self
+
+    def forecast(self, horizon=HORIZON):
+        """Long frame of Date, Building, Forecast_kWh for the horizon days after the last fitted day"""
+        if not self.names:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+        days = self.last_day + np.arange(1, horizon + 1) * np.timedelta64(DAY_NS, 'ns')
+        temperature = climatology(self.weather, days) if self.coef.shape[1] > 7 else None
+        design = design_matrix(days, temperature, self.balance_point)
+        values = np.maximum(self.coef @ design.T, 0.0)   # (buildings, horizon)
+        return pd.DataFrame({
+            'Date': np.tile(days, len(self.names)),
+            'Building': np.repeat(self.names, horizon),
+            'Forecast_kWh': values.ravel(),
+        }, columns=FORECAST_COLUMNS)
+
+    def campus_forecast(self, horizon=HORIZON):
+        """Date, Forecast_kWh: the campus total of forecast()"""
+        per_building = self.forecast(horizon)
+        return per_building.groupby('Date', as_index=False)['Forecast_kWh'].sum()
+
+    def _cache_key(self, days, kwh, mask, with_weather):
+        digest = hashlib.sha1()
+        digest.update('\0'.join(self.names).encode())
+        digest.update(np.ascontiguousarray(days).tobytes())
+        digest.update(np.ascontiguousarray(np.where(mask, kwh, 0.0)).tobytes())
+        digest.update(repr((self.fit_days, self.balance_point, with_weather)).encode())
+        if with_weather:
+            digest.update(pd.util.hash_pandas_object(self.weather, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _load_cache(self, key):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with np.load(self.cache_path) as cached:
+                if str(cached['key']) != key:
+                    return False
+                self.coef = cached['coef']
+        except (OSError, ValueError, KeyError):
+            return False
+        self.cached = True
+        self.fit_seconds = 0.0
+        return True
+
+    def _save_cache(self, key):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp_path = self.cache_path + '.tmp.npz'
+        np.savez(tmp_path, key=np.array(key), coef=self.coef)
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,210 @@
+# Interval Metrics
+# Sub-daily analysis of interval meter data (15-minute, hourly, ... readings):
+# totals at a chosen grain, peak demand and an hour-of-day x day-of-week load
+# profile, for every building at once.
+#
+# Timestamps are bucketed with integer arithmetic on their int64 nanoseconds
+# (floored to a multiple of the grain; months through datetime64[M]) instead of
+# Python date objects. Each building's readings come out of the manager in
+# time order, so after concatenating them every grouping is a run of equal keys
+# and one np.add/np.maximum.reduceat (or bincount) covers all buildings.
+# Weeks run Monday to Sunday and, in the Period column of the totals, are
+# labelled by their last day like calculate_weekly_aggregates() and the
+# rollup store (resample('W')); other periods are labelled by their start.
+#
+# The campus load is the sum of every building's readings in the same demand
+# interval: the finest of 15min/hour/day/week that is at least as long as the
+# longest meter interval. Meters that are offset from each other or report at
+# different intervals are therefore added up together, and its peak is the
+# largest concurrent interval rather than the largest single meter reading
+# (which summary.txt already lists under PEAK LOAD). Campus times are the
+# starts of those intervals.
+
+import numpy as np
+import pandas as pd
+
+from weather_join import DAY_NS
+
+GRAINS = ('15min', 'hour', 'day', 'week', 'month')
+HOUR_NS = 3_600 * 10**9
+GRAIN_NS = {'15min': 15 * 60 * 10**9, 'hour': HOUR_NS, 'day': DAY_NS, 'week': 7 * DAY_NS}
+DEMAND_GRAINS = ('15min', 'hour', 'day', 'week')   # fixed-length grains the campus load can use
+MONDAY_NS = -3 * DAY_NS   # weeks start on Monday (1970-01-01 was a Thursday)
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+TOTAL_COLUMNS = ['Period', 'Total_kWh', 'Peak_kWh', 'Readings']
+PEAK_COLUMNS = ['Building', 'Interval', 'Readings', 'Peak_kWh', 'Peak_Time', 'Peak_kW', 'Average_kW',
+                'Load_factor']
+
+
+def period_starts(timestamps, grain):
+    """Start of the grain period containing each timestamp (datetime64[ns], NaT stays NaT)"""
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain: {grain!r} (use one of {', '.join(GRAINS)})")
+    stamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    if grain == 'month':
+        return stamps.astype('datetime64[M]').astype('datetime64[ns]')
+    step = GRAIN_NS[grain]
+    offset = MONDAY_NS if grain == 'week' else 0
+    starts = ((stamps.view('int64') - offset) // step * step + offset).view('datetime64[ns]')
+    return np.where(np.isnat(stamps), stamps, starts)
+
+
+def period_labels(starts, grain):
+    """Period column values for period_starts() output: week-ending Sunday for weeks, else the start"""
+    if grain == 'week':
+        return starts + np.timedelta64(6 * DAY_NS, 'ns')
+    return starts
+
+
+def _run_starts(*keys):
+    """Positions where a run of equal values (in every key array) begins"""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[:1] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _interval_ns(timestamps):
+    """Typical time between readings (median of the positive gaps), NaN with fewer than two times"""
+    gaps = np.diff(timestamps.view('int64'))
+    gaps = gaps[gaps > 0]
+    return float(np.median(gaps)) if len(gaps) else np.nan
+
+
+def _meter_intervals(timestamps, sizes):
+    """_interval_ns() of each building's slice of building_readings() output"""
+    starts = np.append(0, np.cumsum(sizes)[:-1])
+    return np.array([_interval_ns(timestamps[s:s + n]) for s, n in zip(starts, sizes)])
+
+
+def demand_grain(intervals):
+    """Finest grain in DEMAND_GRAINS at least as long as every meter interval (in ns, NaN ignored)"""
+    known = intervals[~np.isnan(intervals)]
+    longest = known.max() if len(known) else 0
+    for grain in DEMAND_GRAINS:
+        if GRAIN_NS[grain] >= longest:
+            return grain
+    return DEMAND_GRAINS[-1]
+
+
+def resample(timestamps, kwh, grain='hour'):
+    """TOTAL_COLUMNS frame: each period's total, largest reading and number of readings (see period_labels())"""
+    stamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    kwh = np.asarray(kwh, dtype=np.float64)
+    if len(stamps) == 0:
+        return pd.DataFrame(columns=TOTAL_COLUMNS)
+    if (stamps[1:] < stamps[:-1]).any():
+        order = np.argsort(stamps, kind='stable')
+        stamps, kwh = stamps[order], kwh[order]
+
+    periods = period_starts(stamps, grain)
+    starts = _run_starts(periods)
+    return pd.DataFrame({
+        'Period': period_labels(periods[starts], grain),
+        'Total_kWh': np.add.reduceat(kwh, starts),
+        'Peak_kWh': np.maximum.reduceat(kwh, starts),
+        'Readings': np.diff(np.append(starts, len(kwh))),
+    }, columns=TOTAL_COLUMNS)
+
+
+def load_profile(timestamps, kwh):
+    """7 x 24 frame (Mon..Sun x hour 0..23) of the mean reading in each hour of the week (NaN if none)"""
+    ns = np.asarray(timestamps, dtype='datetime64[ns]').view('int64')
+    cells = (ns // DAY_NS + 3) % 7 * 24 + ns // HOUR_NS % 24
+    totals = np.bincount(cells, weights=kwh, minlength=7 * 24)
+    counts = np.bincount(cells, minlength=7 * 24)
+    means = np.divide(totals, counts, out=np.full(7 * 24, np.nan), where=counts > 0)
+    return pd.DataFrame(means.reshape(7, 24), index=list(DAY_NAMES), columns=range(24))
+
+
+def building_readings(manager, buildings=None):
+    """(names, timestamps, kwh, sizes): every building's readings in time order, concatenated"""
+    names = [name for name in (buildings or manager.get_all_buildings())
+             if manager.get_building(name).keep_readings and len(manager.get_building(name).kwh_values)]
+    if not names:
+        return names, np.empty(0, dtype='datetime64[ns]'), np.empty(0), np.empty(0, dtype=np.int64)
+    views = [manager.get_building(name).readings_between() for name in names]   # sorts out-of-order appends
+    timestamps = np.concatenate([stamps for stamps, _ in views])
+    kwh = np.concatenate([values for _, values in views])
+    return names, timestamps, kwh, np.array([len(values) for _, values in views])
+
+
+def resample_buildings(manager, grain='hour', buildings=None):
+    """Building plus TOTAL_COLUMNS: every building's totals at the grain, in one pass"""
+    names, stamps, kwh, sizes = building_readings(manager, buildings)
+    if not names:
+        return pd.DataFrame(columns=['Building'] + TOTAL_COLUMNS)
+    rows = np.repeat(np.arange(len(names)), sizes)
+    periods = period_starts(stamps, grain)
+    starts = _run_starts(rows, periods)
+    return pd.DataFrame({
+        'Building': pd.Categorical.from_codes(rows[starts], names),
+        'Period': period_labels(periods[starts], grain),
+        'Total_kWh': np.add.reduceat(kwh, starts),
+        'Peak_kWh': np.maximum.reduceat(kwh, starts),
+        'Readings': np.diff(np.append(starts, len(kwh))),
+    }, columns=['Building'] + TOTAL_COLUMNS)
+
+
+def campus_load(timestamps, kwh, grain='15min'):
+    """(starts, kwh): the summed load of all readings in each grain period, by period start"""
+    starts, slots = np.unique(period_starts(timestamps, grain), return_inverse=True)
+    return starts, np.bincount(slots, weights=kwh, minlength=len(starts))
+
+
+def peak_demand(names, timestamps, kwh, sizes):
+    """PEAK_COLUMNS frame from building_readings() output.
+
+    Peak_kWh is a building's largest interval reading (the earliest one on
+    ties), Peak_kW that reading divided by the building's interval length,
+    Average_kW its mean reading the same way, and Load_factor = average / peak.
+    """
+    if not names:
+        return pd.DataFrame(columns=PEAK_COLUMNS)
+    starts = np.append(0, np.cumsum(sizes)[:-1])
+    rows = np.repeat(np.arange(len(names)), sizes)
+    peaks = np.maximum.reduceat(kwh, starts)
+    at_peak = np.flatnonzero(kwh == peaks[rows])
+    first = at_peak[np.unique(rows[at_peak], return_index=True)[1]]
+    means = np.add.reduceat(kwh, starts) / sizes
+
+    intervals = _meter_intervals(timestamps, sizes)
+    hours = intervals / HOUR_NS
+    return pd.DataFrame({
+        'Building': names,
+        'Interval': pd.to_timedelta(intervals),
+        'Readings': sizes,
+        'Peak_kWh': peaks,
+        'Peak_Time': timestamps[first],
+        'Peak_kW': peaks / hours,
+        'Average_kW': means / hours,
+        'Load_factor': np.divide(means, peaks, out=np.full(len(names), np.nan), where=peaks > 0),
+    }, columns=PEAK_COLUMNS)
+
+
+def analyze_intervals(manager, grain='hour', buildings=None):
+    """Campus totals at the grain, per-building peak demand and the campus load profile.
+
+    Returns a dict with grain, campus (TOTAL_COLUMNS over the campus load, so
+    Peak_kWh is each period's largest concurrent interval), peaks
+    (PEAK_COLUMNS), campus_peak (Interval, the demand grain; Time, the start
+    of the busiest interval; kWh and kW) and profile (load_profile() of the
+    campus load; None when the demand grain is a day or longer, since every
+    interval would then start at midnight). None if no building keeps readings.
+    """
+    names, stamps, kwh, sizes = building_readings(manager, buildings)
+    if not names:
+        return None
+    interval = demand_grain(_meter_intervals(stamps, sizes))
+    times, load = campus_load(stamps, kwh, interval)
+    top = int(np.argmax(load))
+    return {
+        'grain': grain,
+        'campus': resample(times, load, grain),
+        'peaks': peak_demand(names, stamps, kwh, sizes),
+        'campus_peak': {'Interval': interval, 'Time': pd.Timestamp(times[top]), 'kWh': float(load[top]),
+                        'kW': float(load[top]) / (GRAIN_NS[interval] / HOUR_NS)},
+        'profile': load_profile(times, load) if GRAIN_NS[interval] < DAY_NS else None,
+    }
@@ -0,0 +1,393 @@
+# Live Ingestion Service
+# An asyncio HTTP endpoint that accepts meter readings as they arrive, folds
+# them into a BuildingManager in batches, and serves the current per-building
+# statistics and campus totals. Standard library only (no web framework).
+#
+#   POST /readings      newline-delimited JSON, one reading per line:
+#                       {"building": "Library", "timestamp": "2025-01-01T10:00", "kwh": 12.5}
+#   GET  /stats         every building's mean/min/max/total/count and the campus total
+#   GET  /stats/<name>  one building
+#   GET  /alerts        newest spike alerts (when started with an AnomalyEngine)
+#   GET  /health        queue depth and counters (503 once the batcher has stopped)
+#
+# Timestamps are parsed when a POST arrives, so a bad one is a 400 for that
+# request. Timestamps with a UTC offset are converted to UTC (readings across
+# a DST change can carry different offsets); ones without are kept as given.
+# A flush that fails is reported and skipped, and the batcher keeps running.
+#
+# Backpressure: accepted batches wait in a bounded queue. When it is full the
+# POST handler stops reading from its socket until the batcher catches up, so
+# fast senders are slowed down instead of growing memory.
+# Reads never touch the manager: the batcher publishes a ready-made JSON
+# snapshot after every flush, and GET requests return that snapshot.
+#
+#   python live_service.py serve --port 8765 --fake-meters 20
+#   python live_service.py fake --port 8765 --buildings 20 --rate 2000
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from building_model import BuildingManager
+
+HOST = '127.0.0.1'
+PORT = 8765
+QUEUE_BATCHES = 64       # POST bodies waiting to be applied before senders are slowed down
+FLUSH_READINGS = 50_000  # readings applied to the manager in one go
+MAX_BODY = 16 * 1024 * 1024
+
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+def parse_readings(body):
+    """(buildings, timestamps, kwh) from an NDJSON body; raises ValueError on a bad line or timestamp
+
+    body may be str or bytes. timestamps is a datetime64[ns] array (offsets
+    converted to UTC), kwh a list.
+    """
+    if isinstance(body, bytes):
+        body = body.decode()
+    buildings, timestamps, kwh = [], [], []
+    for line_number, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            reading = json.loads(line)
+            buildings.append(str(reading['building']))
+            timestamps.append(reading['timestamp'])
+            kwh.append(float(reading['kwh']))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"line {line_number}: {e}") from None
+    try:
+        dates = pd.to_datetime(timestamps, utc=True, format='mixed')
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"bad timestamp: {e}") from None
+    return buildings, dates.tz_localize(None).to_numpy(dtype='datetime64[ns]'), kwh
+
+
+class LiveService:
+    """Bounded-queue ingestion into a BuildingManager plus snapshot reads"""
+
+    def __init__(self, manager=None, anomalies=None, queue_batches=QUEUE_BATCHES,
+                 flush_readings=FLUSH_READINGS):
+        # a long-running service keeps statistics only unless given its own manager
+        self.manager = manager if manager is not None else BuildingManager(keep_readings=False)
+        self.anomalies = anomalies
+        self.queue_batches = queue_batches
+        self.flush_readings = flush_readings
+        self.queue = None
+        self.received = 0
+        self.applied = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_error = None
+        self._batcher_task = None
+        self.started = time.time()
+        self._snapshot = {'buildings': {}, 'campus_total_kwh': 0.0, 'updated': None}
+        self._snapshot_body = json.dumps(self._snapshot).encode()
+        self._alerts_body = b'[]'
+
+    # ingestion
+
+    async def submit(self, buildings, timestamps, kwh):
+        """Queue one parsed batch; waits while the queue is full"""
+        await self.queue.put((buildings, timestamps, kwh))
+        self.received += len(kwh)
+
+    def _apply(self, batches):
+        """Fold queued batches into the manager (runs in a worker thread)"""
+        frame = pd.DataFrame({
+            'Building': [b for batch in batches for b in batch[0]],
+            'Date': np.concatenate([batch[1] for batch in batches]),
+            'kWh': np.concatenate([np.asarray(batch[2], dtype=np.float64) for batch in batches]),
+        })
+        added = self.manager.load_frame(frame)
+        if self.anomalies is not None:
+            self.anomalies.backfill(frame)
+        return added
+
+    async def batcher(self):
+        """Drain the queue in flushes of up to flush_readings readings"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batches = [await self.queue.get()]
+            pending = len(batches[0][2])
+            while pending < self.flush_readings and not self.queue.empty():
+                batches.append(self.queue.get_nowait())
+                pending += len(batches[-1][2])
+
+            try:
+                # the event loop keeps serving requests while the batch is applied
+                self.applied += await loop.run_in_executor(None, self._apply, batches)
+                self.flushes += 1
+                self._publish()
+            except Exception as e:
+                # one bad flush must not stop ingestion: report it and carry on with the next
+                self.failed_flushes += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"✗ Flush of {pending} reading(s) failed: {self.last_error}")
+            finally:
+                for _ in batches:
+                    self.queue.task_done()
+
+    def _publish(self):
+        summary = self.manager.get_building_summary()
+        self._snapshot = {
+            'buildings': summary,
+            'campus_total_kwh': sum(stats['total'] for stats in summary.values()),
+            'updated': time.time(),
+        }
+        self._snapshot_body = json.dumps(self._snapshot).encode()
+        if self.anomalies is not None:
+            self._alerts_body = json.dumps(self.alerts()).encode()
+
+    # reads
+
+    def batcher_running(self):
+        return self._batcher_task is not None and not self._batcher_task.done()
+
+    def health(self):
+        return {
+            'batcher': 'running' if self.batcher_running() else 'stopped',
+            'received': self.received,
+            'applied': self.applied,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'last_error': self.last_error,
+            'queued_batches': self.queue.qsize() if self.queue is not None else 0,
+            'buildings': len(self._snapshot['buildings']),
+            'uptime_s': time.time() - self.started,
+        }
+
+    def alerts(self, limit=20):
+        """Newest alerts as JSON-ready dicts (called by the batcher between flushes)"""
+        if self.anomalies is None:
+            return []
+        feed = self.anomalies.feed(limit)
+        feed['Date'] = feed['Date'].astype(str)
+        return feed.to_dict('records')
+
+    # HTTP
+
+    async def route(self, method, path, body):
+        """(status, payload bytes) for one request"""
+        if path == '/readings':
+            if method != 'POST':
+                return 405, b'{"error": "use POST"}'
+            try:
+                # a body can be MAX_BODY long: parse it in a worker so reads are not held up
+                readings = await asyncio.get_running_loop().run_in_executor(None, parse_readings, body)
+            except ValueError as e:   # includes UnicodeDecodeError
+                return 400, json.dumps({'error': str(e)}).encode()
+            await self.submit(*readings)
+            return 202, json.dumps({'accepted': len(readings[2])}).encode()
+
+        if method != 'GET':
+            return 405, b'{"error": "use GET"}'
+        if path == '/stats':
+            return 200, self._snapshot_body
+        if path.startswith('/stats/'):
+            name = unquote(path[len('/stats/'):])
+            stats = self._snapshot['buildings'].get(name)
+            if stats is None:
+                return 404, json.dumps({'error': f"unknown building {name!r}"}).encode()
+            return 200, json.dumps({name: stats}).encode()
+        if path == '/alerts':
+            return 200, self._alerts_body
+        if path == '/health':
+            return 200 if self.batcher_running() else 503, json.dumps(self.health()).encode()
+        return 404, b'{"error": "not found"}'
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive) until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = 400, b'{"error": "bad Content-Length"}'
+                    await self._respond(writer, status, payload, close=True)
+                    break
+                if length > MAX_BODY:
+                    status, payload = 413, b'{"error": "body too large"}'
+                    await self._respond(writer, status, payload, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.route(method, target.split('?', 1)[0].rstrip('/') or '/',
+                                                   body)
+                close = headers.get('connection', '').lower() == 'close'
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, close=False):
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode() + payload)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT):
+        """Start the server and the batcher; returns the asyncio Server"""
+        self.queue = asyncio.Queue(maxsize=self.queue_batches)
+        self._batcher_task = asyncio.create_task(self.batcher())
+        return await asyncio.start_server(self.handle, host, port)
+
+
+# fake meters
+
+async def _post(reader, writer, host, path, payload):
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/x-ndjson\r\n"
+                  f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload)
+    await writer.drain()
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+
+
+async def run_fake_meters(host=HOST, port=PORT, buildings=10, rate=1000, interval='15min',
+                          duration=None, seed=0):
+    """Send simulated readings to a running service.
+
+    Every building reports one reading per `interval` of simulated time;
+    rate is the total readings per second sent. Runs until duration seconds
+    have passed (forever if None). Returns the number of readings sent.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Meter_{i:04d}" for i in range(buildings)]
+    base_load = rng.uniform(50, 300, buildings)
+    step = pd.Timedelta(interval)
+    clock = pd.Timestamp.now().floor(step)
+
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = 0
+    start = time.perf_counter()
+    ticks_per_post = max(1, int(rate // max(buildings, 1) // 10))  # about 10 POSTs per second
+    try:
+        while duration is None or time.perf_counter() - start < duration:
+            lines = []
+            for _ in range(ticks_per_post):
+                hour = clock.hour + clock.minute / 60
+                daily = 1 + 0.3 * np.sin((hour - 8) / 24 * 2 * np.pi)
+                kwh = base_load * daily * rng.normal(1, 0.05, buildings)
+                stamp = clock.isoformat()
+                lines.extend(json.dumps({'building': n, 'timestamp': stamp, 'kwh': round(float(k), 3)})
+                             for n, k in zip(names, kwh))
+                clock += step
+            await _post(reader, writer, host, '/readings', ('\n'.join(lines) + '\n').encode())
+            sent += len(lines)
+
+            # pace to the requested rate
+            ahead = sent / rate - (time.perf_counter() - start)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+    finally:
+        writer.close()
+    return sent
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Live meter ingestion service")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="run the ingestion endpoint")
+    serve.add_argument('--host', default=HOST)
+    serve.add_argument('--port', type=int, default=PORT)
+    serve.add_argument('--queue-batches', type=int, default=QUEUE_BATCHES)
+    serve.add_argument('--flush-readings', type=int, default=FLUSH_READINGS)
+    serve.add_argument('--keep-readings', action='store_true',
+                       help="store every reading in the buildings, not only running statistics")
+    serve.add_argument('--alerts', action='store_true', help="run spike detection on the stream")
+    serve.add_argument('--fake-meters', type=int, default=0,
+                       help="also start this many simulated meters against the service")
+    serve.add_argument('--rate', type=int, default=1000, help="readings per second from the fake meters")
+
+    fake = sub.add_parser('fake', help="send simulated readings to a running service")
+    fake.add_argument('--host', default=HOST)
+    fake.add_argument('--port', type=int, default=PORT)
+    fake.add_argument('--buildings', type=int, default=10)
+    fake.add_argument('--rate', type=int, default=1000, help="readings per second")
+    fake.add_argument('--interval', default='15min', help="simulated time between readings of a meter")
+    fake.add_argument('--duration', type=float, default=None, help="seconds to run (default: forever)")
+    return parser.parse_args(argv)
+
+
+async def _serve(args):
+    anomalies = None
+    if args.alerts:
+        from anomaly_engine import AnomalyEngine
+        anomalies = AnomalyEngine(keep_history=False)   # the service only serves the feed
+
+    service = LiveService(BuildingManager(keep_readings=args.keep_readings), anomalies,
+                          args.queue_batches, args.flush_readings)
+    server = await service.serve(args.host, args.port)
+    print(f"✓ Listening on http://{args.host}:{args.port} (POST /readings, GET /stats /alerts /health)")
+    fake = None
+    if args.fake_meters:
+        fake = asyncio.create_task(run_fake_meters(args.host, args.port, args.fake_meters, args.rate))
+        fake.add_done_callback(_report_fake_meters)
+        print(f"✓ Started {args.fake_meters} fake meters at {args.rate} readings/s")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if fake is not None:
+            fake.cancel()
+            await asyncio.gather(fake, return_exceptions=True)
+
+
+def _report_fake_meters(task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"✗ Fake meters stopped: {type(task.exception()).__name__}: {task.exception()}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.command == 'serve':
+            asyncio.run(_serve(args))
+        else:
+            sent = asyncio.run(run_fake_meters(args.host, args.port, args.buildings, args.rate,
+                                               args.interval, args.duration))
+            print(f"✓ Sent {sent} readings")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Meter Cache
+# Keeps every parsed column of each data/ CSV as a .npy file (one per column,
+# dtype kept) so a warm run builds the same frames as a cold one without
+# re-reading and re-parsing dates. Numeric and date columns are memory-mapped;
+# text columns are stored pickled and read back whole.
+# An entry is reused only while the source file's path, mtime and size match;
+# a new entry for a file replaces the old entry's column files.
+# Date must be naive datetime64[ns] (csv_loader.parse_dates()); a frame with
+# any other Date is not cached.
+
+import contextlib
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class MeterCache:
+    """Binary column cache for parsed building CSVs, stored under cache_dir"""
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, cache_dir='.meter_cache'):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, self.MANIFEST)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """Write the manifest (call once after a batch of put() calls)"""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _fingerprint(filepath):
+        stat = os.stat(filepath)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def _column_path(self, filepath, position):
+        key = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.{position}.npy")
+
+    def get(self, filepath):
+        """Return a loader-style result dict from the cache, or None if missing/stale"""
+        entry = self.manifest.get(os.path.abspath(filepath))
+        filename = os.path.basename(filepath)
+        building = filename.replace('.csv', '')
+        try:
+            if entry is None or entry['source'] != self._fingerprint(filepath) or 'columns' not in entry:
+                return None
+            columns = {}
+            for position, (name, dtype, stored) in enumerate(entry['columns']):
+                if stored == 'building':
+                    columns[name] = building
+                elif stored == 'mmap':
+                    columns[name] = np.load(self._column_path(filepath, position), mmap_mode='r')
+                else:
+                    # text columns are pickled object arrays, which cannot be mapped
+                    values = np.load(self._column_path(filepath, position), allow_pickle=True)
+                    columns[name] = pd.array(values, dtype=dtype)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        # copy=False keeps the mapped columns as views of the cache files
+        df = pd.DataFrame(columns, copy=False)
+        return {'filename': filename, 'building': building, 'status': 'ok',
+                'df': df, 'error': None, 'cached': True}
+
+    def _remove_entry_files(self, filepath):
+        """Delete the column files of filepath's current entry (and of the old Date/kWh layout)"""
+        entry = self.manifest.pop(os.path.abspath(filepath), None)
+        base = self._column_path(filepath, 0)[:-len('.0.npy')]
+        paths = [base + '.date.npy', base + '.kwh.npy']
+        if entry is not None:
+            paths += [self._column_path(filepath, i) for i in range(len(entry.get('columns', [])))]
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def put(self, filepath, df):
+        """Store every column of df, with its dtype, for filepath (persisted by save())"""
+        self._remove_entry_files(filepath)
+        if df['Date'].dtype != 'datetime64[ns]':
+            print(f"  ⚠️  Not caching {os.path.basename(filepath)}: Date is {df['Date'].dtype}, "
+                  f"not naive datetime64[ns]")
+            return
+        columns = []
+        for position, name in enumerate(df.columns):
+            values = df[name]
+            if name == 'Building':
+                stored = 'building'   # the file's building name, filled in again by get()
+            elif values.dtype.kind in 'biufcmM':
+                stored = 'mmap'
+                np.save(self._column_path(filepath, position), values.to_numpy())
+            else:
+                stored = 'pickle'
+                np.save(self._column_path(filepath, position), values.to_numpy(dtype=object),
+                        allow_pickle=True)
+            columns.append([name, str(values.dtype), stored])
+
+        self.manifest[os.path.abspath(filepath)] = {
+            'source': self._fingerprint(filepath),
+            'rows': len(df),
+            'columns': columns,
+        }
@@ -0,0 +1,180 @@
+# Meter Store
+# Keeps every building's readings on disk in two fixed-width binary files that
+# are memory-mapped instead of loaded:
+#
+#   <store_dir>/meta.json              kWh dtype, and per building its file stem, reading
+#                                      count, latest timestamp and running statistics
+#   <store_dir>/<stem>.ts              int64 nanoseconds (datetime64[ns]), one per reading
+#   <store_dir>/<stem>.kwh             float64 (or float32) kWh, one per reading
+#
+# The mapped files are the Building's reading buffers (StoredBuilding), so
+# timestamps / kwh_values, range queries, the weather join and the plots read
+# zero-copy views of them. Opening a store reads meta.json and maps the files,
+# which takes the same time for a thousand readings or a billion; the OS pages
+# in only what is actually read, and the building summary comes from the
+# stored statistics without touching the readings at all.
+#
+# New readings are written at the tail. The files grow by doubling, like the
+# in-memory buffers, and meta.json records how many slots are filled, so
+# readings appended since the last flush() are not part of the store until it
+# is called. Readings at or before a building's latest stored timestamp are
+# skipped, so loading the same CSVs again adds nothing.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from building_model import Building
+
+KWH_DTYPES = ('float64', 'float32')
+
+
+class StoredBuilding(Building):
+    """A Building whose reading buffers are memory-mapped files of a MeterStore"""
+
+    def __init__(self, name, store, entry):
+        super().__init__(name, keep_readings=True)
+        self._store = store
+        self._entry = entry
+        base = os.path.join(store.store_dir, entry['stem'])
+        self._paths = (base + '.ts', base + '.kwh')
+
+        self._size = entry['size']
+        self._count = entry['count']
+        self._sum = entry['sum']
+        self._mean = entry['mean']
+        self._m2 = entry['m2']
+        self._min = entry['min'] if entry['min'] is not None else np.inf
+        self._max = entry['max'] if entry['max'] is not None else -np.inf
+        self._last = np.datetime64(entry['last'], 'ns') if entry['last'] else None
+
+        capacity = 0
+        if os.path.exists(self._paths[1]):
+            capacity = os.path.getsize(self._paths[1]) // store.kwh_dtype.itemsize
+        self._map(capacity if store.mode == 'r' else max(capacity, self.INITIAL_CAPACITY))
+
+    def _map(self, capacity):
+        """(Re)map both files with room for capacity readings, growing them if needed"""
+        mode = self._store.mode
+        for path, dtype in zip(self._paths, (np.dtype('datetime64[ns]'), self._store.kwh_dtype)):
+            if mode != 'r' and (not os.path.exists(path) or os.path.getsize(path) < capacity * dtype.itemsize):
+                with open(path, 'ab') as f:
+                    f.truncate(capacity * dtype.itemsize)
+        self._timestamps = np.memmap(self._paths[0], dtype='datetime64[ns]', mode=mode, shape=(capacity,))
+        self._kwh = np.memmap(self._paths[1], dtype=self._store.kwh_dtype, mode=mode, shape=(capacity,))
+
+    def _reserve(self, extra):
+        """Grow the files (amortized doubling) so that `extra` more readings fit"""
+        needed = self._size + extra
+        capacity = len(self._kwh)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._timestamps.flush()
+        self._kwh.flush()
+        self._map(capacity)
+
+    def _check_writable(self):
+        if self._store.mode == 'r':
+            raise ValueError(f"{self._store.store_dir} is open read-only")
+
+    def add_reading(self, timestamp, kwh):
+        self._check_writable()
+        timestamp = np.datetime64(timestamp, 'ns')
+        if self._last is not None and not timestamp > self._last:
+            return
+        super().add_reading(timestamp, kwh)
+        self._last = timestamp
+
+    def add_readings(self, timestamps, kwh):
+        """Append the readings newer than the latest stored one; returns how many were added"""
+        self._check_writable()
+        timestamps = np.asarray(pd.to_datetime(timestamps, errors='coerce'), dtype='datetime64[ns]')
+        kwh = np.asarray(kwh, dtype=np.float64)
+        if self._last is not None:
+            newer = timestamps > self._last
+            timestamps, kwh = timestamps[newer], kwh[newer]
+        added = super().add_readings(timestamps, kwh)
+        if added:
+            latest = self.timestamps[self._size - added:].max()
+            self._last = latest if self._last is None else max(self._last, latest)
+        return added
+
+    def flush(self):
+        """Sort any out-of-order appends, write the mapped pages and record them in the entry"""
+        if self._store.mode != 'r':
+            self._sort()
+            self._timestamps.flush()
+            self._kwh.flush()
+        self._entry.update({
+            'size': self._size,
+            'count': self._count,
+            'sum': self._sum,
+            'mean': self._mean,
+            'm2': self._m2,
+            'min': float(self._min) if self._count else None,
+            'max': float(self._max) if self._count else None,
+            'last': str(self._last) if self._last is not None else None,
+        })
+
+
+class MeterStore:
+    """Memory-mapped per-building reading files under store_dir (mode 'r+' or read-only 'r')"""
+
+    META = 'meta.json'
+
+    def __init__(self, store_dir, kwh_dtype='float64', mode='r+'):
+        if kwh_dtype not in KWH_DTYPES:
+            raise ValueError(f"Unknown kWh dtype: {kwh_dtype!r} (use one of {', '.join(KWH_DTYPES)})")
+        if mode not in ('r', 'r+'):
+            raise ValueError(f"Unknown mode: {mode!r} (use 'r' or 'r+')")
+        self.store_dir = store_dir
+        self.mode = mode
+        self.meta_path = os.path.join(store_dir, self.META)
+        if mode != 'r':
+            os.makedirs(store_dir, exist_ok=True)
+        try:
+            with open(self.meta_path) as f:
+                self.meta = json.load(f)
+        except FileNotFoundError:
+            if mode == 'r':
+                raise
+            self.meta = {'kwh_dtype': kwh_dtype, 'buildings': {}}
+        self.kwh_dtype = np.dtype(self.meta['kwh_dtype'])   # an existing store keeps its dtype
+        self._open = {}
+
+    def names(self):
+        """Building names in the store"""
+        return list(self.meta['buildings'])
+
+    def building(self, name):
+        """The StoredBuilding for name, creating its (empty) files if it is new"""
+        if name not in self._open:
+            entry = self.meta['buildings'].get(name)
+            if entry is None:
+                if self.mode == 'r':
+                    raise KeyError(f"Unknown building: {name!r}")
+                entry = {'stem': f"building-{len(self.meta['buildings']):05d}", 'size': 0, 'count': 0,
+                         'sum': 0.0, 'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None, 'last': None}
+                self.meta['buildings'][name] = entry
+            self._open[name] = StoredBuilding(name, self, entry)
+        return self._open[name]
+
+    @property
+    def readings(self):
+        """Readings in the store as of the last flush()"""
+        return sum(entry['size'] for entry in self.meta['buildings'].values())
+
+    def flush(self):
+        """Make every reading appended so far part of the store (atomic meta.json rewrite)"""
+        if self.mode == 'r':
+            return
+        for building in self._open.values():
+            building.flush()
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(tmp_path, self.meta_path)
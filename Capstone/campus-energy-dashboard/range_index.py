@@ -0,0 +1,83 @@
+# Range Index
+# Answers sum/mean/min/max over any run of a building's time-sorted readings
+# without rescanning them.
+#
+# Sums come from prefix sums (two lookups). Min/max use a sparse table over
+# blocks of BLOCK readings: the whole blocks inside the range are covered by
+# two overlapping power-of-two spans of the table, and the partial blocks at
+# either end are scanned directly (< 2 * BLOCK values). Building the table
+# over blocks instead of single readings keeps it at about n / BLOCK * log2(n)
+# values, rather than n * log2(n).
+
+import numpy as np
+
+BLOCK = 64   # readings per min/max block
+
+
+def _sparse_table(values, reduce):
+    """levels[k][i] = reduce of values[i:i + 2**k]"""
+    levels = [values]
+    span = 1
+    while 2 * span <= len(values):
+        previous = levels[-1]
+        levels.append(reduce(previous[:-span], previous[span:]))
+        span *= 2
+    return levels
+
+
+class TimeRangeIndex:
+    """Prefix sums and block min/max tables over one kWh array (grows with appends)"""
+
+    def __init__(self, block=BLOCK):
+        self.block = block
+        self.size = 0
+        self.prefix = np.zeros(1)   # prefix[i] = sum of the first i values
+        self.block_min = np.empty(0)
+        self.block_max = np.empty(0)
+        self._min_levels = []
+        self._max_levels = []
+
+    def update(self, kwh):
+        """Extend the index to cover kwh, which may have grown at the end since the last call"""
+        n = len(kwh)
+        if n == self.size:
+            return
+        if n < self.size:
+            raise ValueError("the indexed values can only grow at the end")
+
+        # prefix sums continue from the last total; only the new tail is summed
+        tail = self.prefix[-1] + np.cumsum(kwh[self.size:], dtype=np.float64)
+        self.prefix = np.concatenate([self.prefix, tail])
+
+        # the last block may have been partial, so recompute from it onwards
+        first = self.size // self.block
+        edges = np.arange(first * self.block, n, self.block)
+        self.block_min = np.concatenate([self.block_min[:first], np.minimum.reduceat(kwh, edges)])
+        self.block_max = np.concatenate([self.block_max[:first], np.maximum.reduceat(kwh, edges)])
+        self._min_levels = _sparse_table(self.block_min, np.minimum)
+        self._max_levels = _sparse_table(self.block_max, np.maximum)
+        self.size = n
+
+    def total(self, lo, hi):
+        return float(self.prefix[hi] - self.prefix[lo])
+
+    def _extreme(self, kwh, lo, hi, levels, reduce):
+        first_block = -(-lo // self.block)   # first block starting at or after lo
+        end_block = hi // self.block         # blocks before this one end at or before hi
+        if first_block >= end_block:
+            return float(reduce(kwh[lo:hi]))   # no whole block inside, < 2 * BLOCK values
+
+        level = int(np.log2(end_block - first_block))
+        table = levels[level]
+        best = reduce([table[first_block], table[end_block - (1 << level)]])
+        if lo < first_block * self.block:
+            best = reduce([best, reduce(kwh[lo:first_block * self.block])])
+        if end_block * self.block < hi:
+            best = reduce([best, reduce(kwh[end_block * self.block:hi])])
+        return float(best)
+
+    def minimum(self, kwh, lo, hi):
+        return self._extreme(kwh, lo, hi, self._min_levels, np.min)
+
+    def maximum(self, kwh, lo, hi):
+        return self._extreme(kwh, lo, hi, self._max_levels, np.max)
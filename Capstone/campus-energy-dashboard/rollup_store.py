@@ -0,0 +1,187 @@
+# Rollup Store
+# Persistent daily / weekly / monthly kWh totals per building. Each update()
+# folds in only the readings newer than the building's watermark (the latest
+# timestamp already folded) and rewrites only the partitions those readings
+# touch, so a nightly run costs about one day of new data, not the full history.
+#
+# A run is the life of one RollupStore: every update() compares against the
+# watermarks as they were when the store was opened, so chunks and files of
+# the same run may arrive in any time order. Readings at or before those
+# watermarks were folded by an earlier run; they are skipped and counted in
+# `skipped`.
+#
+# Layout under store_dir:
+#   watermarks.json          {building: latest folded timestamp}
+#   daily/YYYY-MM.csv        one file per month
+#   weekly/YYYY.csv          weeks end on Sunday (same as resample('W'))
+#   monthly/all.csv
+#   campus/<level>.csv       campus-wide Period, Total_kWh, Readings per level
+# Every partition has the columns Building, Period, Total_kWh, Readings. The
+# campus files are kept up to date by update(), so the campus totals in the
+# report are read from one compact file instead of every partition.
+
+import glob
+import json
+import os
+
+import pandas as pd
+
+LEVELS = ('daily', 'weekly', 'monthly')
+CAMPUS_DIR = 'campus'
+
+
+def _period_start(dates, level):
+    """Label each timestamp with its day / week-ending Sunday / first of month"""
+    days = dates.dt.normalize()
+    if level == 'daily':
+        return days
+    if level == 'weekly':
+        return days + pd.to_timedelta(6 - days.dt.dayofweek, unit='D')
+    return days - pd.to_timedelta(days.dt.day - 1, unit='D')
+
+
+def _partition_name(periods, level):
+    if level == 'daily':
+        return periods.dt.strftime('%Y-%m')
+    if level == 'weekly':
+        return periods.dt.year.astype(str)
+    return pd.Series('all', index=periods.index)
+
+
+class RollupStore:
+    """Incrementally maintained daily/weekly/monthly totals per building"""
+
+    def __init__(self, store_dir='output/rollups'):
+        self.store_dir = store_dir
+        self.watermarks_path = os.path.join(store_dir, 'watermarks.json')
+        for level in LEVELS + (CAMPUS_DIR,):
+            os.makedirs(os.path.join(store_dir, level), exist_ok=True)
+        try:
+            with open(self.watermarks_path) as f:
+                self.watermarks = {b: pd.Timestamp(t) for b, t in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.watermarks = {}
+        self._run_marks = dict(self.watermarks)   # what earlier runs have already folded
+        self.skipped = 0
+        for level in LEVELS:
+            if not os.path.exists(self._campus_path(level)):
+                self._write_campus(level, self._campus_from_partitions(level))   # stores from before campus/
+
+    def _campus_path(self, level):
+        return os.path.join(self.store_dir, CAMPUS_DIR, f"{level}.csv")
+
+    def _campus_from_partitions(self, level):
+        rows = self.read(level)
+        return rows.groupby('Period', as_index=False)[['Total_kWh', 'Readings']].sum()
+
+    def _write_campus(self, level, rows):
+        tmp_path = self._campus_path(level) + '.tmp'
+        rows.sort_values('Period').to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self._campus_path(level))
+
+    def watermark(self, building_name):
+        """Latest timestamp already folded in for a building (None if never seen)"""
+        return self.watermarks.get(building_name)
+
+    def update(self, df):
+        """Fold the rows of df (Date, kWh, Building) newer than each watermark at the start of the run.
+
+        Returns the number of readings folded in; valid readings that earlier
+        runs already covered are added to self.skipped.
+        """
+        if df.empty:
+            return 0
+
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        kwh = pd.to_numeric(df['kWh'], errors='coerce')
+        buildings = df['Building'].astype(str)
+
+        valid = dates.notna() & kwh.notna()
+        marks = pd.to_datetime(buildings.map(self._run_marks))
+        new = valid & (marks.isna() | (dates > marks))
+        self.skipped += int(valid.sum() - new.sum())
+        if not new.any():
+            return 0
+
+        fresh = pd.DataFrame({'Building': buildings[new], 'Date': dates[new], 'kWh': kwh[new]})
+
+        for level in LEVELS:
+            self._fold(level, fresh)
+
+        # rows of a run can arrive out of order, so a watermark only moves forward
+        for building_name, latest in fresh.groupby('Building')['Date'].max().items():
+            current = self.watermarks.get(building_name)
+            self.watermarks[building_name] = latest if current is None else max(current, latest)
+        self._save_watermarks()
+
+        return len(fresh)
+
+    def _fold(self, level, fresh):
+        periods = _period_start(fresh['Date'], level)
+        rolled = (fresh.assign(Period=periods)
+                  .groupby(['Building', 'Period'])['kWh']
+                  .agg(Total_kWh='sum', Readings='size')
+                  .reset_index())
+        partitions = _partition_name(rolled['Period'], level)
+
+        campus = rolled.groupby('Period', as_index=False)[['Total_kWh', 'Readings']].sum()
+        old_campus = pd.read_csv(self._campus_path(level), parse_dates=['Period'])
+        self._write_campus(level, pd.concat([old_campus, campus], ignore_index=True)
+                           .groupby('Period', as_index=False)[['Total_kWh', 'Readings']].sum())
+
+        for partition, new_rows in rolled.groupby(partitions):
+            path = os.path.join(self.store_dir, level, f"{partition}.csv")
+            if os.path.exists(path):
+                old_rows = pd.read_csv(path, parse_dates=['Period'])
+                new_rows = (pd.concat([old_rows, new_rows], ignore_index=True)
+                            .groupby(['Building', 'Period'], as_index=False)[['Total_kWh', 'Readings']]
+                            .sum())
+            new_rows.sort_values(['Period', 'Building']).to_csv(path, index=False)
+
+    def _save_watermarks(self):
+        tmp_path = self.watermarks_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({b: t.isoformat() for b, t in self.watermarks.items()}, f, indent=2)
+        os.replace(tmp_path, self.watermarks_path)
+
+    def read(self, level, building=None):
+        """All stored rows of one level (Building, Period, Total_kWh, Readings)"""
+        files = sorted(glob.glob(os.path.join(self.store_dir, level, '*.csv')))
+        if not files:
+            return pd.DataFrame(columns=['Building', 'Period', 'Total_kWh', 'Readings'])
+        rows = pd.concat([pd.read_csv(f, parse_dates=['Period']) for f in files], ignore_index=True)
+        if building is not None:
+            rows = rows[rows['Building'] == building]
+        return rows
+
+    def _totals(self, level, building):
+        if building is None:
+            rows = pd.read_csv(self._campus_path(level), parse_dates=['Period'])
+        else:
+            rows = self.read(level, building)
+        if rows.empty:
+            return pd.Series(dtype='float64')
+        return rows.groupby('Period')['Total_kWh'].sum().sort_index()
+
+    def daily_totals(self, building=None):
+        """Same shape as calculate_daily_totals(): Date, Total_kWh (campus-wide if building is None)"""
+        totals = self._totals('daily', building)
+        if totals.empty:
+            return pd.DataFrame()
+        return pd.DataFrame({'Date': totals.index, 'Total_kWh': totals.values})
+
+    def weekly_totals(self, building=None):
+        """Same shape as calculate_weekly_aggregates(): Week, Total_kWh (empty weeks = 0)"""
+        totals = self._totals('weekly', building)
+        if totals.empty:
+            return pd.DataFrame()
+        totals = totals.reindex(pd.date_range(totals.index.min(), totals.index.max(), freq='W'),
+                                fill_value=0)
+        return pd.DataFrame({'Week': totals.index, 'Total_kWh': totals.values})
+
+    def monthly_totals(self, building=None):
+        """Month (first day), Total_kWh"""
+        totals = self._totals('monthly', building)
+        if totals.empty:
+            return pd.DataFrame()
+        return pd.DataFrame({'Month': totals.index, 'Total_kWh': totals.values})
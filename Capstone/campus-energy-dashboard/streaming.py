@@ -0,0 +1,144 @@
+# Streaming Ingestion
+# Reads meter CSVs in fixed-size chunks and folds each chunk into the
+# BuildingManager and the daily/weekly totals as it goes, so no combined
+# DataFrame is ever built. Peak DataFrame memory is one chunk.
+
+import os
+
+import pandas as pd
+
+from csv_loader import parse_dates
+
+REQUIRED_COLUMNS = ('Date', 'kWh')
+
+
+def missing_columns(filepath):
+    """REQUIRED_COLUMNS absent from the CSV's header (reads the header only)"""
+    columns = pd.read_csv(filepath, nrows=0).columns
+    return [name for name in REQUIRED_COLUMNS if name not in columns]
+
+
+def iter_meter_chunks(filepath, chunksize, missing=None):
+    """Yield parsed chunks (Date as datetime, kWh numeric, Building column) of one CSV.
+
+    missing is missing_columns(filepath) if the caller has already checked the
+    header (it is read here otherwise). Raises ValueError if the file has no
+    Date/kWh columns.
+    """
+    building_name = os.path.basename(filepath).replace('.csv', '')
+    if missing is None:
+        missing = missing_columns(filepath)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    for chunk in pd.read_csv(filepath, on_bad_lines='skip', chunksize=chunksize):
+        chunk['Date'] = parse_dates(chunk['Date'])
+        chunk['kWh'] = pd.to_numeric(chunk['kWh'], errors='coerce')
+        chunk['Building'] = building_name
+        yield chunk
+
+
+class StreamingAggregates:
+    """Daily/weekly campus totals and the peak reading, updated one chunk at a time"""
+
+    def __init__(self):
+        self.records = 0
+        self._daily = pd.Series(dtype='float64')
+        self._weekly = pd.Series(dtype='float64')
+        self.peak = None  # dict with Date, Building, kWh
+
+    def update(self, chunk):
+        """Fold one parsed chunk into the running totals"""
+        self.records += len(chunk)
+
+        days = chunk['Date'].dt.normalize()
+        daily = chunk['kWh'].groupby(days).sum()
+        self._daily = self._daily.add(daily, fill_value=0)
+
+        # resample('W') labels each week by its closing Sunday
+        week_end = days + pd.to_timedelta(6 - days.dt.dayofweek, unit='D')
+        weekly = chunk['kWh'].groupby(week_end).sum()
+        self._weekly = self._weekly.add(weekly, fill_value=0)
+
+        if chunk['kWh'].notna().any():
+            row = chunk.loc[chunk['kWh'].idxmax()]
+            if self.peak is None or row['kWh'] > self.peak['kWh']:
+                self.peak = {'Date': row['Date'], 'Building': row['Building'], 'kWh': row['kWh']}
+
+    def daily_totals(self):
+        """Same shape as calculate_daily_totals(): Date, Total_kWh"""
+        if self._daily.empty:
+            return pd.DataFrame()
+        daily = self._daily.sort_index()
+        return pd.DataFrame({'Date': daily.index, 'Total_kWh': daily.values})
+
+    def weekly_totals(self):
+        """Same shape as calculate_weekly_aggregates(): Week, Total_kWh (empty weeks = 0)"""
+        if self._weekly.empty:
+            return pd.DataFrame()
+        weekly = self._weekly.sort_index()
+        weeks = pd.date_range(weekly.index.min(), weekly.index.max(), freq='W')
+        weekly = weekly.reindex(weeks, fill_value=0)
+        return pd.DataFrame({'Week': weekly.index, 'Total_kWh': weekly.values})
+
+
+def stream_csv_files(filepaths, manager, chunksize=100_000, export_path=None, rollups=None,
+                     anomalies=None, partitions=None):
+    """Stream every file through the manager and a StreamingAggregates.
+
+    If export_path is given, each chunk is appended to that CSV (with the
+    Hour column the dashboard adds) instead of writing a combined frame later.
+    If rollups (a RollupStore) is given, each chunk is also folded into it.
+    If anomalies (an AnomalyEngine) is given, each chunk is backfilled into it.
+    If partitions (a PartitionedExport) is given, each chunk's new rows are appended to it.
+    Returns (per-file result dicts in input order, aggregates).
+    """
+    aggregates = StreamingAggregates()
+    results = []
+    header_written = False
+
+    if export_path and os.path.exists(export_path):
+        os.remove(export_path)
+
+    for filepath in filepaths:
+        filename = os.path.basename(filepath)
+        result = {
+            'filename': filename,
+            'building': filename.replace('.csv', ''),
+            'status': 'ok',
+            'records': 0,
+            'error': None,
+        }
+
+        try:
+            missing = missing_columns(filepath)
+            if missing:
+                result['status'] = 'missing_columns'
+                results.append(result)
+                continue
+            for chunk in iter_meter_chunks(filepath, chunksize, missing):
+                manager.load_frame(chunk, result['building'])
+                aggregates.update(chunk)
+                if rollups is not None:
+                    rollups.update(chunk)
+                if anomalies is not None:
+                    anomalies.backfill(chunk)
+                result['records'] += len(chunk)
+
+                if export_path or partitions is not None:
+                    chunk['Hour'] = chunk['Date'].dt.hour
+                if export_path:
+                    chunk.to_csv(export_path, mode='a', header=not header_written, index=False)
+                    header_written = True
+                if partitions is not None:
+                    partitions.append(chunk)
+
+        except FileNotFoundError:
+            result['status'] = 'not_found'
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+
+        results.append(result)
+
+    return results, aggregates
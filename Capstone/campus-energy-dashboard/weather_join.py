@@ -0,0 +1,180 @@
+# Weather Join
+# Lines building meter data up with station weather and fits a heating/cooling
+# degree-day model per building, for weather-normalized consumption.
+#
+# The meter readings are totalled per building per day into one
+# buildings x days matrix (a single bincount over all readings). Daily weather
+# (the weather visualizer's cleaned_weather_data.csv or a raw weatherAUS.csv)
+# is matched to that day grid with an as-of merge, so a missing weather day
+# borrows the last observation up to WEATHER_TOLERANCE earlier. Every building
+# is then fitted at once:
+#
+#   daily kWh = baseload + heating slope * HDD + cooling slope * CDD
+#
+# with HDD = max(balance point - AvgTemp, 0) and CDD = max(AvgTemp - balance
+# point, 0). Days a building has no readings are masked out of its own fit,
+# so the normal equations are built per building (two matrix products and one
+# stacked solve, fit_masked_least_squares) rather than in a Python loop.
+
+import numpy as np
+import pandas as pd
+
+BALANCE_POINT = 18.0         # deg C, below it a building heats, above it it cools
+WEATHER_TOLERANCE = '3D'     # how far back the as-of merge may look for a weather day
+MIN_DAYS = 14                # buildings with fewer matched days are not fitted
+DAY_NS = 86_400 * 10**9
+
+MODEL_COLUMNS = ['Building', 'Days', 'Baseload_kWh', 'Heating_kWh_per_HDD', 'Cooling_kWh_per_CDD', 'R2',
+                 'Actual_daily_kWh', 'Normalized_daily_kWh']
+
+
+def load_weather_daily(path, station=None):
+    """Daily AvgTemp (and AvgHumidity if available) from a weather CSV, sorted by Date.
+
+    Accepts cleaned_weather_data.csv (AvgTemp/AvgHumidity) or weatherAUS.csv
+    (MinTemp/MaxTemp, Humidity9am/3pm). station picks one Location; without
+    it, stations reporting on the same day are averaged.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = ['Date', 'Location', 'AvgTemp', 'AvgHumidity', 'MinTemp', 'MaxTemp', 'Humidity9am', 'Humidity3pm']
+    weather = pd.read_csv(path, usecols=[c for c in wanted if c in header], parse_dates=['Date'])
+
+    if station is not None:
+        if 'Location' not in weather.columns:
+            raise ValueError(f"{path} has no Location column to pick station {station!r} from")
+        weather = weather[weather['Location'] == station]
+        if weather.empty:
+            raise ValueError(f"No weather rows for station {station!r}")
+
+    if 'AvgTemp' not in weather.columns:
+        weather['AvgTemp'] = (weather['MinTemp'] + weather['MaxTemp']) / 2
+    if 'AvgHumidity' not in weather.columns and 'Humidity9am' in weather.columns:
+        weather['AvgHumidity'] = (weather['Humidity9am'] + weather['Humidity3pm']) / 2
+
+    columns = [c for c in ('AvgTemp', 'AvgHumidity') if c in weather.columns]
+    weather = weather.dropna(subset=['Date', 'AvgTemp'])
+    daily = weather.groupby(weather['Date'].dt.normalize())[columns].mean()
+    return daily.reset_index().sort_values('Date', ignore_index=True)
+
+
+def daily_matrix(manager, buildings=None):
+    """(names, days, kwh, counts): per-building daily totals on one day grid.
+
+    days is a sorted datetime64[ns] array covering every day from the first to
+    the last reading; kwh and counts are (buildings, days) arrays, counts 0
+    where a building has no readings that day.
+    """
+    names = [name for name in (buildings or manager.get_all_buildings())
+             if manager.get_building(name).keep_readings and len(manager.get_building(name).kwh_values)]
+    if not names:
+        return names, np.empty(0, dtype='datetime64[ns]'), np.empty((0, 0)), np.empty((0, 0), dtype=np.int64)
+
+    day_numbers = [manager.get_building(name).timestamps.view('int64') // DAY_NS for name in names]
+    first = min(int(d.min()) for d in day_numbers)
+    span = max(int(d.max()) for d in day_numbers) - first + 1
+
+    # one flat bincount over all readings: cell = building * span + day
+    cells = np.concatenate([row * span + (d - first) for row, d in enumerate(day_numbers)])
+    values = np.concatenate([manager.get_building(name).kwh_values for name in names])
+    size = len(names) * span
+    kwh = np.bincount(cells, weights=values, minlength=size).reshape(len(names), span)
+    counts = np.bincount(cells, minlength=size).reshape(len(names), span)
+
+    days = ((first + np.arange(span)) * DAY_NS).astype('datetime64[ns]')
+    return names, days, kwh, counts
+
+
+def align_weather(days, weather, tolerance=WEATHER_TOLERANCE):
+    """Weather values for each day of the grid (as-of merge; NaN where nothing is close enough)"""
+    grid = pd.DataFrame({'Date': pd.to_datetime(days)})
+    weather = weather.assign(Date=weather['Date'].astype(grid['Date'].dtype))
+    return pd.merge_asof(grid, weather, on='Date', direction='backward', tolerance=pd.Timedelta(tolerance))
+
+
+def degree_days(temperature, balance_point=BALANCE_POINT):
+    """(HDD, CDD) arrays for daily mean temperatures"""
+    temperature = np.asarray(temperature, dtype=np.float64)
+    return np.maximum(balance_point - temperature, 0.0), np.maximum(temperature - balance_point, 0.0)
+
+
+def fit_masked_least_squares(y, mask, design):
+    """Least-squares coefficients for every row of y against one shared design matrix.
+
+    y and mask are (rows, days), design is (days, k); each row is fitted on its
+    own unmasked days only. Returns (rows, k) coefficients.
+    """
+    rows, k = len(y), design.shape[1]
+    weights = mask.astype(np.float64)
+    y = np.where(mask, y, 0.0)
+    # per-row normal equations with that row's missing days left out, as two matrix products:
+    # X'WX for every row at once is weights @ (the outer product of each design row, flattened)
+    outer = (design[:, :, None] * design[:, None, :]).reshape(len(design), k * k)
+    xtx = (weights @ outer).reshape(rows, k, k)
+    xty = y @ design
+    # a vanishing ridge keeps rows with an unused column (no cooling days, an unseen weekday,
+    # no data at all) solvable; their coefficient for that column comes out as 0
+    ridge = 1e-10 * np.trace(xtx, axis1=1, axis2=2) / k + 1e-12
+    return np.linalg.solve(xtx + ridge[:, None, None] * np.eye(k), xty[:, :, None])[:, :, 0]
+
+
+def fit_degree_day_models(kwh, mask, hdd, cdd, min_days=MIN_DAYS):
+    """Fit baseload + heating/cooling slopes for every row of kwh at once.
+
+    kwh and mask are (buildings, days); hdd/cdd are (days,). Returns a dict of
+    (buildings,) arrays: coef (buildings, 3), days, r2, and fitted (bool).
+    """
+    design = np.column_stack([np.ones_like(hdd), hdd, cdd])          # (days, 3), shared by every building
+    coef = fit_masked_least_squares(kwh, mask, design)
+    y = np.where(mask, kwh, 0.0)
+
+    n = mask.sum(axis=1).astype(np.float64)
+    fitted = n >= min_days
+    residual = np.where(mask, kwh - coef @ design.T, 0.0)
+    mean = np.divide(y.sum(axis=1), n, out=np.zeros_like(n), where=n > 0)
+    total = (np.where(mask, kwh - mean[:, None], 0.0) ** 2).sum(axis=1)
+    r2 = np.divide(total - (residual ** 2).sum(axis=1), total, out=np.full_like(n, np.nan), where=total > 0)
+
+    coef[~fitted] = np.nan
+    r2[~fitted] = np.nan
+    return {'coef': coef, 'days': n.astype(np.int64), 'r2': r2, 'fitted': fitted}
+
+
+def weather_normalize(manager, weather, balance_point=BALANCE_POINT, tolerance=WEATHER_TOLERANCE,
+                      min_days=MIN_DAYS, buildings=None):
+    """Join the manager's readings with daily weather and fit every building.
+
+    weather is the frame from load_weather_daily(). Returns a dict with
+    models (one row per building, MODEL_COLUMNS), joined (Date, AvgTemp, HDD,
+    CDD and one kWh column per building) and matched_days. Normalized_daily_kWh
+    is the model's daily use under the average HDD/CDD of the whole weather
+    record (a typical day), i.e. consumption with this period's weather taken out.
+    """
+    names, days, kwh, counts = daily_matrix(manager, buildings)
+    aligned = align_weather(days, weather, tolerance)
+    temperature = aligned['AvgTemp'].to_numpy(dtype=np.float64)
+    has_weather = ~np.isnan(temperature)
+    hdd, cdd = degree_days(np.where(has_weather, temperature, balance_point), balance_point)
+
+    mask = (counts > 0) & has_weather
+    fit = fit_degree_day_models(kwh, mask, hdd, cdd, min_days)
+
+    normal_hdd, normal_cdd = degree_days(weather['AvgTemp'], balance_point)
+    coef = fit['coef']
+    actual = np.divide(np.where(mask, kwh, 0.0).sum(axis=1), fit['days'],
+                       out=np.full(len(names), np.nan), where=fit['days'] > 0)
+    models = pd.DataFrame({
+        'Building': names,
+        'Days': fit['days'],
+        'Baseload_kWh': coef[:, 0],
+        'Heating_kWh_per_HDD': coef[:, 1],
+        'Cooling_kWh_per_CDD': coef[:, 2],
+        'R2': fit['r2'],
+        'Actual_daily_kWh': actual,
+        'Normalized_daily_kWh': coef[:, 0] + coef[:, 1] * normal_hdd.mean() + coef[:, 2] * normal_cdd.mean(),
+    }, columns=MODEL_COLUMNS)
+
+    joined = aligned.assign(HDD=np.where(has_weather, hdd, np.nan), CDD=np.where(has_weather, cdd, np.nan))
+    joined = pd.concat([joined, pd.DataFrame(np.where(counts > 0, kwh, np.nan).T, columns=names)], axis=1)
+
+    return {'models': models, 'joined': joined, 'matched_days': int(has_weather.sum()),
+            'balance_point': balance_point}
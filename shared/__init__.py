@@ -0,0 +1,4 @@
+# Shared
+# Modules used by both projects (Capstone/campus-energy-dashboard and
+# weather-data-visualizer). The scripts put the repository root on sys.path
+# and import them as shared.<module>.
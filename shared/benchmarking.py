@@ -0,0 +1,101 @@
+# Benchmarking
+# Helpers shared by the pipeline benchmarks (benchmark_pipeline.py and
+# benchmark_weather.py): quiet timed stage runs, peak RSS, the run's
+# environment and a stage-by-stage comparison against an earlier result file.
+
+import contextlib
+import io
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+REGRESSION_RATIO = 1.25   # a stage this much slower than the baseline is a regression
+MIN_SECONDS = 0.05        # stages faster than this in both runs are too noisy to compare
+
+
+def run_stage(timings, name, func, *args, trace_memory=False, **kwargs):
+    """Run func quietly, record its wall time (and traced peak memory), return its result"""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    timings[name] = {'seconds': seconds}
+    if trace_memory:
+        timings[name]['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result
+
+
+def max_rss_mb():
+    """Peak resident memory of this process so far (ru_maxrss is KiB on Linux, bytes on macOS).
+
+    None where the resource module is missing.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(current, baseline, scale, unit, ratio=REGRESSION_RATIO):
+    """Print stage-by-stage changes against a baseline result file; returns the regressions found
+
+    scale is the result key that identifies a run (e.g. 'buildings') and unit
+    its label in the printout (e.g. 'bldg').
+    """
+    old_runs = {run[scale]: run for run in baseline['results']}
+    regressions = []
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'}:")
+    differing = sorted(key for key in current['settings']
+                       if current['settings'][key] != baseline.get('settings', {}).get(key))
+    if differing:
+        print(f"  ⚠️  settings differ ({', '.join(differing)}), timings may not be comparable")
+    width = max((len(stage) for run in current['results'] for stage in run['stages']), default=0)
+    for run in current['results']:
+        old = old_runs.get(run[scale])
+        if old is None:
+            continue
+        for stage, timing in run['stages'].items():
+            if stage not in old['stages']:
+                continue
+            before, after = old['stages'][stage]['seconds'], timing['seconds']
+            change = after / before if before > 0 else float('inf')
+            flag = ''
+            if change >= ratio and max(before, after) >= MIN_SECONDS:
+                flag = '  ⚠️  regression'
+                regressions.append((run[scale], stage, before, after))
+            print(f"  {run[scale]:>6} {unit}  {stage:<{width}} {before:8.3f} s -> {after:8.3f} s  "
+                  f"({change:5.2f}x){flag}")
+    if not regressions:
+        print("✓ No stage regressed")
+    return regressions
@@ -0,0 +1,221 @@
+# Instrumentation
+# Lightweight timing spans for the pipeline stages and hot functions.
+#
+#   with span('aggregate'):                 # a block
+#       ...
+#   with span('load_csv', file=name) as s:  # extra fields, filled in on the way
+#       df = ...
+#       s['rows'] = len(df)
+#   @timed('calculate_daily_totals', rows=len)   # a function (rows computed from its first argument)
+#   annotate(rows=len(df))                  # set fields on the innermost open span
+#
+# Every span records wall time, CPU time, rows, the process RSS and, with
+# trace_memory, the peak tracemalloc allocation inside it. Spans nest (per
+# thread) and are collected by the global PROFILER, which is disabled (and
+# nearly free) until enable() is called. Work done in worker processes is
+# added afterwards with PROFILER.add() from the timings the workers return.
+
+import contextlib
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+FIELDS = ['name', 'parent', 'depth', 'start_s', 'wall_s', 'cpu_s', 'rows', 'rss_mb', 'peak_rss_mb',
+          'peak_rss_delta_mb', 'traced_peak_mb', 'detail']
+
+
+def _rss_mb():
+    """Current resident memory in MB (Linux /proc; peak RSS elsewhere, None without resource)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    """Peak resident memory in MB, None where the resource module is missing"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3   # bytes on macOS, KiB on Linux
+
+
+class Profiler:
+    """Collects span records; see the module comment"""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self, trace_memory=False):
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.records = []
+        self._origin = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextlib.contextmanager
+    def span(self, name, rows=None, **detail):
+        if not self.enabled:
+            yield {}
+            return
+
+        stack = self._stack()
+        record = {'name': name, 'parent': stack[-1]['name'] if stack else None, 'depth': len(stack),
+                  'rows': rows, 'detail': detail}
+        stack.append(record)
+        peak_before = _peak_rss_mb()
+        if self.trace_memory:
+            record['_traced_start'] = tracemalloc.get_traced_memory()[0]
+            if len(stack) > 1:
+                # keep the parent's peak so far before resetting it for this span
+                stack[-2]['_traced_peak'] = max(stack[-2].get('_traced_peak', 0),
+                                                tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            record['start_s'] = wall_start - self._origin
+            record['rss_mb'] = _rss_mb()
+            record['peak_rss_mb'] = _peak_rss_mb()
+            if peak_before is not None:
+                record['peak_rss_delta_mb'] = record['peak_rss_mb'] - peak_before
+            if self.trace_memory:
+                peak = max(record.pop('_traced_peak', 0), tracemalloc.get_traced_memory()[1])
+                record['traced_peak_mb'] = (peak - record.pop('_traced_start')) / 1e6
+                if len(stack) > 1:
+                    stack[-2]['_traced_peak'] = max(stack[-2].get('_traced_peak', 0), peak)
+            stack.pop()
+            with self._lock:
+                self.records.append(record)
+
+    @property
+    def depth(self):
+        """Number of spans open in this thread"""
+        return len(self._stack())
+
+    def annotate(self, **fields):
+        """Set fields (rows, or anything else for the detail column) on the innermost open span"""
+        stack = self._stack() if self.enabled else None
+        if not stack:
+            return
+        if 'rows' in fields:
+            stack[-1]['rows'] = fields.pop('rows')
+        stack[-1]['detail'].update(fields)
+
+    def add(self, name, wall_s, rows=None, parent=None, depth=None, started=None, **detail):
+        """Record a span measured elsewhere (e.g. in a worker process)
+
+        parent/depth default to the innermost open span; started is the
+        perf_counter() reading at its start (default: it ended just now).
+        """
+        if not self.enabled:
+            return
+        stack = self._stack()
+        if started is None:
+            started = time.perf_counter() - wall_s
+        start_s = started - self._origin
+        record = {'name': name, 'parent': parent or (stack[-1]['name'] if stack else None),
+                  'depth': len(stack) if depth is None else depth, 'start_s': start_s, 'wall_s': wall_s,
+                  'cpu_s': None, 'rows': rows, 'detail': detail}
+        with self._lock:
+            self.records.append(record)
+
+    def timed(self, name=None, rows=None):
+        """Decorator form of span(); rows is a callable applied to the first argument"""
+        def decorate(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                count = rows(args[0]) if rows is not None and args else None
+                with self.span(label, rows=count):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def ordered(self):
+        """Records in start order (spans close inner-first, so they are collected out of order)"""
+        return sorted(self.records, key=lambda r: (r['start_s'], r['depth']))
+
+    def write(self, output_dir, basename='profile'):
+        """Write <basename>.json and <basename>.csv to output_dir; returns their paths"""
+        records = self.ordered()
+        json_path = os.path.join(output_dir, f"{basename}.json")
+        csv_path = os.path.join(output_dir, f"{basename}.csv")
+        with open(json_path, 'w') as f:
+            json.dump({'trace_memory': self.trace_memory, 'spans': records}, f, indent=2, default=str)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow({**record, 'detail': json.dumps(record.get('detail') or {}, default=str)})
+        return json_path, csv_path
+
+    def report(self, max_depth=1):
+        """Printable table of the spans up to max_depth"""
+        lines = [f"{'span':<40} {'wall s':>9} {'cpu s':>9} {'rows':>12} {'peak RSS MB':>12}"]
+        for record in self.ordered():
+            if record['depth'] > max_depth:
+                continue
+            label = '  ' * record['depth'] + record['name']
+            if (record.get('detail') or {}).get('file'):
+                label += f" ({record['detail']['file']})"
+            cpu = f"{record['cpu_s']:9.3f}" if record.get('cpu_s') is not None else f"{'-':>9}"
+            rows = f"{record['rows']:12,}" if record.get('rows') is not None else f"{'-':>12}"
+            peak = f"{record['peak_rss_mb']:12.0f}" if record.get('peak_rss_mb') is not None else f"{'-':>12}"
+            lines.append(f"{label:<40} {record['wall_s']:9.3f} {cpu} {rows} {peak}")
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+span = PROFILER.span
+timed = PROFILER.timed
+annotate = PROFILER.annotate
+
+
+@contextlib.contextmanager
+def cprofile_to(path):
+    """Run the block under cProfile and dump the stats to path (None = no profiling)"""
+    if path is None:
+        yield None
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
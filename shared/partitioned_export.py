@@ -0,0 +1,263 @@
+# Partitioned Export
+# Append-only export of cleaned rows into per-key, per-period part files with
+# a manifest, instead of rewriting one big CSV every run.
+#
+# Layout under export_dir:
+#   manifest.json                          settings, column schema, watermarks and every part
+#   <key>=<value>/<grain>=<period>/part-00000.<ext>
+#
+# e.g. Building=Library/month=2025-03/part-00000.npz (energy dashboard) or
+# Location=Albury/year=2009/part-00000.npz (weather visualizer). Each append()
+# writes only the rows newer than its key's watermark (the latest timestamp
+# already exported), as new part files; existing files are never rewritten. A
+# partition that grows across runs (the current period) just gets another part.
+# Readers use the manifest to open only the parts of the keys and time range
+# they need (read()).
+#
+# The column schema is fixed by the first append(); every later chunk is
+# checked and converted to it (ValueError if a column is missing, unexpected
+# or cannot be converted). Measurement columns (float_columns, kWh by default)
+# are always stored as float64, so a chunk with missing values still fits
+# after a first chunk that happened to read as integers.
+#
+# Formats: 'npz' (one NumPy array per column, the default, no extra packages),
+# 'parquet' (needs pyarrow) and 'csv'. compression='gzip' etc. compresses the
+# csv/parquet files; any compression makes npz use savez_compressed.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMATS = ('npz', 'parquet', 'csv')
+GRAINS = {'day': 'D', 'month': 'M', 'year': 'Y'}
+CSV_SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst'}
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PartitionedExport:
+    """Append-only, manifest-indexed part files partitioned by key column and time period"""
+
+    def __init__(self, export_dir, key='Building', time='Date', grain='month', fmt='npz', compression=None,
+                 float_columns=('kWh',)):
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain: {grain!r} (use one of {', '.join(GRAINS)})")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt!r} (use one of {', '.join(FORMATS)})")
+        if fmt == 'parquet' and not _has_pyarrow():
+            print("⚠️  pyarrow is not installed, writing npz partitions instead of parquet")
+            fmt = 'npz'
+
+        self.export_dir = export_dir
+        self.manifest_path = os.path.join(export_dir, 'manifest.json')
+        settings = {'key': key, 'time': time, 'grain': grain, 'format': fmt, 'compression': compression}
+        try:
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {**settings, 'schema': None, 'watermarks': {}, 'parts': []}
+
+        stored = {name: self.manifest.get(name) for name in settings}
+        if stored != settings:
+            raise ValueError(f"{export_dir} was written with {stored}, not {settings}; "
+                             "use another directory or delete it")
+        self.key, self.time, self.grain = key, time, grain
+        self.fmt, self.compression = fmt, compression
+        self.float_columns = tuple(float_columns)
+
+    @property
+    def parts(self):
+        """The manifest's parts as a DataFrame (path, key, period, rows, start, end, bytes)"""
+        return pd.DataFrame(self.manifest['parts'], columns=['path', 'key', 'period', 'rows', 'start', 'end',
+                                                              'bytes'])
+
+    def watermark(self, value):
+        """Latest exported timestamp for one key value (None if never exported)"""
+        mark = self.manifest['watermarks'].get(str(value))
+        return pd.Timestamp(mark) if mark else None
+
+    def append(self, df):
+        """Write the rows of df newer than their key's watermark as new part files.
+
+        Returns a dict with rows (written), parts (files written) and skipped
+        (rows at or before the watermark, or without a timestamp).
+        """
+        if df.empty:
+            return {'rows': 0, 'parts': 0, 'skipped': 0}
+
+        dates = pd.to_datetime(df[self.time], errors='coerce')
+        keys = df[self.key].astype(str) if self.key else pd.Series('all', index=df.index)
+        marks = pd.to_datetime(keys.map(self.manifest['watermarks']))
+        new = (dates.notna() & (marks.isna() | (dates > marks))).to_numpy()
+        if not new.any():
+            return {'rows': 0, 'parts': 0, 'skipped': len(df)}
+
+        fresh = df[new]
+        if self.manifest['schema'] is None:
+            self.manifest['schema'] = {
+                column: 'float64' if column in self.float_columns else _kind(fresh[column])
+                for column in fresh.columns if column != self.key}
+        fresh = self._conform(fresh)
+
+        stamps = dates[new].to_numpy(dtype='datetime64[ns]')
+        periods = stamps.astype(f"datetime64[{GRAINS[self.grain]}]").astype(str)
+        groups = pd.Series(np.arange(len(fresh))).groupby([keys[new].to_numpy(), periods], sort=True).indices
+        existing = self._part_counts()
+
+        written = 0
+        for (value, period), positions in groups.items():
+            part = fresh.iloc[positions]
+            number = existing.get((value, period), 0)
+            path = self._write_part(part, value, period, number)
+            part_stamps = stamps[positions]
+            self.manifest['parts'].append({
+                'path': path,
+                'key': value,
+                'period': period,
+                'rows': len(part),
+                'start': str(pd.Timestamp(part_stamps.min())),
+                'end': str(pd.Timestamp(part_stamps.max())),
+                'bytes': os.path.getsize(os.path.join(self.export_dir, path)),
+            })
+            existing[(value, period)] = number + 1
+            written += len(part)
+
+        for value, latest in pd.Series(stamps).groupby(keys[new].to_numpy()).max().items():
+            self.manifest['watermarks'][value] = str(latest)
+        self._save()
+        return {'rows': written, 'parts': len(groups), 'skipped': len(df) - written}
+
+    def read(self, keys=None, start=None, end=None, columns=None):
+        """Rows for the given key values and start <= time < end, opening only the parts that overlap"""
+        parts = self.parts
+        if parts.empty:
+            return pd.DataFrame()
+        if keys is not None:
+            parts = parts[parts['key'].isin([str(k) for k in ([keys] if isinstance(keys, str) else keys)])]
+        if start is not None:
+            parts = parts[pd.to_datetime(parts['end']) >= pd.Timestamp(start)]
+        if end is not None:
+            parts = parts[pd.to_datetime(parts['start']) < pd.Timestamp(end)]
+        if parts.empty:
+            return pd.DataFrame()
+
+        frames = [self._read_part(row.path, row.key) for row in parts.itertuples()]
+        rows = pd.concat(frames, ignore_index=True)
+        dates = rows[self.time]
+        keep = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            keep &= (dates >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (dates < pd.Timestamp(end)).to_numpy()
+        rows = rows[keep].reset_index(drop=True)
+        return rows[columns] if columns is not None else rows
+
+    def _conform(self, rows):
+        """rows with exactly the schema's columns, converted to their stored types"""
+        schema = self.manifest['schema']
+        missing = [column for column in schema if column not in rows.columns]
+        unexpected = [column for column in rows.columns if column not in schema and column != self.key]
+        if missing or unexpected:
+            raise ValueError(f"Rows do not match the schema of {self.export_dir} "
+                             f"(missing: {missing or 'none'}, unexpected: {unexpected or 'none'})")
+
+        columns = {self.key: rows[self.key]} if self.key else {}
+        for column, kind in schema.items():
+            values = rows[column]
+            if kind == 'datetime':
+                values = pd.to_datetime(values, errors='coerce')
+            elif kind == 'category':
+                values = values.astype('category')
+            elif kind != 'string' and values.dtype != kind:
+                try:
+                    values = pd.to_numeric(values).astype(kind)
+                except (TypeError, ValueError) as error:
+                    raise ValueError(f"Column {column!r} cannot be stored as {kind} in {self.export_dir}: "
+                                     f"{error}") from None
+            columns[column] = values
+        return pd.DataFrame(columns, index=rows.index)
+
+    def _part_counts(self):
+        counts = {}
+        for part in self.manifest['parts']:
+            counts[(part['key'], part['period'])] = counts.get((part['key'], part['period']), 0) + 1
+        return counts
+
+    def _write_part(self, part, value, period, number):
+        """Write one part file; returns its path relative to export_dir"""
+        folder = os.path.join(f"{self.key or 'all'}={value}", f"{self.grain}={period}")
+        os.makedirs(os.path.join(self.export_dir, folder), exist_ok=True)
+        data = part.drop(columns=[self.key]) if self.key else part
+
+        if self.fmt == 'npz':
+            path = os.path.join(folder, f"part-{number:05d}.npz")
+            arrays = {column: _encode(data[column], kind) for column, kind in self.manifest['schema'].items()}
+            save = np.savez_compressed if self.compression else np.savez
+            save(os.path.join(self.export_dir, path), **arrays)
+        elif self.fmt == 'parquet':
+            path = os.path.join(folder, f"part-{number:05d}.parquet")
+            data.to_parquet(os.path.join(self.export_dir, path), index=False,
+                            compression=self.compression or None)
+        else:
+            path = os.path.join(folder, f"part-{number:05d}.csv{CSV_SUFFIXES.get(self.compression, '')}")
+            data.to_csv(os.path.join(self.export_dir, path), index=False, compression=self.compression)
+        return path
+
+    def _read_part(self, path, value):
+        full_path = os.path.join(self.export_dir, path)
+        schema = self.manifest['schema']
+        if self.fmt == 'npz':
+            with np.load(full_path) as arrays:
+                rows = pd.DataFrame({column: _decode(arrays[column], kind) for column, kind in schema.items()})
+        elif self.fmt == 'parquet':
+            rows = pd.read_parquet(full_path)
+        else:
+            dates = [column for column, kind in schema.items() if kind == 'datetime']
+            rows = pd.read_csv(full_path, parse_dates=dates)
+            for column, kind in schema.items():
+                if kind == 'category':
+                    rows[column] = rows[column].astype('category')
+        if self.key:
+            rows.insert(0, self.key, value)
+        return rows
+
+    def _save(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _kind(column):
+    """How a column is stored: 'datetime', 'category', 'string' or its NumPy dtype"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return 'datetime'
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return str(column.dtype)
+    return 'string'
+
+
+def _encode(column, kind):
+    if kind == 'datetime':
+        return column.to_numpy(dtype='datetime64[ns]').view('int64')   # NaT stays the int64 minimum
+    if kind in ('category', 'string'):
+        return column.astype(str).to_numpy(dtype=str)
+    return column.to_numpy(dtype=kind)
+
+
+def _decode(values, kind):
+    if kind == 'datetime':
+        return values.view('datetime64[ns]')
+    if kind == 'category':
+        return pd.Categorical(values)
+    return values
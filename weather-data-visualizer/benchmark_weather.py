@@ -0,0 +1,165 @@
+# Weather Pipeline Benchmark
+# Times every stage of weather_visualizer.py (load, clean, stats, groupby,
+# render, export) at several dataset sizes and writes the results as JSON, so
+# runs from different commits can be compared.
+#
+# weatherAUS.csv is not shipped with the project, so each scale is a seeded
+# synthetic file with the same 23 columns (stations x days, a few percent of
+# the values missing). Every scale runs in a fresh worker process so its peak
+# RSS is its own.
+#
+#   python benchmark_weather.py --stations 50 500 --days 3650 --out bench.json
+#   python benchmark_weather.py --stations 50 500 --days 3650 --compare bench.json
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, REPO_ROOT)  # for the shared/ modules
+from shared.benchmarking import run_stage, max_rss_mb, environment, compare, REGRESSION_RATIO
+
+MISSING_RATE = 0.03       # fraction of measurement values left empty
+
+WIND_DIRECTIONS = np.array(['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                            'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW'])
+
+
+def make_weather_csv(path, stations, days, seed=42, start='2008-12-01'):
+    """Write a weatherAUS-shaped CSV with stations x days rows; returns the row count"""
+    rng = np.random.default_rng(seed)
+    n = stations * days
+    dates = np.tile(pd.date_range(start, periods=days, freq='D').strftime('%Y-%m-%d').to_numpy(), stations)
+    locations = np.repeat([f"Station_{i:04d}" for i in range(stations)], days)
+
+    day_of_year = np.tile(pd.date_range(start, periods=days, freq='D').dayofyear.to_numpy(), stations)
+    season = np.cos(2 * np.pi * (day_of_year - 15) / 365.25)   # southern summer in January
+    climate = np.repeat(rng.uniform(-4, 4, stations), days)
+
+    min_temp = (12 + 6 * season + climate + rng.normal(0, 3, n)).round(1)
+    max_temp = (min_temp + rng.uniform(5, 14, n)).round(1)
+    rainfall = np.where(rng.random(n) < 0.3, rng.exponential(6, n), 0).round(1)
+    humidity_9am = np.clip(70 - 10 * season + rng.normal(0, 12, n), 5, 100).round()
+    humidity_3pm = np.clip(humidity_9am - rng.uniform(5, 25, n), 1, 100).round()
+
+    frame = pd.DataFrame({
+        'Date': dates,
+        'Location': locations,
+        'MinTemp': min_temp,
+        'MaxTemp': max_temp,
+        'Rainfall': rainfall,
+        'Evaporation': rng.uniform(0, 12, n).round(1),
+        'Sunshine': rng.uniform(0, 13, n).round(1),
+        'WindGustDir': WIND_DIRECTIONS[rng.integers(0, 16, n)],
+        'WindGustSpeed': rng.integers(15, 90, n).astype(float),
+        'WindDir9am': WIND_DIRECTIONS[rng.integers(0, 16, n)],
+        'WindDir3pm': WIND_DIRECTIONS[rng.integers(0, 16, n)],
+        'WindSpeed9am': rng.integers(0, 45, n).astype(float),
+        'WindSpeed3pm': rng.integers(0, 50, n).astype(float),
+        'Humidity9am': humidity_9am,
+        'Humidity3pm': humidity_3pm,
+        'Pressure9am': rng.normal(1017, 7, n).round(1),
+        'Pressure3pm': rng.normal(1015, 7, n).round(1),
+        'Cloud9am': rng.integers(0, 9, n).astype(float),
+        'Cloud3pm': rng.integers(0, 9, n).astype(float),
+        'Temp9am': (min_temp + rng.uniform(2, 6, n)).round(1),
+        'Temp3pm': (max_temp - rng.uniform(0, 3, n)).round(1),
+        'RainToday': np.where(rainfall > 1, 'Yes', 'No'),
+        'RainTomorrow': np.where(rng.random(n) < 0.22, 'Yes', 'No'),
+    })
+    for column in ['MinTemp', 'MaxTemp', 'Rainfall', 'Humidity9am', 'Humidity3pm', 'Sunshine', 'Cloud3pm']:
+        frame.loc[rng.random(n) < MISSING_RATE, column] = np.nan
+
+    frame.to_csv(path, index=False)
+    return n
+
+
+def benchmark_scale(stations, days, seed, full_load, trace_memory):
+    """Generate one dataset and time every visualizer stage on it; returns one result dict"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import weather_visualizer as wv
+
+    workdir = tempfile.mkdtemp(prefix='weather_bench_')
+    try:
+        path = os.path.join(workdir, 'weatherAUS.csv')
+        rows = make_weather_csv(path, stations, days, seed)
+
+        stages = {}
+        t = {'trace_memory': trace_memory}
+        df = run_stage(stages, 'load', wv.load_weather, path, show_info=False, typed=not full_load, **t)
+        df_clean = run_stage(stages, 'clean', wv.clean_weather, df, **t)
+        stats = run_stage(stages, 'stats', wv.compute_statistics, df_clean, **t)
+        _, monthly_rainfall = run_stage(stages, 'groupby', wv.monthly_aggregates, df_clean, **t)
+        run_stage(stages, 'render', wv.render_plots, df_clean, monthly_rainfall, workdir, dpi=100, fast=True,
+                  workers=1, **t)
+        run_stage(stages, 'export', wv.export_results, df_clean, stats, monthly_rainfall, workdir, **t)
+
+        return {
+            'stations': stations,
+            'rows': rows,
+            'stages': stages,
+            'total_seconds': sum(stage['seconds'] for stage in stages.values()),
+            'max_rss_mb': max_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the weather visualizer stages")
+    parser.add_argument('--stations', type=int, nargs='+', default=[10, 100, 500],
+                        help="one scale per value: number of generated stations")
+    parser.add_argument('--days', type=int, default=3650, help="days of observations per station")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--full-load', action='store_true',
+                        help="time the untyped read of every column instead of the typed read")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record each stage's peak Python/NumPy allocation (slows the stages down)")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--compare', default=None, help="earlier results JSON to compare against")
+    parser.add_argument('--ratio', type=float, default=REGRESSION_RATIO,
+                        help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:   # read first, --out may be the same file
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = {'pipeline': 'weather_visualizer', 'environment': environment(),
+              'settings': {'days': args.days, 'seed': args.seed, 'full_load': args.full_load,
+                           'trace_memory': args.trace_memory},
+              'results': []}
+
+    for stations in args.stations:
+        # a fresh process per scale, so max RSS is not carried over from the previous scale
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            run = executor.submit(benchmark_scale, stations, args.days, args.seed, args.full_load,
+                                  args.trace_memory).result()
+        report['results'].append(run)
+
+        rss = f"{run['max_rss_mb']:.0f} MB" if run['max_rss_mb'] is not None else 'n/a'
+        print(f"\n{stations} stations, {run['rows']:,} rows  "
+              f"(total {run['total_seconds']:.2f} s, max RSS {rss})")
+        for stage, timing in run['stages'].items():
+            memory = f"  peak {timing['peak_mb']:8.1f} MB" if 'peak_mb' in timing else ''
+            print(f"  {stage:<8} {timing['seconds']:8.3f} s{memory}")
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Saved: {args.out}")
+
+    if baseline is not None and compare(report, baseline, 'stations', 'stations', args.ratio):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Fused Column Statistics
+# count/sum/mean/min/max/std of several columns in one pass over the data.
+# The columns are read together chunk by chunk (a chunk is a small (k, rows)
+# float64 block that stays in cache), and the per-chunk moments are merged
+# with Chan's parallel variance update, so every value is touched once
+# instead of once per statistic per column.
+#
+# column_moments() caches its result per DataFrame, so the console output
+# and weather_analysis_report.md share a single scan.
+
+import weakref
+
+import numpy as np
+
+CHUNK_ROWS = 16_384
+
+# id(df) -> (weakref to df, (columns, rows), result)
+_cache = {}
+
+
+def block_moments(columns, chunk_rows=CHUNK_ROWS):
+    """Moments of k equal-length 1-D arrays (no NaN) in one chunked pass.
+
+    Returns a dict of length-k float64 arrays: count, sum, mean, min, max, var, std
+    (var/std are population values, ddof=0, like np.var/np.std).
+    """
+    columns = [np.asarray(c) for c in columns]
+    k = len(columns)
+    n = len(columns[0]) if k else 0
+
+    count = 0
+    total = np.zeros(k)
+    mean = np.zeros(k)
+    m2 = np.zeros(k)
+    low = np.full(k, np.inf)
+    high = np.full(k, -np.inf)
+
+    for start in range(0, n, chunk_rows):
+        # (k, rows): each column's chunk is contiguous, so the row reductions are too
+        block = np.empty((k, min(chunk_rows, n - start)))
+        for i, c in enumerate(columns):
+            block[i] = c[start:start + chunk_rows]
+        rows = block.shape[1]
+
+        block_sum = block.sum(axis=1)
+        block_mean = block_sum / rows
+        centred = block - block_mean[:, None]
+        block_m2 = np.einsum('ij,ij->i', centred, centred)
+
+        # Chan et al.: merge (count, mean, m2) of the chunk into the running totals
+        delta = block_mean - mean
+        merged = count + rows
+        mean += delta * rows / merged
+        m2 += block_m2 + delta ** 2 * count * rows / merged
+        count = merged
+
+        total += block_sum
+        np.minimum(low, block.min(axis=1), out=low)
+        np.maximum(high, block.max(axis=1), out=high)
+
+    var = m2 / count if count else np.full(k, np.nan)
+    if not count:
+        mean[:] = low[:] = high[:] = np.nan
+    return {
+        'count': np.full(k, count),
+        'sum': total,
+        'mean': mean,
+        'min': low,
+        'max': high,
+        'var': var,
+        'std': np.sqrt(var),
+    }
+
+
+def column_moments(df, columns, chunk_rows=CHUNK_ROWS):
+    """{column: {count, sum, mean, min, max, var, std}} for columns of df, cached per DataFrame.
+
+    The cache is keyed on the DataFrame object, the column list and the row
+    count, so a new or resized frame is scanned again. Changing values in place
+    is not detected; call clear_cache() after doing that.
+    """
+    key = (tuple(columns), len(df))
+    entry = _cache.get(id(df))
+    if entry is not None and entry[0]() is df and entry[1] == key:
+        return entry[2]
+
+    moments = block_moments([df[c].to_numpy() for c in columns], chunk_rows)
+    result = {c: {name: values[i].item() for name, values in moments.items()}
+              for i, c in enumerate(columns)}
+
+    _cache[id(df)] = (weakref.ref(df, lambda _, i=id(df): _cache.pop(i, None)), key, result)
+    return result
+
+
+def clear_cache():
+    _cache.clear()
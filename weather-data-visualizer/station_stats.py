@@ -0,0 +1,155 @@
+# Per-Station Analytics
+# The TASK 3 statistics and TASK 5 monthly aggregates computed per Location
+# (or per Location and Year) with one grouped pass over the cleaned data,
+# instead of mixing every station into a single series.
+#
+# station_statistics()  tidy table: one row per station (and year) and variable
+# station_monthly()     one row per station (and year) and month
+# analyze_stations()    both, optionally split across worker processes by station
+# export_station_results() writes the tables and one markdown report per station
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# variable name in the tables -> column of df_clean (same names as compute_statistics())
+VARIABLES = {'temp': 'AvgTemp', 'rainfall': 'Rainfall', 'humidity': 'AvgHumidity'}
+UNITS = {'temp': '°C', 'rainfall': ' mm', 'humidity': '%'}
+TITLES = {'temp': 'Temperature', 'rainfall': 'Rainfall', 'humidity': 'Humidity'}
+
+
+def _keys(by_year):
+    return ['Location', 'Year'] if by_year else ['Location']
+
+
+def station_statistics(df_clean, by_year=False):
+    """count/mean/min/max/std/sum of temp, rainfall and humidity per Location (and Year).
+
+    std is the population std (ddof=0), the same as np.std in compute_statistics().
+    Returns columns Location, [Year,] Variable, count, mean, min, max, std, sum.
+    """
+    keys = _keys(by_year)
+    columns = list(VARIABLES.values())
+
+    # mean/std/sum accumulate in float64 even when the columns were loaded as
+    # float32; min/max keep the loaded values as they are
+    groups = [df_clean[k] for k in keys]
+    values = df_clean[columns].astype(np.float64).groupby(groups, observed=True, sort=True)
+    extremes = df_clean[columns].groupby(groups, observed=True, sort=True).agg(['min', 'max'])
+
+    moments = values.agg(['count', 'mean', 'sum'])
+    std = values.std(ddof=0)
+
+    tables = []
+    for name, column in VARIABLES.items():
+        table = moments[column].copy()
+        table['min'] = extremes[column]['min']
+        table['max'] = extremes[column]['max']
+        table['std'] = std[column]
+        table.insert(0, 'Variable', name)
+        tables.append(table)
+
+    tidy = pd.concat(tables).reset_index()
+    tidy['Location'] = tidy['Location'].astype(str)
+    tidy = tidy.sort_values(keys, kind='stable', ignore_index=True)   # keeps temp, rainfall, humidity order
+    return tidy[keys + ['Variable', 'count', 'mean', 'min', 'max', 'std', 'sum']]
+
+
+def station_monthly(df_clean, by_year=False):
+    """TASK 5 per Location (and Year): AvgTemp mean/min/max, Rainfall sum, AvgHumidity mean per Month"""
+    keys = _keys(by_year) + ['Month']
+    monthly = df_clean.groupby(keys, observed=True, sort=True).agg(
+        AvgTemp_mean=('AvgTemp', 'mean'),
+        AvgTemp_min=('AvgTemp', 'min'),
+        AvgTemp_max=('AvgTemp', 'max'),
+        Rainfall_sum=('Rainfall', 'sum'),
+        AvgHumidity_mean=('AvgHumidity', 'mean'),
+    ).reset_index()
+    monthly['Location'] = monthly['Location'].astype(str)
+    return monthly
+
+
+def _analyze_shard(shard, by_year):
+    results = {'stats': station_statistics(shard), 'monthly': station_monthly(shard)}
+    if by_year:
+        results['stats_by_year'] = station_statistics(shard, by_year=True)
+        results['monthly_by_year'] = station_monthly(shard, by_year=True)
+    return results
+
+
+def analyze_stations(df_clean, by_year=False, workers=1):
+    """Per-station statistics and monthly aggregates.
+
+    Returns {'stats': df, 'monthly': df}, plus 'stats_by_year' and
+    'monthly_by_year' (grouped by Location and Year) when by_year=True.
+
+    workers > 1 splits the stations into that many shards and computes each
+    shard in its own process. Every station lands in exactly one shard, so the
+    shard results are simply concatenated.
+    """
+    if 'Location' not in df_clean.columns:
+        raise KeyError("df_clean has no Location column")
+
+    locations = pd.unique(df_clean['Location'].astype(str))
+    if workers > 1 and len(locations) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        shards_of = np.array_split(np.sort(locations), min(workers, len(locations)))
+        station = df_clean['Location'].astype(str)
+        shards = [df_clean[station.isin(names)] for names in shards_of]
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            parts = list(executor.map(_analyze_shard, shards, [by_year] * len(shards)))
+        return {name: pd.concat([p[name] for p in parts], ignore_index=True) for name in parts[0]}
+
+    return _analyze_shard(df_clean, by_year)
+
+
+def station_report(location, stats, monthly):
+    """Markdown summary of one station from the analyze_stations() tables"""
+    rows = stats[stats['Location'] == location]
+    months = monthly[monthly['Location'] == location]
+
+    lines = [f"# Weather Report: {location}", ""]
+    for _, row in rows.iterrows():
+        unit = UNITS[row['Variable']]
+        lines.append(f"## {TITLES[row['Variable']]}")
+        lines.append(f"- Records: {int(row['count'])}")
+        lines.append(f"- Mean: {row['mean']:.2f}{unit}")
+        lines.append(f"- Min: {row['min']:.2f}{unit}")
+        lines.append(f"- Max: {row['max']:.2f}{unit}")
+        lines.append(f"- Std Dev: {row['std']:.2f}{unit}")
+        if row['Variable'] == 'rainfall':
+            lines.append(f"- Total: {row['sum']:.2f}{unit}")
+        lines.append("")
+
+    if not months.empty:
+        wettest = months.loc[months['Rainfall_sum'].idxmax()]
+        driest = months.loc[months['Rainfall_sum'].idxmin()]
+        lines.append("## Seasonal Rainfall")
+        lines.append(f"- Wettest month: Month {int(wettest['Month'])} with {wettest['Rainfall_sum']:.2f} mm")
+        lines.append(f"- Driest month: Month {int(driest['Month'])} with {driest['Rainfall_sum']:.2f} mm")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def export_station_results(results, output_dir='.'):
+    """Write station_<table>.csv for every table and stations/<Location>.md; returns the report count"""
+    for name, table in results.items():
+        filename = f"station_{name}.csv"
+        table.to_csv(os.path.join(output_dir, filename), index=False)
+        print(f"✓ Saved: {filename}")
+
+    stats, monthly = results['stats'], results['monthly']
+    report_dir = os.path.join(output_dir, 'stations')
+    os.makedirs(report_dir, exist_ok=True)
+    locations = stats['Location'].unique()
+    for location in locations:
+        safe_name = re.sub(r'[^A-Za-z0-9_-]+', '_', location)
+        with open(os.path.join(report_dir, f"{safe_name}.md"), 'w') as f:
+            f.write(station_report(location, stats, monthly))
+
+    print(f"✓ Saved: {len(locations)} station reports in stations/")
+    return len(locations)
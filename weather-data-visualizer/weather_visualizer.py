@@ -1,199 +1,413 @@
 # Weather Data Visualizer
 # analyzes weather data and creates visualizationssssss......
+#
+# Run it as a script (python weather_visualizer.py --help for the stage flags)
+# or import the stage functions: load_weather(), clean_weather(),
+# compute_statistics(), monthly_aggregates(), render_plots(), export_results().
+# Per-station (Location) results live in station_stats.py (--by-station).
+# matplotlib is imported only when a plot is drawn.
+
+import argparse
+import os
+import sys
+import time
 
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 
-print("Starting Weather Data Analysis...")
-print("=" * 50)
+from fused_stats import column_moments
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, REPO_ROOT)  # for the shared/ modules
+from shared.partitioned_export import PartitionedExport, FORMATS
+from shared.instrumentation import PROFILER, span, timed, annotate, cprofile_to
+
+STAGES = ('ingest', 'aggregate', 'plot', 'export')
+PLOT_DPI = 300
+PROFILE_DEPTH = 1   # span nesting printed by --profile (the files hold every span)
+
+# the typed loader reads only these columns; every measurement has one decimal,
+# so float32 holds it exactly enough and halves the memory of float64
+WEATHER_COLUMNS = ['Date', 'Location', 'MinTemp', 'MaxTemp', 'Rainfall', 'Humidity9am', 'Humidity3pm']
+WEATHER_DTYPES = {
+    'Location': 'category',
+    'MinTemp': 'float32',
+    'MaxTemp': 'float32',
+    'Rainfall': 'float32',
+    'Humidity9am': 'float32',
+    'Humidity3pm': 'float32',
+}
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
 #=================================================================================================================================================
 
-print("\nTASK 1: Loading the data...")
+def read_weather_typed(path='weatherAUS.csv', engine=None):
+    """Read only WEATHER_COLUMNS, with Date parsed, float32 measurements and a categorical Location.
 
-# Load the CSV file into a DataFrame :
+    engine='pyarrow' uses the multithreaded pyarrow parser when it is installed
+    (falls back to the default C parser with a warning otherwise).
+    """
+    if engine == 'pyarrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("⚠️ pyarrow is not installed, using the default CSV parser")
+            engine = None
 
-df = pd.read_csv('weatherAUS.csv')     # to read the CSV file....uhmm... it also creates the table...    
+    kwargs = {'engine': engine} if engine else {}
+    return pd.read_csv(path, usecols=WEATHER_COLUMNS, dtype=WEATHER_DTYPES,
+                       parse_dates=['Date'], **kwargs)
 
-print("\nFirst 5 rows of data:")
-print(df.head())
 
+def compare_loaders(path='weatherAUS.csv', engine=None):
+    """Time and measure the full read against the typed read; returns {loader: {seconds, memory_mb, columns}}"""
+    loaders = {
+        'full': lambda: pd.read_csv(path),
+        'typed': lambda: read_weather_typed(path, engine),
+    }
 
-print("\nDataset Information:")        # column names, data types, etc.
-print(df.info())
+    results = {}
+    for name, read in loaders.items():
+        start = time.perf_counter()
+        df = read()
+        seconds = time.perf_counter() - start
+        results[name] = {
+            'seconds': seconds,
+            'memory_mb': df.memory_usage(deep=True).sum() / 1e6,
+            'columns': df.shape[1],
+        }
+        del df
 
+    print("\nLoader comparison:")
+    for name, r in results.items():
+        print(f"  {name:<6} {r['seconds']:7.2f} s  {r['memory_mb']:9.1f} MB  {r['columns']:3d} columns")
+    full, typed = results['full'], results['typed']
+    print(f"  typed read is {full['seconds'] / max(typed['seconds'], 1e-9):.1f}x faster "
+          f"and uses {full['memory_mb'] / max(typed['memory_mb'], 1e-9):.1f}x less memory")
+    return results
 
-print("\nBasic Statistics:")            # mean, min, max, etc
-print(df.describe())
 
+@timed('load')
+def load_weather(path='weatherAUS.csv', show_info=True, typed=True, engine=None):
+    """TASK 1: read the CSV into a DataFrame and show what's in it
 
-#=================================================================================================================================================
-print("\n" + "=" * 50)
-print("TASK 2: Cleaning the data...")
+    typed=True reads only the analysed columns with compact dtypes
+    (read_weather_typed); typed=False reads every column as pandas guesses it.
+    """
+    print("\nTASK 1: Loading the data...")
 
+    # Load the CSV file into a DataFrame :
 
-df['Date'] = pd.to_datetime(df['Date'])      #conversion from date column to datetime
+    with span('read_csv', typed=typed, engine=engine):
+        if typed:
+            df = read_weather_typed(path, engine)
+        else:
+            df = pd.read_csv(path)     # to read the CSV file....uhmm... it also creates the table...
+        annotate(rows=len(df))
+    annotate(rows=len(df))
 
+    if show_info:
+        print("\nFirst 5 rows of data:")
+        print(df.head())
 
-columns_to_keep = ['Date', 'MinTemp', 'MaxTemp', 'Rainfall', 'Humidity9am', 'Humidity3pm']      # selecting Date, Temperature, Rainfall, and Humidity
-df_clean = df[columns_to_keep].copy()
 
+        print("\nDataset Information:")        # column names, data types, etc.
+        print(df.info())
 
-print(f"\nRows before cleaning: {len(df_clean)}")       # dropping rows with missing data
-df_clean = df_clean.dropna()
-print(f"Rows after cleaning: {len(df_clean)}")
 
+        print("\nBasic Statistics:")            # mean, min, max, etc
+        print(df.describe())
 
-df_clean['AvgTemp'] = (df_clean['MinTemp'] + df_clean['MaxTemp']) / 2     #avg temp col... avg of min and max
+    return df
 
 
-df_clean['AvgHumidity'] = (df_clean['Humidity9am'] + df_clean['Humidity3pm']) / 2    #avg humidity col... 
+#=================================================================================================================================================
 
-print("\nCleaned data preview:")
-print(df_clean.head())
+@timed('clean', rows=len)
+def clean_weather(df):
+    """TASK 2: keep Date/Temperature/Rainfall/Humidity, drop missing rows, add averages"""
+    print("\n" + "=" * 50)
+    print("TASK 2: Cleaning the data...")
 
 
+    with span('to_datetime', rows=len(df)):
+        df['Date'] = pd.to_datetime(df['Date'])      #conversion from date column to datetime
+
+
+    columns_to_keep = ['Date', 'MinTemp', 'MaxTemp', 'Rainfall', 'Humidity9am', 'Humidity3pm']      # selecting Date, Temperature, Rainfall, and Humidity
+    if 'Location' in df.columns:
+        columns_to_keep.insert(1, 'Location')      # the station, for the per-station results
+    df_clean = df[columns_to_keep].copy()
 
-#=================================================================================================================================================
-print("\n" + "=" * 50)
-print("TASK 3: Computing statistics with NumPy...")
 
+    print(f"\nRows before cleaning: {len(df_clean)}")       # dropping rows with missing data
+    with span('dropna', rows=len(df_clean)):
+        df_clean = df_clean.dropna()
+    print(f"Rows after cleaning: {len(df_clean)}")
 
-temp_array = np.array(df_clean['AvgTemp'])    #col to numpy array
-rainfall_array = np.array(df_clean['Rainfall'])
-humidity_array = np.array(df_clean['AvgHumidity'])
 
+    df_clean['AvgTemp'] = (df_clean['MinTemp'] + df_clean['MaxTemp']) / 2     #avg temp col... avg of min and max
 
-print("\nTemperature Statistics:")        #stats using numpy
-print(f"  Mean: {np.mean(temp_array):.2f}°C")
-print(f"  Min: {np.min(temp_array):.2f}°C")
-print(f"  Max: {np.max(temp_array):.2f}°C")
-print(f"  Standard Deviation: {np.std(temp_array):.2f}°C")
 
-print("\nRainfall Statistics:")
-print(f"  Mean: {np.mean(rainfall_array):.2f} mm")
-print(f"  Min: {np.min(rainfall_array):.2f} mm")
-print(f"  Max: {np.max(rainfall_array):.2f} mm")
-print(f"  Standard Deviation: {np.std(rainfall_array):.2f} mm")
+    df_clean['AvgHumidity'] = (df_clean['Humidity9am'] + df_clean['Humidity3pm']) / 2    #avg humidity col...
 
-print("\nHumidity Statistics:")
-print(f"  Mean: {np.mean(humidity_array):.2f}%")
-print(f"  Min: {np.min(humidity_array):.2f}%")
-print(f"  Max: {np.max(humidity_array):.2f}%")
-print(f"  Standard Deviation: {np.std(humidity_array):.2f}%")
+    df_clean['Month'] = df_clean['Date'].dt.month    #col for month... extract month from date
+    df_clean['Year'] = df_clean['Date'].dt.year
 
+    print("\nCleaned data preview:")
+    print(df_clean.head())
+
+    return df_clean
 
 
 #=================================================================================================================================================
-print("\n" + "=" * 50)
-print("TASK 5: Grouping data by month...")
 
+def weather_statistics(df_clean):
+    """{'temp'|'rainfall'|'humidity': {count, sum, mean, min, max, var, std}} without printing.
+
+    One fused pass over the three columns, cached per DataFrame, so the
+    console output and the report share it.
+    """
+    moments = column_moments(df_clean, ['AvgTemp', 'Rainfall', 'AvgHumidity'])
+    return {
+        'temp': moments['AvgTemp'],
+        'rainfall': moments['Rainfall'],
+        'humidity': moments['AvgHumidity'],
+    }
+
+
+@timed('stats', rows=len)
+def compute_statistics(df_clean):
+    """TASK 3: mean/min/max/std (and sum) of temperature, rainfall and humidity"""
+    print("\n" + "=" * 50)
+    print("TASK 3: Computing statistics with NumPy...")
 
-df_clean['Month'] = df_clean['Date'].dt.month    #col for month... extract month from date
-df_clean['Year'] = df_clean['Date'].dt.year
 
-# Grouping by month and cal avg stats
-monthly_stats = df_clean.groupby('Month').agg({
-    'AvgTemp': ['mean', 'min', 'max'],
-    'Rainfall': 'sum',
-    'AvgHumidity': 'mean'
-}) 
+    stats = weather_statistics(df_clean)
 
-print("\nMonthly Statistics:")
-print(monthly_stats)
 
+    print("\nTemperature Statistics:")        #stats using numpy
+    print(f"  Mean: {stats['temp']['mean']:.2f}°C")
+    print(f"  Min: {stats['temp']['min']:.2f}°C")
+    print(f"  Max: {stats['temp']['max']:.2f}°C")
+    print(f"  Standard Deviation: {stats['temp']['std']:.2f}°C")
 
-monthly_rainfall = df_clean.groupby('Month')['Rainfall'].sum()  #cal monthly rainfall total for plot
+    print("\nRainfall Statistics:")
+    print(f"  Mean: {stats['rainfall']['mean']:.2f} mm")
+    print(f"  Min: {stats['rainfall']['min']:.2f} mm")
+    print(f"  Max: {stats['rainfall']['max']:.2f} mm")
+    print(f"  Standard Deviation: {stats['rainfall']['std']:.2f} mm")
 
+    print("\nHumidity Statistics:")
+    print(f"  Mean: {stats['humidity']['mean']:.2f}%")
+    print(f"  Min: {stats['humidity']['min']:.2f}%")
+    print(f"  Max: {stats['humidity']['max']:.2f}%")
+    print(f"  Standard Deviation: {stats['humidity']['std']:.2f}%")
+
+    return stats
 
 
 #=================================================================================================================================================
-print("\n" + "=" * 50)
-print("TASK 4: Creating visualizations...")
-
-# PLOT 1: Line chart for daily temperature trends
-# use of first 365 days data only /- 
-sample_data = df_clean.head(365)
-
-plt.figure(figsize=(12, 6))
-plt.plot(sample_data['Date'], sample_data['AvgTemp'], color='red', linewidth=1)
-plt.xlabel('Date')
-plt.ylabel('Temperature (°C)')
-plt.title('Daily Temperature Trends (First Year Sample)')
-plt.xticks(rotation=45)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('temperature_line_chart.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: temperature_line_chart.png")
-plt.close()
-
-# PLOT 2: Bar chart for monthly rainfall totals
-plt.figure(figsize=(10, 6))
-months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-plt.bar(range(1, 13), monthly_rainfall, color='blue', alpha=0.7)
-plt.xlabel('Month')
-plt.ylabel('Total Rainfall (mm)')
-plt.title('Monthly Rainfall Totals')
-plt.xticks(range(1, 13), months)
-plt.grid(True, alpha=0.3, axis='y')
-plt.tight_layout()
-plt.savefig('rainfall_bar_chart.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: rainfall_bar_chart.png")
-plt.close()
-
-# PLOT 3: Scatter plot for humidity vs. temperature
-plt.figure(figsize=(10, 6))
-plt.scatter(df_clean['AvgHumidity'], df_clean['AvgTemp'], alpha=0.3, color='green', s=10)
-plt.xlabel('Average Humidity (%)')
-plt.ylabel('Average Temperature (°C)')
-plt.title('Humidity vs Temperature Relationship')
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('humidity_temp_scatter.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: humidity_temp_scatter.png")
-plt.close()
-
-# PLOT 4: Combined figure with two plots
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-
-# Left plot: Temperature trends
-ax1.plot(sample_data['Date'], sample_data['AvgTemp'], color='red', linewidth=1)
-ax1.set_xlabel('Date')
-ax1.set_ylabel('Temperature (°C)')
-ax1.set_title('Daily Temperature Trends')
-ax1.tick_params(axis='x', rotation=45)
-ax1.grid(True, alpha=0.3)
-
-# Right plot: Monthly rainfall
-ax2.bar(range(1, 13), monthly_rainfall, color='blue', alpha=0.7)
-ax2.set_xlabel('Month')
-ax2.set_ylabel('Total Rainfall (mm)')
-ax2.set_title('Monthly Rainfall Totals')
-ax2.set_xticks(range(1, 13))
-ax2.set_xticklabels(months)
-ax2.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('combined_plots.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: combined_plots.png")
-plt.close()
+
+@timed('groupby', rows=len)
+def monthly_aggregates(df_clean):
+    """TASK 5: monthly temperature/rainfall/humidity stats; returns (monthly_stats, monthly_rainfall)"""
+    print("\n" + "=" * 50)
+    print("TASK 5: Grouping data by month...")
+
+    # Grouping by month and cal avg stats
+    monthly_stats = df_clean.groupby('Month').agg({
+        'AvgTemp': ['mean', 'min', 'max'],
+        'Rainfall': 'sum',
+        'AvgHumidity': 'mean'
+    })
+
+    print("\nMonthly Statistics:")
+    print(monthly_stats)
 
 
+    monthly_rainfall = df_clean.groupby('Month')['Rainfall'].sum()  #cal monthly rainfall total for plot
+
+    return monthly_stats, monthly_rainfall
 
 
 #=================================================================================================================================================
 
-print("\n" + "=" * 50)
-print("TASK 6: Exporting cleaned data and creating report...")
+def plot_temperature_trend(sample_data, path, dpi=PLOT_DPI):
+    """PLOT 1: Line chart for daily temperature trends"""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(sample_data['Date'], sample_data['AvgTemp'], color='red', linewidth=1)
+    plt.xlabel('Date')
+    plt.ylabel('Temperature (°C)')
+    plt.title('Daily Temperature Trends (First Year Sample)')
+    plt.xticks(rotation=45)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_monthly_rainfall(monthly_rainfall, path, dpi=PLOT_DPI):
+    """PLOT 2: Bar chart for monthly rainfall totals"""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.bar(range(1, 13), monthly_rainfall, color='blue', alpha=0.7)
+    plt.xlabel('Month')
+    plt.ylabel('Total Rainfall (mm)')
+    plt.title('Monthly Rainfall Totals')
+    plt.xticks(range(1, 13), MONTHS)
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.tight_layout()
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_humidity_vs_temperature(df_clean, path, dpi=PLOT_DPI, density=False):
+    """PLOT 3: Scatter plot for humidity vs. temperature
+
+    density=True draws a hexbin of point counts instead of every point,
+    which stays fast no matter how many rows there are.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    if density:
+        plt.hexbin(df_clean['AvgHumidity'], df_clean['AvgTemp'], gridsize=60, cmap='Greens', mincnt=1)
+        plt.colorbar(label='Days')
+    else:
+        plt.scatter(df_clean['AvgHumidity'], df_clean['AvgTemp'], alpha=0.3, color='green', s=10)
+    plt.xlabel('Average Humidity (%)')
+    plt.ylabel('Average Temperature (°C)')
+    plt.title('Humidity vs Temperature Relationship')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_combined(sample_data, monthly_rainfall, path, dpi=PLOT_DPI):
+    """PLOT 4: Combined figure with two plots"""
+    import matplotlib.pyplot as plt
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    # Left plot: Temperature trends
+    ax1.plot(sample_data['Date'], sample_data['AvgTemp'], color='red', linewidth=1)
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Temperature (°C)')
+    ax1.set_title('Daily Temperature Trends')
+    ax1.tick_params(axis='x', rotation=45)
+    ax1.grid(True, alpha=0.3)
+
+    # Right plot: Monthly rainfall
+    ax2.bar(range(1, 13), monthly_rainfall, color='blue', alpha=0.7)
+    ax2.set_xlabel('Month')
+    ax2.set_ylabel('Total Rainfall (mm)')
+    ax2.set_title('Monthly Rainfall Totals')
+    ax2.set_xticks(range(1, 13))
+    ax2.set_xticklabels(MONTHS)
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    with span('savefig', path=path, dpi=dpi):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _timed_plot(plot, path, *args, agg=False, **kwargs):
+    """Run one plot function and return how long it took in seconds.
+
+    agg=True selects the Agg backend first (used inside worker processes).
+    """
+    if agg:
+        import matplotlib
+        matplotlib.use('Agg')
+    start = time.perf_counter()
+    plot(*args, path, **kwargs)
+    return time.perf_counter() - start
+
+
+@timed('render')
+def render_plots(df_clean, monthly_rainfall, output_dir='.', dpi=PLOT_DPI, fast=False, workers=1,
+                 station=None):
+    """TASK 4: draw and save all four figures; returns {filename: seconds}
+
+    fast=True switches to the Agg backend and draws the humidity/temperature
+    figure as a hexbin density plot instead of a point-per-row scatter.
+    workers > 1 renders the figures in that many worker processes at once.
+    Every figure gets the same precomputed series (the 365-day sample and
+    monthly_rainfall), trimmed to the columns it draws before it is sent.
+    station picks the Location whose first 365 days are drawn in the
+    temperature charts (default: the first rows of the file, whatever station).
+    """
+    print("\n" + "=" * 50)
+    print("TASK 4: Creating visualizations...")
+
+    if fast:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    # use of first 365 days data only /-
+    if station is not None:
+        sample_data = df_clean[df_clean['Location'] == station].head(365)[['Date', 'AvgTemp']]
+        if sample_data.empty:
+            raise ValueError(f"No cleaned rows for station {station!r}")
+    else:
+        sample_data = df_clean.head(365)[['Date', 'AvgTemp']]
+    scatter_data = df_clean[['AvgHumidity', 'AvgTemp']]
+
+    jobs = [
+        ('temperature_line_chart.png', plot_temperature_trend, (sample_data,), {}),
+        ('rainfall_bar_chart.png', plot_monthly_rainfall, (monthly_rainfall,), {}),
+        ('humidity_temp_scatter.png', plot_humidity_vs_temperature, (scatter_data,), {'density': fast}),
+        ('combined_plots.png', plot_combined, (sample_data, monthly_rainfall), {}),
+    ]
+
+    stage_start = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [executor.submit(_timed_plot, plot, os.path.join(output_dir, filename), *args,
+                                       agg=True, dpi=dpi, **kwargs)
+                       for filename, plot, args, kwargs in jobs]
+            seconds = [future.result() for future in futures]
+        # drawn in other processes, so only each figure's total time is known here
+        for (filename, _, _, _), took in zip(jobs, seconds):
+            PROFILER.add('figure', took, file=filename, worker=True)
+    else:
+        seconds = []
+        for filename, plot, args, kwargs in jobs:
+            with span('figure', file=filename):
+                seconds.append(_timed_plot(plot, os.path.join(output_dir, filename), *args, dpi=dpi,
+                                           **kwargs))
+
+    timings = {}
+    for (filename, _, _, _), took in zip(jobs, seconds):
+        timings[filename] = took
+        print(f"✓ Saved: {filename} ({took:.2f} s)")
+    print(f"  Rendered {len(jobs)} figures in {time.perf_counter() - stage_start:.2f} s "
+          f"({'%d workers' % min(workers, len(jobs)) if workers > 1 else 'sequential'})")
+    return timings
+
 
-# clean data to new csv
-df_clean.to_csv('cleaned_weather_data.csv', index=False)
-print("✓ Saved: cleaned_weather_data.csv")
+#=================================================================================================================================================
 
+def build_report(df_clean, stats, monthly_rainfall):
+    """The markdown text of weather_analysis_report.md (stats=None reuses the cached TASK 3 pass)"""
+    if stats is None:
+        stats = weather_statistics(df_clean)
+    temp = stats['temp']
+    rainfall = stats['rainfall']
+    humidity = stats['humidity']
 
-# Reporttttttttttt...........
-report = f"""# Weather Data Analysis Report
+    # Reporttttttttttt...........
+    report = f"""# Weather Data Analysis Report
 
 ## Dataset Overview
 - Total records analyzed: {len(df_clean)}
@@ -203,26 +417,26 @@ report = f"""# Weather Data Analysis Report
 ## Key Findings
 
 ### Temperature Analysis
-- Average Temperature: {np.mean(temp_array):.2f}°C
-- Minimum Temperature: {np.min(temp_array):.2f}°C
-- Maximum Temperature: {np.max(temp_array):.2f}°C
-- Temperature Variability (Std Dev): {np.std(temp_array):.2f}°C
+- Average Temperature: {temp['mean']:.2f}°C
+- Minimum Temperature: {temp['min']:.2f}°C
+- Maximum Temperature: {temp['max']:.2f}°C
+- Temperature Variability (Std Dev): {temp['std']:.2f}°C
 
-The temperature data shows a range from {np.min(temp_array):.1f}°C to {np.max(temp_array):.1f}°C, 
+The temperature data shows a range from {temp['min']:.1f}°C to {temp['max']:.1f}°C, 
 indicating significant seasonal variation in the region.
 
 ### Rainfall Analysis
-- Average Daily Rainfall: {np.mean(rainfall_array):.2f} mm
-- Maximum Rainfall: {np.max(rainfall_array):.2f} mm
-- Total Rainfall Recorded: {np.sum(rainfall_array):.2f} mm
+- Average Daily Rainfall: {rainfall['mean']:.2f} mm
+- Maximum Rainfall: {rainfall['max']:.2f} mm
+- Total Rainfall Recorded: {rainfall['sum']:.2f} mm
 
 The wettest month was Month {monthly_rainfall.idxmax()} with {monthly_rainfall.max():.2f} mm total rainfall.
 The driest month was Month {monthly_rainfall.idxmin()} with {monthly_rainfall.min():.2f} mm total rainfall.
 
 ### Humidity Analysis
-- Average Humidity: {np.mean(humidity_array):.2f}%
-- Minimum Humidity: {np.min(humidity_array):.2f}%
-- Maximum Humidity: {np.max(humidity_array):.2f}%
+- Average Humidity: {humidity['mean']:.2f}%
+- Minimum Humidity: {humidity['min']:.2f}%
+- Maximum Humidity: {humidity['max']:.2f}%
 
 ### Trends and Patterns
 1. **Temperature-Humidity Relationship**: The scatter plot reveals a negative correlation between 
@@ -257,21 +471,160 @@ This analysis provides insights into local weather patterns that could be useful
 ---
 Report generated using Python data analysis tools.
 """
-
-# Save the report
-with open('weather_analysis_report.md', 'w') as f:
-    f.write(report)
-
-print("✓ Saved: weather_analysis_report.md")
-
-print("\n" + "=" * 50)
-print("✅ Analysis Complete!")
-print("=" * 50)
-print("\nGenerated Files:")
-print("  1. cleaned_weather_data.csv")
-print("  2. temperature_line_chart.png")
-print("  3. rainfall_bar_chart.png")
-print("  4. humidity_temp_scatter.png")
-print("  5. combined_plots.png")
-print("  6. weather_analysis_report.md")
-print("\nYou can now upload these to your GitHub repository!")
+    return report
+
+
+@timed('export')
+def export_results(df_clean, stats, monthly_rainfall, output_dir='.', partitions=None):
+    """TASK 6: write cleaned_weather_data.csv and weather_analysis_report.md
+
+    With a PartitionedExport, only rows newer than each station's last export
+    are appended to it instead of rewriting cleaned_weather_data.csv.
+    """
+    print("\n" + "=" * 50)
+    print("TASK 6: Exporting cleaned data and creating report...")
+
+    if partitions is not None:
+        with span('append_partitions', rows=len(df_clean)):
+            written = partitions.append(df_clean)
+        print(f"✓ Appended {written['rows']} new row(s) in {written['parts']} part file(s) to "
+              f"{partitions.export_dir} ({written['skipped']} already exported)")
+    else:
+        # clean data to new csv
+        with span('write_cleaned_csv', rows=len(df_clean)):
+            df_clean.to_csv(os.path.join(output_dir, 'cleaned_weather_data.csv'), index=False)
+        print("✓ Saved: cleaned_weather_data.csv")
+
+    with span('write_report'):
+        report = build_report(df_clean, stats, monthly_rainfall)
+
+        # Save the report
+        with open(os.path.join(output_dir, 'weather_analysis_report.md'), 'w') as f:
+            f.write(report)
+
+    print("✓ Saved: weather_analysis_report.md")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Weather data visualizer")
+    parser.add_argument('--input', default='weatherAUS.csv', help="path of weatherAUS.csv")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help="stages to run (ingest is always run; plot/export also run aggregate)")
+    parser.add_argument('--quiet-load', action='store_true',
+                        help="skip printing head/info/describe of the raw data")
+    parser.add_argument('--full-load', action='store_true',
+                        help="read every column with default dtypes instead of the typed, column-pruned read")
+    parser.add_argument('--engine', choices=('c', 'pyarrow'), default=None,
+                        help="CSV parser for the typed read (pyarrow must be installed)")
+    parser.add_argument('--compare-load', action='store_true',
+                        help="time both loaders and report their memory use before running")
+    parser.add_argument('--dpi', type=int, default=None,
+                        help=f"figure resolution (default {PLOT_DPI}, or 100 with --fast)")
+    parser.add_argument('--fast', action='store_true',
+                        help="fast render: Agg backend and a hexbin for humidity vs temperature")
+    parser.add_argument('--render-workers', type=int, default=os.cpu_count() or 1,
+                        help="processes used to draw the figures in parallel (1 = one after another)")
+    parser.add_argument('--station', default=None,
+                        help="Location whose first 365 days are drawn in the temperature charts")
+    parser.add_argument('--by-station', action='store_true',
+                        help="also compute the statistics and monthly aggregates per Location")
+    parser.add_argument('--by-year', action='store_true',
+                        help="with --by-station, add tables grouped by Location and Year")
+    parser.add_argument('--station-workers', type=int, default=1,
+                        help="processes used for the per-station tables (stations are split into shards)")
+    parser.add_argument('--partitions', action='store_true',
+                        help="append new rows to per-station, per-year part files in <output-dir>/partitions "
+                             "instead of rewriting cleaned_weather_data.csv")
+    parser.add_argument('--partition-format', choices=FORMATS, default='npz')
+    parser.add_argument('--compression', default=None,
+                        help="compress the part files (e.g. gzip for csv/parquet; any value for npz)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every stage and hot step; writes profile.json/.csv to --output-dir")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="with --profile, also record each span's peak traced allocation (slower)")
+    parser.add_argument('--cprofile', default=None, metavar='PATH',
+                        help="run under cProfile and dump the stats to PATH (read with pstats/snakeviz)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = set(args.stages) | {'ingest'}
+    if 'plot' in stages or 'export' in stages:
+        stages.add('aggregate')
+
+    print("Starting Weather Data Analysis...")
+    print("=" * 50)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.compare_load:
+        compare_loaders(args.input, args.engine)
+
+    if args.profile:
+        PROFILER.enable(trace_memory=args.trace_memory)
+
+    with cprofile_to(args.cprofile):
+        df = load_weather(args.input, show_info=not args.quiet_load, typed=not args.full_load,
+                          engine=args.engine)
+        df_clean = clean_weather(df)
+
+        if 'aggregate' in stages:
+            stats = compute_statistics(df_clean)
+            monthly_stats, monthly_rainfall = monthly_aggregates(df_clean)
+        if 'aggregate' in stages and args.by_station:
+            from station_stats import analyze_stations
+
+            print("\nComputing per-station statistics...")
+            with span('station_stats', rows=len(df_clean), workers=args.station_workers):
+                station_results = analyze_stations(df_clean, by_year=args.by_year,
+                                                   workers=args.station_workers)
+            print(f"  {station_results['stats']['Location'].nunique()} stations")
+        if 'plot' in stages:
+            dpi = args.dpi or (100 if args.fast else PLOT_DPI)
+            render_plots(df_clean, monthly_rainfall, args.output_dir, dpi=dpi, fast=args.fast,
+                         workers=args.render_workers, station=args.station)
+        if 'export' in stages:
+            partitions = None
+            if args.partitions:
+                partitions = PartitionedExport(os.path.join(args.output_dir, 'partitions'),
+                                               key='Location' if 'Location' in df_clean.columns else None,
+                                               grain='year', fmt=args.partition_format,
+                                               compression=args.compression)
+            export_results(df_clean, stats, monthly_rainfall, args.output_dir, partitions)
+            if args.by_station:
+                from station_stats import export_station_results
+                with span('station_export'):
+                    export_station_results(station_results, args.output_dir)
+
+    if args.cprofile:
+        print(f"\n✓ Saved: {args.cprofile} (python -m pstats {args.cprofile})")
+    if args.profile:
+        PROFILER.disable()
+        json_path, csv_path = PROFILER.write(args.output_dir)
+        print("\n" + "=" * 50)
+        print("PROFILE")
+        print("=" * 50)
+        print(PROFILER.report(PROFILE_DEPTH))
+        print(f"✓ Saved: {os.path.basename(json_path)}")
+        print(f"✓ Saved: {os.path.basename(csv_path)}")
+
+    print("\n" + "=" * 50)
+    print("✅ Analysis Complete!")
+    print("=" * 50)
+    if 'export' in stages:
+        print("\nGenerated Files:")
+        print("  1. partitions/manifest.json (and its part files)" if args.partitions
+              else "  1. cleaned_weather_data.csv")
+        print("  2. temperature_line_chart.png")
+        print("  3. rainfall_bar_chart.png")
+        print("  4. humidity_temp_scatter.png")
+        print("  5. combined_plots.png")
+        print("  6. weather_analysis_report.md")
+        print("\nYou can now upload these to your GitHub repository!")
+
+
+if __name__ == "__main__":
+    main()